@@ -0,0 +1,85 @@
+"""Benchmarks for loading and refreshing data through `inflation_dashboard.fred`, and
+for searching the series catalog built from it.
+
+Requests go to the local FRED stand-in in `inflation_dashboard.fred_server`, serving
+synthesized fixtures with a fixed latency per response, so cold start and refresh
+times depend on request concurrency rather than on the network.
+"""
+
+import os
+import tempfile
+
+import pyfredapi as pf
+
+from inflation_dashboard import cpi_series
+from inflation_dashboard.catalog import SeriesCatalog
+from inflation_dashboard.data import CATALOG_CATEGORY_IDS, CPI_CATEGORY_ID
+from inflation_dashboard.fred import FredClient
+from inflation_dashboard.fred_server import (
+    read_fixture,
+    running_server,
+    synthesize_fixtures,
+)
+
+from .synthetic import SERIES_COUNTS
+
+# Seconds per response, about a FRED round trip from a nearby region.
+LATENCY = 0.05
+
+
+class FredStandIn:
+    params = [1, 8]
+    param_names = ["max_workers"]
+    timeout = 300
+
+    def setup(self, max_workers):
+        self.fixtures = tempfile.TemporaryDirectory()
+        synthesize_fixtures(self.fixtures.name)
+        self.server_context = running_server(self.fixtures.name, latency=LATENCY)
+        server = self.server_context.__enter__()
+        self.client = FredClient(
+            api_key=os.environ.get("FRED_API_KEY", "stand-in"),
+            base_url=server.url,
+            max_workers=max_workers,
+            rate_limit=0,
+        )
+
+    def teardown(self, max_workers):
+        self.server_context.__exit__(None, None, None)
+        self.fixtures.cleanup()
+
+    def time_get_series_collection(self, max_workers):
+        self.client.get_series_collection(cpi_series)
+
+    def time_get_last_updated(self, max_workers):
+        self.client.get_last_updated(cpi_series)
+
+    def time_crawl_catalog(self, max_workers):
+        SeriesCatalog.crawl(CATALOG_CATEGORY_IDS, client=self.client)
+
+
+class CatalogSearch:
+    params = SERIES_COUNTS
+    param_names = ["n_series"]
+    timeout = 300
+
+    def setup(self, n_series):
+        with tempfile.TemporaryDirectory() as fixtures:
+            synthesize_fixtures(
+                fixtures, n_months=2, extra_series=max(n_series - len(cpi_series), 0)
+            )
+            listing = read_fixture(fixtures, "category/series", CPI_CATEGORY_ID)
+        infos = [pf.SeriesInfo(**info) for info in listing["seriess"]]
+        self.catalog = SeriesCatalog({CPI_CATEGORY_ID: infos})
+
+    def time_build(self, n_series):
+        SeriesCatalog.from_dict(self.catalog.to_dict())
+
+    def time_search_keywords(self, n_series):
+        self.catalog.search("food home")
+
+    def time_search_prefix(self, n_series):
+        self.catalog.search(prefix="Personal Consumption Expenditures:")
+
+    def time_search_filters(self, n_series):
+        self.catalog.search("energy", frequency="M", seasonal_adjustment="SA")
@@ -0,0 +1,166 @@
+"""Benchmarks for `inflation_dashboard.utils.pandas`.
+
+``time_*`` benchmarks record wall time and ``peakmem_*`` benchmarks record the peak
+resident memory of the process, for long frames of 23, 500 and 5,000 series.
+"""
+
+import numpy as np
+import pandas as pd
+
+from inflation_dashboard.utils.matrix import SeriesMatrix
+from inflation_dashboard.utils.pandas import (
+    DateIndex,
+    calc_groupby_pct_chg,
+    calc_pct_chg_for_latest_obv,
+    compact_long_df,
+    get_dates,
+    pivot_pct_chg_tbl,
+    subset_long_df,
+    walkback_to_nearest_date,
+)
+
+from .synthetic import SERIES_COUNTS, make_long_df
+
+
+class GroupbyPctChg:
+    params = SERIES_COUNTS
+    param_names = ["n_series"]
+    timeout = 300
+
+    def setup(self, n_series):
+        self.long_df = make_long_df(n_series)
+
+    def time_calc_groupby_pct_chg(self, n_series):
+        calc_groupby_pct_chg(df=self.long_df, by="cpi_series", periods=12)
+
+    def time_calc_groupby_pct_chg_multi_period(self, n_series):
+        calc_groupby_pct_chg(df=self.long_df, by="cpi_series", periods=[1, 12])
+
+    def peakmem_calc_groupby_pct_chg(self, n_series):
+        calc_groupby_pct_chg(df=self.long_df, by="cpi_series", periods=12)
+
+
+class CompactLongDf:
+    params = (SERIES_COUNTS, [False, True])
+    param_names = ["n_series", "compact"]
+    timeout = 300
+
+    def setup(self, n_series, compact):
+        self.long_df = make_long_df(n_series)
+        if compact:
+            self.long_df = compact_long_df(self.long_df, by="cpi_series")
+        self.series = [f"Series {i:05d}" for i in range(0, n_series, 10)]
+
+    def time_compact_long_df(self, n_series, compact):
+        compact_long_df(self.long_df, by="cpi_series")
+
+    def time_subset_long_df(self, n_series, compact):
+        subset_long_df(self.long_df, by="cpi_series", series=self.series)
+
+    def track_long_df_bytes(self, n_series, compact):
+        return int(self.long_df.memory_usage(deep=True).sum())
+
+    track_long_df_bytes.unit = "bytes"
+
+    def track_pct_chg_df_bytes(self, n_series, compact):
+        pct_chg_df = calc_groupby_pct_chg(df=self.long_df, by="cpi_series", periods=12)
+        return int(pct_chg_df.memory_usage(deep=True).sum())
+
+    track_pct_chg_df_bytes.unit = "bytes"
+
+
+class Matrix:
+    params = SERIES_COUNTS
+    param_names = ["n_series"]
+    timeout = 300
+
+    def setup(self, n_series):
+        self.long_df = compact_long_df(make_long_df(n_series), by="cpi_series")
+        self.matrix = SeriesMatrix.from_long_df(self.long_df, by="cpi_series")
+        self.pct_chg = self.matrix.pct_change(12)
+
+    def time_from_long_df(self, n_series):
+        SeriesMatrix.from_long_df(self.long_df, by="cpi_series")
+
+    def time_pct_changes(self, n_series):
+        self.matrix.pct_changes([1, 3, 6, 12, 24])
+
+    def time_pct_chg_long_df(self, n_series):
+        self.matrix.pct_chg_long_df([1, 12])
+
+    def time_rolling_mean(self, n_series):
+        self.matrix.rolling_mean(12, self.pct_chg)
+
+    def time_latest_pct_chg_df(self, n_series):
+        self.matrix.latest_pct_chg_df(12)
+
+    def peakmem_pct_chg_long_df(self, n_series):
+        self.matrix.pct_chg_long_df([1, 12])
+
+
+class LatestPctChg:
+    params = SERIES_COUNTS
+    param_names = ["n_series"]
+    timeout = 300
+
+    def setup(self, n_series):
+        self.long_df = make_long_df(n_series)
+
+    def time_calc_pct_chg_for_latest_obv(self, n_series):
+        calc_pct_chg_for_latest_obv(
+            df=self.long_df, periods=[1, 3, 6, 12, 24], series_col="cpi_series"
+        )
+
+    def peakmem_calc_pct_chg_for_latest_obv(self, n_series):
+        calc_pct_chg_for_latest_obv(
+            df=self.long_df, periods=[1, 3, 6, 12, 24], series_col="cpi_series"
+        )
+
+
+class PivotPctChgTbl:
+    params = (SERIES_COUNTS, [6, "all"])
+    param_names = ["n_series", "n"]
+    timeout = 300
+
+    def setup(self, n_series, n):
+        self.pct_chg_df = calc_groupby_pct_chg(
+            df=make_long_df(n_series), by="cpi_series", periods=1
+        )
+
+    def time_pivot_pct_chg_tbl(self, n_series, n):
+        pivot_pct_chg_tbl(df=self.pct_chg_df, index_col="cpi_series", n=n)
+
+    def peakmem_pivot_pct_chg_tbl(self, n_series, n):
+        pivot_pct_chg_tbl(df=self.pct_chg_df, index_col="cpi_series", n=n)
+
+
+class Dates:
+    params = SERIES_COUNTS
+    param_names = ["n_series"]
+    timeout = 300
+
+    def setup(self, n_series):
+        self.long_df = make_long_df(n_series)
+        self.query_date = pd.Timestamp("2022-06-15")
+        self.date_index = DateIndex.from_long_df(self.long_df, by="cpi_series")
+        self.query_dates = np.full(len(self.long_df), np.datetime64("2022-06-15", "ns"))
+
+    def time_get_dates(self, n_series):
+        get_dates(self.long_df)
+
+    def time_walkback_to_nearest_date(self, n_series):
+        walkback_to_nearest_date(self.long_df, self.query_date)
+
+    def peakmem_walkback_to_nearest_date(self, n_series):
+        walkback_to_nearest_date(self.long_df, self.query_date)
+
+    def time_date_index_from_long_df(self, n_series):
+        DateIndex.from_long_df(self.long_df, by="cpi_series")
+
+    def time_date_index_asof(self, n_series):
+        self.date_index.asof(self.query_date, series="Series 00000")
+
+    def time_date_index_asof_many(self, n_series):
+        self.date_index.asof_many(
+            self.query_dates, series=self.long_df["cpi_series"].to_numpy()
+        )
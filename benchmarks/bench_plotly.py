@@ -0,0 +1,30 @@
+"""Benchmarks for figure construction in `inflation_dashboard.utils.plotly`."""
+
+from inflation_dashboard.utils.pandas import calc_groupby_pct_chg
+from inflation_dashboard.utils.plotly import _mk_line_plot
+
+from .synthetic import SERIES_COUNTS, make_long_df
+
+
+class LinePlot:
+    params = SERIES_COUNTS
+    param_names = ["n_series"]
+    timeout = 600
+
+    def setup(self, n_series):
+        if n_series > 500:
+            # One trace per series; px.line at this size takes minutes and the
+            # dashboards never plot this many series in one figure.
+            raise NotImplementedError
+        self.pct_chg_df = calc_groupby_pct_chg(
+            df=make_long_df(n_series), by="cpi_series", periods=12
+        )
+
+    def time_mk_line_plot(self, n_series):
+        _mk_line_plot(df=self.pct_chg_df, title="Benchmark")
+
+    def time_mk_line_plot_to_json(self, n_series):
+        _mk_line_plot(df=self.pct_chg_df, title="Benchmark").to_json()
+
+    def peakmem_mk_line_plot(self, n_series):
+        _mk_line_plot(df=self.pct_chg_df, title="Benchmark")
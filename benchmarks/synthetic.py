@@ -0,0 +1,32 @@
+"""Synthetic stand-ins for the FRED data, shaped like `inflation_long_df`.
+
+The benchmarks must not depend on the network, so instead of requesting series from
+FRED they generate long frames with the same columns and dtypes that
+`SeriesCollection.merge_long(col_name="cpi_series")` returns: monthly observations
+from January 1947 for every series, stacked series by series.
+"""
+
+import numpy as np
+import pandas as pd
+
+N_MONTHS = 915  # Jan 1947 - Mar 2023, the span of CPIAUCSL.
+SERIES_COUNTS = [23, 500, 5000]
+
+
+def make_long_df(
+    n_series: int, n_months: int = N_MONTHS, seed: int = 0
+) -> pd.DataFrame:
+    """Long frame of ``n_series`` random-walk price indexes with columns date, value & cpi_series."""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("1947-01-01", periods=n_months, freq="MS")
+    growth = rng.normal(0.003, 0.004, size=(n_series, n_months))
+    values = 20 * np.cumprod(1 + growth, axis=1)
+    labels = np.array([f"Series {i:05d}" for i in range(n_series)], dtype=object)
+
+    return pd.DataFrame(
+        {
+            "date": np.tile(dates.to_numpy(), n_series),
+            "value": values.ravel().round(3),
+            "cpi_series": np.repeat(labels, n_months),
+        }
+    )
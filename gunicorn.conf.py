@@ -0,0 +1,62 @@
+"""Gunicorn settings for the Dash app.
+
+The app is imported, its data loaded and its pages built once in the master process
+before the workers are forked, so workers share that memory copy-on-write instead of
+each fetching and holding their own copy. Each worker then starts a background
+refresher, since threads do not survive the fork, but only the one holding the
+snapshot directory's lock file polls FRED; the others swap in the snapshots it writes.
+Those raw frames are memory-mapped and shared through the OS page cache, but the data
+derived from them after a refresh (compact frames, series matrix, percent change cube
+and pages) is rebuilt in, and private to, each worker. With metrics enabled, workers
+share them through ``INFLATION_DASHBOARD_METRICS_DIR``, so ``/metrics`` reports every
+worker whichever one answers. A temporary metrics directory created here is removed
+when the master exits.
+
+    gunicorn -c gunicorn.conf.py inflation_dashboard.dash.app:server
+"""
+
+import gc
+import os
+import shutil
+import tempfile
+
+from inflation_dashboard.config import get_settings
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8050")
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+preload_app = True
+
+# Set before the app is imported, so every worker reads the same directory.
+_metrics_tmp_dir = None
+if get_settings().metrics and not os.environ.get("INFLATION_DASHBOARD_METRICS_DIR"):
+    _metrics_tmp_dir = tempfile.mkdtemp(prefix="inflation_dashboard_metrics_")
+    os.environ["INFLATION_DASHBOARD_METRICS_DIR"] = _metrics_tmp_dir
+
+
+def when_ready(server):
+    from inflation_dashboard.dash.app import preload
+
+    server.log.info("Preloading data and pages")
+    preload()
+    # Move everything allocated so far out of the garbage collector's reach, so
+    # collections in the workers do not write to, and so copy, the shared pages.
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from inflation_dashboard import metrics
+    from inflation_dashboard.dash.app import start_refresher
+
+    start_refresher()
+    metrics.start_writer()
+
+
+def worker_exit(server, worker):
+    from inflation_dashboard import metrics
+
+    metrics.stop_writer()
+
+
+def on_exit(server):
+    if _metrics_tmp_dir is not None:
+        shutil.rmtree(_metrics_tmp_dir, ignore_errors=True)
@@ -1,8 +1,9 @@
-from functools import lru_cache
-from typing import List
+from inflation_dashboard import profiling
 
-import pyfredapi as pf
-import streamlit as st
+# Started before anything heavy is imported, so those imports are profiled too.
+profiling.start_from_env()
+
+import streamlit as st  # noqa: E402
 
 
 def add_sidebar_title():
@@ -23,9 +24,6 @@ def add_sidebar_title():
     )
 
 
-all_cpi_series = pf.get_category_series("9")
-all_personal_income_and_outlays_series = pf.get_category_series("110")
-
 cpi_series_column_name = "cpi_series"
 cpi_series = [
     "CPIAUCSL",
@@ -64,6 +62,20 @@ def _parse_cpi_series_title(title: str) -> str:
     )
 
 
-inflation_sc = pf.SeriesCollection(series_id=cpi_series, rename=_parse_cpi_series_title)
-inflation_long_df = inflation_sc.merge_long(col_name=cpi_series_column_name)
-inflation_wide_df = inflation_sc.merge_asof(base_series_id="CPIAUCSL")
+# Datasets that used to be fetched at import time. They are now resolved lazily
+# through `inflation_dashboard.data` the first time they are accessed.
+_lazy_data = {
+    "all_cpi_series": "get_all_cpi_series",
+    "all_personal_income_and_outlays_series": "get_all_personal_income_and_outlays_series",
+    "inflation_sc": "get_inflation_sc",
+    "inflation_long_df": "get_inflation_long_df",
+    "inflation_wide_df": "get_inflation_wide_df",
+}
+
+
+def __getattr__(name: str):
+    if name in _lazy_data:
+        from inflation_dashboard import data
+
+        return getattr(data, _lazy_data[name])()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
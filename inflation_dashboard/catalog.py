@@ -0,0 +1,258 @@
+"""Searchable catalog of the FRED series in a category tree.
+
+`SeriesCatalog.crawl` walks FRED categories and their subcategories once, collecting
+the metadata of every listed series. The catalog is persisted with the other FRED
+metadata (see `inflation_dashboard.snapshot.write_json`), so later processes load it
+from disk instead of requesting and scanning category listings again.
+
+Series are indexed by the tokens of their id, title, frequency, units and seasonal
+adjustment in an inverted index. Index tokens are kept sorted, so each query token
+matches every indexed token it is a prefix of with a binary search, and a query is
+answered by intersecting a few sets of positions rather than scanning every title.
+"""
+
+import bisect
+import re
+from typing import (
+    AbstractSet,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+)
+
+import pyfredapi as pf
+
+from inflation_dashboard.fred import FredClient, get_client
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+# Metadata fields matched exactly by the filters of `SeriesCatalog.search`.
+FILTER_FIELDS = {
+    "frequency": ("frequency", "frequency_short"),
+    "units": ("units", "units_short"),
+    "seasonal_adjustment": ("seasonal_adjustment", "seasonal_adjustment_short"),
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower case alphanumeric tokens of ``text``."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class SeriesCatalog:
+    """Series metadata of FRED categories with an inverted index for search.
+
+    Parameters
+    ----------
+    categories : Dict[str, List[pf.SeriesInfo]]
+        Series listed in each category, keyed by category id. A series listed in
+        several categories is stored once, in the position it was first listed.
+    children : Dict[str, List[str]] | None, optional
+        Subcategory ids of each category. Defaults to None, no subcategories.
+    """
+
+    def __init__(
+        self,
+        categories: Dict[str, List[pf.SeriesInfo]],
+        children: Optional[Dict[str, List[str]]] = None,
+    ):
+        self.children = children or {}
+        self.categories: Dict[str, List[str]] = {}
+        self._series: List[pf.SeriesInfo] = []
+        self._positions: Dict[str, int] = {}
+        for category_id, listing in categories.items():
+            self.categories[category_id] = [info.id for info in listing]
+            for info in listing:
+                if info.id not in self._positions:
+                    self._positions[info.id] = len(self._series)
+                    self._series.append(info)
+
+        self._in_category = {
+            category_id: frozenset(self._positions[sid] for sid in listing)
+            for category_id, listing in self.categories.items()
+        }
+        postings: Dict[str, set] = {}
+        for position, info in enumerate(self._series):
+            for token in self._document_tokens(info):
+                postings.setdefault(token, set()).add(position)
+        self._postings = {token: frozenset(p) for token, p in postings.items()}
+        self._tokens = sorted(self._postings)
+        self._titles = sorted(
+            (info.title.casefold(), position)
+            for position, info in enumerate(self._series)
+        )
+
+    @staticmethod
+    def _document_tokens(info: pf.SeriesInfo) -> set:
+        tokens = {info.id.lower(), *tokenize(info.id), *tokenize(info.title)}
+        for field, attributes in FILTER_FIELDS.items():
+            for attribute in attributes:
+                value = getattr(info, attribute, None)
+                if value:
+                    tokens.update(tokenize(value))
+                    # Field qualified tokens are never query tokens, which are
+                    # alphanumeric, so filters and keywords do not mix.
+                    tokens.add(f"{field}:{value.casefold()}")
+        return tokens
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    def __contains__(self, series_id: str) -> bool:
+        return series_id in self._positions
+
+    def __iter__(self) -> Iterator[pf.SeriesInfo]:
+        return iter(self._series)
+
+    def get(self, series_id: str) -> pf.SeriesInfo:
+        """Metadata of a series. Raises KeyError if it is not in the catalog."""
+        return self._series[self._positions[series_id]]
+
+    def in_category(self, category_id: str) -> List[pf.SeriesInfo]:
+        """Series listed directly in a category, in listing order."""
+        return [self.get(sid) for sid in self.categories.get(category_id, [])]
+
+    def labels(
+        self,
+        series_id: Sequence[str],
+        rename: Optional[Callable[[str], str]] = None,
+    ) -> List[str]:
+        """Labels of series as a `SeriesCollection` built with ``rename`` gives them.
+
+        Series not in the catalog are left out.
+        """
+        labels = []
+        for sid in series_id:
+            if sid not in self:
+                continue
+            label = rename(self.get(sid).title) if rename is not None else None
+            labels.append(label if label is not None else sid)
+        return labels
+
+    def _matching(self, token: str) -> AbstractSet[int]:
+        """Positions of series with an indexed token starting with ``token``."""
+        start = bisect.bisect_left(self._tokens, token)
+        end = bisect.bisect_left(self._tokens, token + "\uffff", lo=start)
+        if end - start == 1:
+            return self._postings[self._tokens[start]]
+        return set().union(*(self._postings[t] for t in self._tokens[start:end]))
+
+    def _with_title_prefix(self, prefix: str) -> set:
+        prefix = prefix.casefold()
+        start = bisect.bisect_left(self._titles, (prefix,))
+        end = bisect.bisect_left(self._titles, (prefix + "\uffff",), lo=start)
+        return {position for _, position in self._titles[start:end]}
+
+    def search(
+        self,
+        query: str = "",
+        prefix: Optional[str] = None,
+        category: Optional[str] = None,
+        limit: Optional[int] = None,
+        **filters: str,
+    ) -> List[pf.SeriesInfo]:
+        """Series matching every token of ``query`` and every given condition.
+
+        Parameters
+        ----------
+        query : str, optional
+            Keywords. Each matches series with an id, title, frequency, units or
+            seasonal adjustment token starting with it, so partial words match too.
+            Defaults to "", no keywords.
+        prefix : str | None, optional
+            Case insensitive prefix of the title. Defaults to None.
+        category : str | None, optional
+            Only series listed directly in this category. Defaults to None.
+        limit : int | None, optional
+            Maximum number of results. Defaults to None, all of them.
+        **filters : str
+            Exact, case insensitive ``frequency``, ``units`` or
+            ``seasonal_adjustment``, in their long or short form, e.g.
+            ``frequency="M", seasonal_adjustment="Seasonally Adjusted"``.
+
+        Returns
+        -------
+        List[pf.SeriesInfo]
+            Matching series in catalog order.
+        """
+        candidates: List[AbstractSet[int]] = [
+            self._matching(token) for token in tokenize(query)
+        ]
+        if prefix is not None:
+            candidates.append(self._with_title_prefix(prefix))
+        if category is not None:
+            candidates.append(self._in_category.get(category, frozenset()))
+        for field, value in filters.items():
+            if field not in FILTER_FIELDS:
+                raise TypeError(f"Unknown filter '{field}'")
+            candidates.append(
+                self._postings.get(f"{field}:{value.casefold()}", frozenset())
+            )
+
+        if not candidates:
+            positions: Iterable[int] = range(len(self._series))
+        else:
+            candidates.sort(key=len)
+            positions = sorted(candidates[0].intersection(*candidates[1:]))
+        results = [self._series[position] for position in positions]
+        return results if limit is None else results[:limit]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON serializable form, read back with `SeriesCatalog.from_dict`."""
+        return {
+            "series": [info.model_dump() for info in self._series],
+            "categories": self.categories,
+            "children": self.children,
+        }
+
+    @classmethod
+    def from_dict(cls, obj: Dict[str, Any]) -> "SeriesCatalog":
+        infos = {info["id"]: pf.SeriesInfo(**info) for info in obj["series"]}
+        categories = {
+            category_id: [infos[sid] for sid in listing]
+            for category_id, listing in obj["categories"].items()
+        }
+        return cls(categories, children=obj.get("children"))
+
+    @classmethod
+    def crawl(
+        cls,
+        category_id: Sequence[str],
+        client: Optional[FredClient] = None,
+    ) -> "SeriesCatalog":
+        """Build the catalog of categories and all of their subcategories.
+
+        The tree is walked a level at a time, requesting the listings and children of
+        every category in a level concurrently.
+
+        Parameters
+        ----------
+        category_id : Sequence[str]
+            Root categories.
+        client : FredClient | None, optional
+            Client to request FRED with. Defaults to the process wide client.
+
+        Returns
+        -------
+        SeriesCatalog
+        """
+        client = client or get_client()
+        categories: Dict[str, List[pf.SeriesInfo]] = {}
+        children: Dict[str, List[str]] = {}
+        level = list(dict.fromkeys(category_id))
+        while level:
+            listings = client.map(client.get_category_series, level)
+            subcategories = client.map(client.get_category_children, level)
+            for cid, listing, child_ids in zip(level, listings, subcategories):
+                categories[cid] = list(listing.values())
+                children[cid] = child_ids
+            level = [
+                child
+                for child in dict.fromkeys(c for ids in subcategories for c in ids)
+                if child not in categories
+            ]
+        return cls(categories, children=children)
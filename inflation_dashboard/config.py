@@ -0,0 +1,184 @@
+"""Runtime settings for the inflation dashboard, read from environment variables."""
+
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Dashboard settings.
+
+    Attributes
+    ----------
+    cache_ttl : float
+        Seconds a fetched dataset stays fresh in the in-process cache.
+        Set with ``INFLATION_DASHBOARD_CACHE_TTL``. Defaults to 6 hours.
+        Snapshots younger than this are also used without contacting FRED.
+    snapshot_dir : Path
+        Directory for on-disk data snapshots.
+        Set with ``INFLATION_DASHBOARD_SNAPSHOT_DIR``. Defaults to
+        ``~/.cache/inflation_dashboard``.
+    snapshot_keep : int
+        Number of snapshot vintages to retain per series collection.
+        Set with ``INFLATION_DASHBOARD_SNAPSHOT_KEEP``. Defaults to 3.
+    offline : bool
+        Serve data only from snapshots, never from the network.
+        Set with ``INFLATION_DASHBOARD_OFFLINE=1``. Defaults to False.
+    fred_base_url : str
+        Base URL of the FRED API.
+        Set with ``INFLATION_DASHBOARD_FRED_URL``. Defaults to https://api.stlouisfed.org/fred.
+    fred_max_workers : int
+        Concurrent requests made to FRED.
+        Set with ``INFLATION_DASHBOARD_FRED_WORKERS``. Defaults to 8.
+    fred_rate_limit : float
+        Sustained requests per second made to FRED, which allows 120 a minute.
+        Set with ``INFLATION_DASHBOARD_FRED_RATE_LIMIT``. Defaults to 2.
+    fred_burst : int
+        Requests allowed in a burst above the rate limit.
+        Set with ``INFLATION_DASHBOARD_FRED_BURST``. Defaults to 60.
+    fred_max_retries : int
+        Retries for failed FRED requests.
+        Set with ``INFLATION_DASHBOARD_FRED_RETRIES``. Defaults to 4.
+    figure_cache_mb : float
+        Budget of the in-process figure cache, in megabytes of figure JSON. The
+        figures are held decoded, which takes a few times more memory.
+        Set with ``INFLATION_DASHBOARD_FIGURE_CACHE_MB``. Defaults to 128.
+    refresh_interval : float
+        Seconds between background checks of FRED for new data. ``0`` disables them.
+        Set with ``INFLATION_DASHBOARD_REFRESH_INTERVAL``. Defaults to 1 hour.
+    refresh_release_interval : float
+        Seconds between background checks around a CPI release.
+        Set with ``INFLATION_DASHBOARD_REFRESH_RELEASE_INTERVAL``. Defaults to 5 minutes.
+    release_dates : Tuple[str, ...]
+        CPI release dates, as YYYY-MM-DD, to poll faster on. Empty to assume a release
+        on any weekday from the 10th to the 15th of the month.
+        Set with a comma separated ``INFLATION_DASHBOARD_RELEASE_DATES``.
+        Defaults to empty.
+    profile_startup : str
+        Path prefix of the startup profile reports, see `inflation_dashboard.profiling`.
+        Set with ``INFLATION_DASHBOARD_PROFILE_STARTUP``. Defaults to empty, which
+        disables the profiler.
+    profile_allocations : bool
+        Trace allocations while profiling startup.
+        Set with ``INFLATION_DASHBOARD_PROFILE_ALLOCATIONS=0`` to disable. Defaults to True.
+    metrics : bool
+        Serve Prometheus metrics at ``/metrics`` from the Dash app, on the same bind
+        as the pages, so only enable it where that bind is not public.
+        Set with ``INFLATION_DASHBOARD_METRICS=1``. Defaults to False.
+    metrics_dir : str
+        Directory where server processes share their metrics, so any of them can report
+        the totals. Set with ``INFLATION_DASHBOARD_METRICS_DIR``. Defaults to empty,
+        which reports each process's own metrics.
+    float32_values : bool
+        Hold series values in memory as ``float32`` rather than ``float64``, about
+        seven significant digits. Set with ``INFLATION_DASHBOARD_FLOAT32=1``.
+        Defaults to False.
+    catalog_ttl : float
+        Seconds the stored series catalog is used before the FRED category tree is
+        crawled again. Set with ``INFLATION_DASHBOARD_CATALOG_TTL``. Defaults to 7 days.
+    """
+
+    cache_ttl: float = 6 * 60 * 60
+    snapshot_dir: Path = field(
+        default_factory=lambda: Path.home() / ".cache" / "inflation_dashboard"
+    )
+    snapshot_keep: int = 3
+    offline: bool = False
+    fred_base_url: str = "https://api.stlouisfed.org/fred"
+    fred_max_workers: int = 8
+    fred_rate_limit: float = 2.0
+    fred_burst: int = 60
+    fred_max_retries: int = 4
+    figure_cache_mb: float = 128
+    refresh_interval: float = 60 * 60
+    refresh_release_interval: float = 5 * 60
+    release_dates: Tuple[str, ...] = ()
+    profile_startup: str = ""
+    profile_allocations: bool = True
+    metrics: bool = False
+    metrics_dir: str = ""
+    float32_values: bool = False
+    catalog_ttl: float = 7 * 24 * 60 * 60
+
+
+def _env_flag(name: str, default: bool = False) -> bool:
+    value = os.environ.get(name, "1" if default else "")
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _env_list(name: str) -> Tuple[str, ...]:
+    items = os.environ.get(name, "").split(",")
+    return tuple(item.strip() for item in items if item.strip())
+
+
+def get_settings() -> Settings:
+    """Build the settings from the environment."""
+    return Settings(
+        cache_ttl=float(
+            os.environ.get("INFLATION_DASHBOARD_CACHE_TTL", Settings.cache_ttl)
+        ),
+        snapshot_dir=Path(
+            os.environ.get(
+                "INFLATION_DASHBOARD_SNAPSHOT_DIR",
+                Path.home() / ".cache" / "inflation_dashboard",
+            )
+        ),
+        snapshot_keep=int(
+            os.environ.get("INFLATION_DASHBOARD_SNAPSHOT_KEEP", Settings.snapshot_keep)
+        ),
+        offline=_env_flag("INFLATION_DASHBOARD_OFFLINE"),
+        fred_base_url=os.environ.get(
+            "INFLATION_DASHBOARD_FRED_URL", Settings.fred_base_url
+        ),
+        fred_max_workers=int(
+            os.environ.get(
+                "INFLATION_DASHBOARD_FRED_WORKERS", Settings.fred_max_workers
+            )
+        ),
+        fred_rate_limit=float(
+            os.environ.get(
+                "INFLATION_DASHBOARD_FRED_RATE_LIMIT", Settings.fred_rate_limit
+            )
+        ),
+        fred_burst=int(
+            os.environ.get("INFLATION_DASHBOARD_FRED_BURST", Settings.fred_burst)
+        ),
+        fred_max_retries=int(
+            os.environ.get(
+                "INFLATION_DASHBOARD_FRED_RETRIES", Settings.fred_max_retries
+            )
+        ),
+        figure_cache_mb=float(
+            os.environ.get(
+                "INFLATION_DASHBOARD_FIGURE_CACHE_MB", Settings.figure_cache_mb
+            )
+        ),
+        refresh_interval=float(
+            os.environ.get(
+                "INFLATION_DASHBOARD_REFRESH_INTERVAL", Settings.refresh_interval
+            )
+        ),
+        refresh_release_interval=float(
+            os.environ.get(
+                "INFLATION_DASHBOARD_REFRESH_RELEASE_INTERVAL",
+                Settings.refresh_release_interval,
+            )
+        ),
+        release_dates=_env_list("INFLATION_DASHBOARD_RELEASE_DATES"),
+        profile_startup=os.environ.get("INFLATION_DASHBOARD_PROFILE_STARTUP", ""),
+        profile_allocations=_env_flag(
+            "INFLATION_DASHBOARD_PROFILE_ALLOCATIONS", default=True
+        ),
+        metrics=_env_flag("INFLATION_DASHBOARD_METRICS"),
+        metrics_dir=os.environ.get("INFLATION_DASHBOARD_METRICS_DIR", ""),
+        float32_values=_env_flag("INFLATION_DASHBOARD_FLOAT32"),
+        catalog_ttl=float(
+            os.environ.get("INFLATION_DASHBOARD_CATALOG_TTL", Settings.catalog_ttl)
+        ),
+    )
@@ -1,14 +1,13 @@
 import dash_bootstrap_components as dbc
 from dash import Dash, Input, Output, dcc, html
+from flask import Response
 
-from inflation_dashboard.dash.src.all_categories_tab import all_content
-from inflation_dashboard.dash.src.core_and_headline_tab import headline_and_core_content
-from inflation_dashboard.dash.src.edu_tab import edu_content
-from inflation_dashboard.dash.src.energy_tab import energy_content
-from inflation_dashboard.dash.src.food_tab import food_content
-from inflation_dashboard.dash.src.housing_tab import housing_content
-from inflation_dashboard.dash.src.medical_tab import medical_content
-from inflation_dashboard.dash.src.overview_tab import overview_content
+from inflation_dashboard import data, metrics, profiling, scheduler
+from inflation_dashboard.config import get_settings
+
+# Imported for its graph callbacks, which must be registered before the app starts.
+from inflation_dashboard.dash.src.utils import figures  # noqa: F401
+from inflation_dashboard.dash.src.utils.routes import RouteRegistry
 
 app = Dash(__name__, external_stylesheets=[dbc.themes.YETI])
 server = app.server
@@ -57,27 +56,73 @@ sidebar = html.Div(
 
 content = html.Div(id="page-content", style=CONTENT_STYLE)
 
+# Pages are built on first visit and rebuilt after the data refreshes.
+routes = RouteRegistry()
+routes.register("/", "inflation_dashboard.dash.src.overview_tab:build_overview_content")
+routes.register(
+    "/coreandheadline",
+    "inflation_dashboard.dash.src.core_and_headline_tab:build_headline_and_core_content",
+)
+routes.register("/food", "inflation_dashboard.dash.src.food_tab:build_food_content")
+routes.register(
+    "/energy", "inflation_dashboard.dash.src.energy_tab:build_energy_content"
+)
+routes.register("/education", "inflation_dashboard.dash.src.edu_tab:build_edu_content")
+routes.register(
+    "/housing", "inflation_dashboard.dash.src.housing_tab:build_housing_content"
+)
+routes.register(
+    "/medical", "inflation_dashboard.dash.src.medical_tab:build_medical_content"
+)
+routes.register(
+    "/all", "inflation_dashboard.dash.src.all_categories_tab:build_all_content"
+)
+
 app.layout = html.Div([dcc.Location(id="url"), sidebar, content])
 
 
+def preload() -> None:
+    """Load the data and build every page, e.g. in gunicorn's master before forking.
+
+    Ends the startup profile, if one is being recorded.
+    """
+    with profiling.phase("preload data"):
+        data.preload()
+    with profiling.phase("render pages"):
+        render_pages()
+    profiling.finish()
+
+
+def render_pages() -> None:
+    """Build every page for the current data version."""
+    for pathname in routes:
+        with profiling.phase(f"render {pathname}"):
+            routes.render(pathname)
+
+
+def start_refresher() -> None:
+    """Refresh the data in the background and rebuild the pages when it changes."""
+    scheduler.start_refresher(("cpi",), on_change=render_pages)
+
+
+PAGE_RENDER_SECONDS = metrics.Histogram(
+    "inflation_dashboard_page_render_seconds",
+    "Time to answer a page request, building the page if its data changed.",
+    ["route"],
+)
+
+if get_settings().metrics:
+
+    @server.route("/metrics")
+    def serve_metrics():
+        return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+
 @app.callback(Output("page-content", "children"), [Input("url", "pathname")])
 def render_page_content(pathname):
-    if pathname == "/":
-        return overview_content
-    elif pathname == "/coreandheadline":
-        return headline_and_core_content
-    elif pathname == "/food":
-        return food_content
-    elif pathname == "/energy":
-        return energy_content
-    elif pathname == "/education":
-        return edu_content
-    elif pathname == "/housing":
-        return housing_content
-    elif pathname == "/medical":
-        return medical_content
-    elif pathname == "/all":
-        return all_content
+    if pathname in routes:
+        with PAGE_RENDER_SECONDS.time(route=pathname):
+            return routes.render(pathname)
     # If the user tries to reach a different page, return a 404 message
     return html.Div(
         [
@@ -90,4 +135,7 @@ def render_page_content(pathname):
 
 
 if __name__ == "__main__":
+    if profiling.is_active():
+        preload()
+    start_refresher()
     app.run_server(host="0.0.0.0", port=8051, debug=True)
@@ -3,70 +3,57 @@
 import dash_bootstrap_components as dbc
 from dash import dcc, html
 
-from inflation_dashboard import cpi_series_column_name, inflation_long_df
-from inflation_dashboard.utils.pandas import (
-    calc_groupby_pct_chg,
-    pivot_pct_chg_tbl,
+from inflation_dashboard.dash.src.utils.figures import (
+    pct_chg_controls,
+    pct_chg_line_graph,
 )
-from inflation_dashboard.utils.plotly import _mk_line_plot
 
-mtm_pct_chg_df = calc_groupby_pct_chg(
-    df=inflation_long_df,
-    by=cpi_series_column_name,
-    periods=1,
-).dropna()
 
-yty_pct_chg_df = calc_groupby_pct_chg(
-    df=inflation_long_df,
-    by=cpi_series_column_name,
-    periods=12,
-).dropna()
-
-mtm_pct_chg_pivot_tbl = pivot_pct_chg_tbl(
-    df=mtm_pct_chg_df,
-    index_col=cpi_series_column_name,
-    pct_chg_col="pct_chg_value",
-)
-
-mtm_line_plot = _mk_line_plot(
-    df=mtm_pct_chg_df,
-    title="CPI for All Urban Consumers, All Categories 1-Month Percent Change",
-)
-
-yty_line_plot = _mk_line_plot(
-    df=yty_pct_chg_df,
-    title="CPI for All Urban Consumers, All Categories 12-Month Percent Change",
-)
-
-month_over_month_tab_content = dbc.Card(
-    dbc.CardBody([dcc.Graph(figure=mtm_line_plot)]),
-    class_name="mtm",
-)
-
-year_over_year_tab_content = dbc.Card(
-    dbc.CardBody([dcc.Graph(figure=yty_line_plot)]),
-    class_name="yty",
-)
-
-all_content = dbc.Container(
-    [
-        dcc.Store(id="store"),
-        html.H1("All CPI Categories"),
-        html.Hr(),
-        dcc.Markdown(
-            """
-            # Percent Change in All CPI Categories
-            """
-        ),
-        dbc.Tabs(
-            [
-                dbc.Tab(year_over_year_tab_content, label="Year-over-Year", id="yty"),
-                dbc.Tab(
-                    month_over_month_tab_content, label="Month-over-Month", id="mtm"
-                ),
-            ],
-            id="all_tabs",
-        ),
-        html.Div(id="tab-content", className="p-4"),
-    ]
-)
+def build_all_content() -> dbc.Container:
+    """Build the All Categories page."""
+    # Every series at once; the figures are downsampled and redrawn on zoom.
+    mtm_line_graph = pct_chg_line_graph(
+        page="all",
+        periods=1,
+        title="CPI for All Urban Consumers, All Categories 1-Month Percent Change",
+    )
+
+    yty_line_graph = pct_chg_line_graph(
+        page="all",
+        periods=12,
+        title="CPI for All Urban Consumers, All Categories 12-Month Percent Change",
+    )
+
+    month_over_month_tab_content = dbc.Card(
+        dbc.CardBody([mtm_line_graph]),
+        class_name="mtm",
+    )
+
+    year_over_year_tab_content = dbc.Card(
+        dbc.CardBody([yty_line_graph]),
+        class_name="yty",
+    )
+
+    return dbc.Container(
+        [
+            html.H1("All CPI Categories"),
+            html.Hr(),
+            dcc.Markdown(
+                """
+                # Percent Change in All CPI Categories
+                """
+            ),
+            pct_chg_controls("all"),
+            dbc.Tabs(
+                [
+                    dbc.Tab(
+                        year_over_year_tab_content, label="Year-over-Year", id="yty"
+                    ),
+                    dbc.Tab(
+                        month_over_month_tab_content, label="Month-over-Month", id="mtm"
+                    ),
+                ],
+                id="all_tabs",
+            ),
+        ]
+    )
@@ -3,13 +3,10 @@
 import dash_bootstrap_components as dbc
 from dash import dcc, html
 
-from inflation_dashboard import cpi_series_column_name, inflation_long_df
-from inflation_dashboard.utils.pandas import (
-    _get_subset_long_cpi_data,
-    calc_groupby_pct_chg,
-    pivot_pct_chg_tbl,
+from inflation_dashboard.dash.src.utils.figures import (
+    pct_chg_controls,
+    pct_chg_line_graph,
 )
-from inflation_dashboard.utils.plotly import _mk_line_plot
 
 category = "Food"
 food_series = [
@@ -18,61 +15,53 @@ food_series = [
     "Food away from home",
 ]
 
-long_df = _get_subset_long_cpi_data(long_df=inflation_long_df, series=food_series)
 
-mtm_pct_chg_df = calc_groupby_pct_chg(
-    df=long_df, by=cpi_series_column_name, periods=1
-).dropna()
+def build_food_content() -> dbc.Container:
+    """Build the Food page."""
+    mtm_line_graph = pct_chg_line_graph(
+        page="food",
+        periods=1,
+        title=f"CPI for All Urban Consumers, {category} 1-Month Percent Change",
+        series=food_series,
+    )
 
-yty_pct_chg_df = calc_groupby_pct_chg(
-    df=long_df, by=cpi_series_column_name, periods=12
-).dropna()
+    yty_line_graph = pct_chg_line_graph(
+        page="food",
+        periods=12,
+        title=f"CPI for All Urban Consumers, {category} 12-Month Percent Change",
+        series=food_series,
+    )
 
-mtm_pct_chg_pivot_tbl = pivot_pct_chg_tbl(
-    df=mtm_pct_chg_df,
-    index_col=cpi_series_column_name,
-    pct_chg_col="pct_chg_value",
-)
+    month_over_month_tab_content = dbc.Card(
+        dbc.CardBody([mtm_line_graph]),
+        class_name="mtm",
+    )
 
-mtm_line_plot = _mk_line_plot(
-    df=mtm_pct_chg_df,
-    title=f"CPI for All Urban Consumers, {category} 1-Month Percent Change",
-)
+    year_over_year_tab_content = dbc.Card(
+        dbc.CardBody([yty_line_graph]),
+        class_name="yty",
+    )
 
-yty_line_plot = _mk_line_plot(
-    df=yty_pct_chg_df,
-    title=f"CPI for All Urban Consumers, {category} 12-Month Percent Change",
-)
-
-month_over_month_tab_content = dbc.Card(
-    dbc.CardBody([dcc.Graph(figure=mtm_line_plot)]),
-    class_name="mtm",
-)
-
-year_over_year_tab_content = dbc.Card(
-    dbc.CardBody([dcc.Graph(figure=yty_line_plot)]),
-    class_name="yty",
-)
-
-food_content = dbc.Container(
-    [
-        dcc.Store(id="store"),
-        html.H1("Energy CPI"),
-        html.Hr(),
-        dcc.Markdown(
-            """
-            # Percent Change in Food Prices
-            """
-        ),
-        dbc.Tabs(
-            [
-                dbc.Tab(year_over_year_tab_content, label="Year-over-Year", id="yty"),
-                dbc.Tab(
-                    month_over_month_tab_content, label="Month-over-Month", id="mtm"
-                ),
-            ],
-            id="food_tabs",
-        ),
-        html.Div(id="tab-content", className="p-4"),
-    ]
-)
+    return dbc.Container(
+        [
+            html.H1("Energy CPI"),
+            html.Hr(),
+            dcc.Markdown(
+                """
+                # Percent Change in Food Prices
+                """
+            ),
+            pct_chg_controls("food", food_series),
+            dbc.Tabs(
+                [
+                    dbc.Tab(
+                        year_over_year_tab_content, label="Year-over-Year", id="yty"
+                    ),
+                    dbc.Tab(
+                        month_over_month_tab_content, label="Month-over-Month", id="mtm"
+                    ),
+                ],
+                id="food_tabs",
+            ),
+        ]
+    )
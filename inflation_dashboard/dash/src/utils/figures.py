@@ -0,0 +1,191 @@
+"""Interactive percent change line plots backed by the shared percent change cube.
+
+Each page gets a row of controls, from `pct_chg_controls`, to pick series and a date
+range, and any number of graphs, from `pct_chg_line_graph`. Graphs and controls are
+tied together by the page name in their pattern-matching ids. Changing a control or
+zooming a graph slices the cube and sends only the new traces to the browser as a
+`dash.Patch`; the layout of the figure already on screen is left alone.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+import dash_bootstrap_components as dbc
+import pandas as pd
+from dash import MATCH, Input, Output, Patch, State, callback, ctx, dcc
+from dash.exceptions import PreventUpdate
+
+from inflation_dashboard import metrics
+from inflation_dashboard.data import (
+    get_data_version,
+    get_pct_chg_cube,
+    get_series_options,
+)
+from inflation_dashboard.utils.pandas import slice_pct_chg_cube
+from inflation_dashboard.utils.plotly import _line_traces, _mk_line_plot, cached_figure
+
+GRAPH_TYPE = "pct-chg-line-plot"
+SERIES_TYPE = "pct-chg-series"
+YEARS_TYPE = "pct-chg-years"
+
+GRAPH_UPDATE_SECONDS = metrics.Histogram(
+    "inflation_dashboard_graph_update_seconds",
+    "Time to redraw a graph after a control change or zoom.",
+    ["page"],
+)
+
+
+def _slice(periods: int, series: Optional[Sequence[str]]) -> pd.DataFrame:
+    return slice_pct_chg_cube(get_pct_chg_cube(), periods=periods, series=series)
+
+
+def _year_bounds() -> List[int]:
+    dates = get_pct_chg_cube().index.levels[1]
+    return [dates[0].year, dates[-1].year]
+
+
+def _x_range(years: Optional[Sequence[int]]) -> Optional[Sequence[str]]:
+    """Date range covering ``years``; None when it covers every year in the data."""
+    if not years or list(years) == _year_bounds():
+        return None
+    return f"{years[0]}-01-01", f"{years[1]}-12-31"
+
+
+def pct_chg_controls(page: str, series: Optional[List[str]] = None) -> dbc.Row:
+    """Series and year range controls for the `pct_chg_line_graph` graphs of a page.
+
+    Parameters
+    ----------
+    page : str
+        Name of the page, shared with its graphs.
+    series : List[str] | None, optional
+        Series to choose from, all initially selected. Defaults to None, which offers
+        every series. Clearing the selection plots every series on offer.
+
+    Returns
+    -------
+    dbc.Row
+    """
+    options = series or get_series_options("cpi")
+    first_year, last_year = _year_bounds()
+    return dbc.Row(
+        [
+            dbc.Col(
+                dcc.Dropdown(
+                    id={"type": SERIES_TYPE, "page": page},
+                    options=options,
+                    value=series or [],
+                    multi=True,
+                    placeholder="All series",
+                ),
+                md=7,
+            ),
+            dbc.Col(
+                dcc.RangeSlider(
+                    id={"type": YEARS_TYPE, "page": page},
+                    min=first_year,
+                    max=last_year,
+                    step=1,
+                    value=[first_year, last_year],
+                    marks={
+                        year: str(year)
+                        for year in range(first_year - first_year % 10, last_year, 10)
+                        if year >= first_year
+                    },
+                    tooltip={"placement": "bottom"},
+                ),
+                md=5,
+            ),
+        ],
+        class_name="p-2",
+    )
+
+
+def pct_chg_line_graph(
+    page: str,
+    periods: int,
+    title: str,
+    series: Optional[List[str]] = None,
+) -> dcc.Graph:
+    """Line plot of the cached percent change cube, driven by the page's controls.
+
+    Large plots are downsampled by `_mk_line_plot`; zooming in redraws the traces
+    for the visible dates only, at full resolution, and resetting the axes restores
+    the downsampled overview. Figures are served from the shared figure cache.
+
+    Parameters
+    ----------
+    page : str
+        Name of the page, shared with its `pct_chg_controls`.
+    periods : int
+        Percent change period to plot.
+    title : str
+        Graph title.
+    series : List[str] | None, optional
+        Series initially plotted. Defaults to None, which plots every series.
+
+    Returns
+    -------
+    dcc.Graph
+    """
+    figure = cached_figure(
+        "line",
+        series,
+        periods,
+        get_data_version(),
+        lambda: _mk_line_plot(df=_slice(periods, series), title=title),
+        title=title,
+    )
+    return dcc.Graph(
+        id={"type": GRAPH_TYPE, "page": page, "periods": periods}, figure=figure
+    )
+
+
+def _zoomed_range(relayout_data: Dict[str, Any]) -> Optional[Sequence[str]]:
+    """The zoomed x axis range in a relayout event; None if it was not zoomed."""
+    if "xaxis.range[0]" in relayout_data:
+        return relayout_data["xaxis.range[0]"], relayout_data["xaxis.range[1]"]
+    return relayout_data.get("xaxis.range")
+
+
+@callback(
+    Output({"type": GRAPH_TYPE, "page": MATCH, "periods": MATCH}, "figure"),
+    Input({"type": SERIES_TYPE, "page": MATCH}, "value"),
+    Input({"type": YEARS_TYPE, "page": MATCH}, "value"),
+    Input({"type": GRAPH_TYPE, "page": MATCH, "periods": MATCH}, "relayoutData"),
+    State({"type": SERIES_TYPE, "page": MATCH}, "options"),
+    State({"type": GRAPH_TYPE, "page": MATCH, "periods": MATCH}, "id"),
+    prevent_initial_call=True,
+)
+def update_pct_chg_line_graph(series, years, relayout_data, options, graph_id):
+    """Redraw the traces for the selected series and the selected or zoomed dates."""
+    with GRAPH_UPDATE_SECONDS.time(page=graph_id["page"]):
+        return _update_pct_chg_line_graph(
+            series, years, relayout_data, options, graph_id
+        )
+
+
+def _update_pct_chg_line_graph(series, years, relayout_data, options, graph_id):
+    series = series or options
+    figure = Patch()
+    x_range = _x_range(years)
+    if ctx.triggered_id == graph_id:
+        relayout_data = relayout_data or {}
+        zoomed_range = _zoomed_range(relayout_data)
+        if zoomed_range is None and not relayout_data.get("xaxis.autorange"):
+            raise PreventUpdate
+        x_range = zoomed_range or x_range
+    elif x_range is None:
+        figure["layout"]["xaxis"]["autorange"] = True
+    else:
+        figure["layout"]["xaxis"]["range"] = list(x_range)
+
+    periods = graph_id["periods"]
+    figure["data"] = cached_figure(
+        "line_traces",
+        series,
+        periods,
+        get_data_version(),
+        lambda: _line_traces(_slice(periods, series), x_range=x_range),
+        x_range=tuple(x_range) if x_range is not None else None,
+    )
+    return figure
@@ -0,0 +1,90 @@
+"""Registry of Dash pages that are built lazily, on first visit."""
+
+import threading
+from importlib import import_module
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from inflation_dashboard.data import get_data_version
+
+
+class RouteRegistry:
+    """Map URL paths to page builder functions and memoize the built pages.
+
+    Builders are registered as ``"package.module:function"`` strings, so a page's module
+    is only imported, and its figures only built, when the page is first visited.
+    Built pages are kept until the data version changes, at which point every page
+    is evicted and rebuilt on its next visit.
+    """
+
+    def __init__(self):
+        self._builders: Dict[str, str] = {}
+        self._pages: Dict[str, Tuple[int, Any]] = {}
+        self._lock = threading.Lock()
+        self._path_locks: Dict[str, threading.Lock] = {}
+
+    def register(self, pathname: str, builder: str) -> None:
+        """Register a page builder.
+
+        Parameters
+        ----------
+        pathname : str
+            URL path of the page, e.g. "/energy".
+        builder : str
+            Import path of a zero argument function returning the page layout,
+            e.g. "inflation_dashboard.dash.src.energy_tab:build_energy_content".
+        """
+        self._builders[pathname] = builder
+
+    def __contains__(self, pathname: str) -> bool:
+        return pathname in self._builders
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._builders))
+
+    def _resolve(self, pathname: str) -> Callable[[], Any]:
+        module_name, func_name = self._builders[pathname].split(":")
+        return getattr(import_module(module_name), func_name)
+
+    def render(self, pathname: str) -> Optional[Any]:
+        """Return the page for ``pathname``, building it if needed. None if not registered."""
+        if pathname not in self._builders:
+            return None
+
+        version = get_data_version()
+        cached = self._pages.get(pathname)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        with self._lock:
+            path_lock = self._path_locks.setdefault(pathname, threading.Lock())
+
+        with path_lock:
+            cached = self._pages.get(pathname)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+            page = self._resolve(pathname)()
+            # Building a page may reload expired data, which moves the version.
+            version = get_data_version()
+            with self._lock:
+                self.evict(stale_only=True, version=version)
+                self._pages[pathname] = (version, page)
+            return page
+
+    def evict(self, stale_only: bool = False, version: Optional[int] = None) -> None:
+        """Drop built pages.
+
+        Parameters
+        ----------
+        stale_only : bool, optional
+            Only drop pages built for a data version other than ``version``.
+            Defaults to False, which drops every page.
+        version : int | None, optional
+            Current data version. Defaults to `get_data_version()`.
+        """
+        if not stale_only:
+            self._pages.clear()
+            return
+        if version is None:
+            version = get_data_version()
+        for pathname in [p for p, (v, _) in self._pages.items() if v != version]:
+            del self._pages[pathname]
@@ -0,0 +1,602 @@
+"""Lazily evaluated access to the FRED data behind the dashboards.
+
+Nothing is requested from FRED when this module is imported. Each accessor loads its
+data on first call and memoizes it in a process wide `TTLCache`, so later calls are
+free until the entry expires or `invalidate` is called.
+
+Series collections are persisted as versioned Arrow snapshots (see
+`inflation_dashboard.snapshot`). A cold start reads the latest snapshot when it is
+younger than the cache TTL, or when its vintage still matches the FRED
+``last_updated`` metadata, and only downloads observations otherwise. In offline mode
+data is served from snapshots alone.
+
+`refresh` brings the snapshots up to date incrementally, rebuilds the derived data on
+the side and swaps it all into the cache in one step. `reload` does the same from
+snapshots another process has written, without asking FRED. `renew` keeps the loaded
+data fresh in the cache while they fail. `inflation_dashboard.scheduler` runs them in
+the background.
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+import pandas as pd
+import pyfredapi as pf
+
+from inflation_dashboard import (
+    _parse_cpi_series_title,
+    cpi_series,
+    cpi_series_column_name,
+    metrics,
+    profiling,
+)
+from inflation_dashboard.catalog import SeriesCatalog
+from inflation_dashboard.config import get_settings
+from inflation_dashboard.fred import get_client
+from inflation_dashboard.refresh import RefreshResult, refresh_collection
+from inflation_dashboard.snapshot import (
+    Snapshot,
+    SnapshotNotFoundError,
+    compute_vintage,
+    find_snapshot,
+    latest_snapshot,
+    read_json,
+    write_json,
+    write_snapshot,
+)
+from inflation_dashboard.utils.cache import TTLCache, memoize
+from inflation_dashboard.utils.matrix import SeriesMatrix
+from inflation_dashboard.utils.pandas import (
+    DateIndex,
+    SeriesRegistry,
+    compact_long_df,
+)
+
+logger = logging.getLogger(__name__)
+
+CPI_CATEGORY_ID = "9"
+PERSONAL_INCOME_AND_OUTLAYS_CATEGORY_ID = "110"
+SPECIAL_INDEXES_CATEGORY_ID = "32424"
+# Categories crawled, with their subcategories, into the series catalog.
+CATALOG_CATEGORY_IDS = (CPI_CATEGORY_ID, SPECIAL_INDEXES_CATEGORY_ID)
+
+# Percent change periods, in months, precomputed for the CPI series.
+PCT_CHG_PERIODS = [1, 12]
+
+sticky_series_column_name = "sticky_cpi_series"
+pce_series_column_name = "pci_series"
+series_column_names = {
+    "cpi": cpi_series_column_name,
+    "sticky": sticky_series_column_name,
+    "pce": pce_series_column_name,
+}
+
+data_cache = TTLCache(ttl=get_settings().cache_ttl)
+
+_data_version = 0
+_data_version_lock = threading.Lock()
+_cpi_loaded = False
+# Vintage of the snapshot each loaded collection was read from, None if unsaved.
+_vintages: Dict[str, Optional[str]] = {}
+# Cache entries holding each collection and the data derived from it.
+_collection_keys = {
+    "cpi": ["cpi", "cpi_matrix", "cpi_pct_chg_cube", "cpi_date_index"],
+    "sticky": ["sticky"],
+    "pce": ["pce"],
+}
+# Series labels of each collection, so its categorical series column keeps the same
+# codes when a refresh adds rows or series.
+series_registries: Dict[str, SeriesRegistry] = {
+    name: SeriesRegistry() for name in series_column_names
+}
+
+Frames = Dict[str, pd.DataFrame]
+
+
+def get_data_version() -> int:
+    """Counter that changes whenever the CPI data is reloaded, refreshed or invalidated.
+
+    Anything derived from the data, such as a rendered page, can be keyed by this
+    version to know when it has gone stale.
+    """
+    return _data_version
+
+
+def get_data_age(name: str = "cpi") -> Optional[float]:
+    """Seconds since the snapshot a loaded collection was read from was written.
+
+    None when the collection is not loaded or was not snapshotted.
+    """
+    vintage = _vintages.get(name)
+    snapshot = find_snapshot(name, vintage) if vintage else None
+    return snapshot.age if snapshot is not None else None
+
+
+def _bump_data_version() -> None:
+    global _data_version
+    with _data_version_lock:
+        _data_version += 1
+
+
+metrics.registry.register_cache("data", data_cache)
+DATA_VERSION = metrics.Gauge(
+    "inflation_dashboard_data_version",
+    "Version of the CPI data being served.",
+    function=get_data_version,
+)
+DATA_AGE = metrics.Gauge(
+    "inflation_dashboard_data_age_seconds",
+    "Seconds since the snapshot of each loaded collection was written.",
+    ["collection"],
+    function=lambda: {(name,): get_data_age(name) for name in list(_vintages)},
+)
+
+
+def compact_frames(name: str, frames: Frames) -> Frames:
+    """Frames of a collection with the long frame in the compact form served from the
+    cache: categorical series labels, ``int32`` month ordinals in a ``period`` column
+    and, if configured, ``float32`` values. See `utils.pandas.compact_long_df`.
+    """
+    long_df = compact_long_df(
+        frames["long"],
+        by=series_column_names[name],
+        registry=series_registries[name],
+        float32=get_settings().float32_values,
+    )
+    return {**frames, "long": long_df}
+
+
+def _read_frames(snapshot: Snapshot) -> Frames:
+    return {frame: snapshot.read_frame(frame) for frame in snapshot.frames}
+
+
+def _read_collection(name: str, snapshot: Snapshot) -> Frames:
+    _vintages[name] = snapshot.vintage
+    with profiling.phase(f"snapshot {name}"):
+        return _read_frames(snapshot)
+
+
+def _load_category_series(category_id: str) -> Dict[str, pf.SeriesInfo]:
+    """Load a FRED category listing from disk when fresh, otherwise from FRED."""
+    settings = get_settings()
+    name = f"category_{category_id}"
+    stored = read_json(name, max_age=None if settings.offline else settings.cache_ttl)
+    if stored is not None:
+        return {sid: pf.SeriesInfo(**info) for sid, info in stored.items()}
+    if settings.offline:
+        raise SnapshotNotFoundError(
+            f"No stored listing for FRED category {category_id} in {settings.snapshot_dir}. "
+            "Run the dashboard once with network access to create it."
+        )
+
+    series = get_client().get_category_series(category_id)
+    try:
+        write_json(name, {sid: info.model_dump() for sid, info in series.items()})
+    except OSError:
+        logger.warning("Unable to store FRED category %s listing", category_id)
+    return series
+
+
+def _load_collection(
+    name: str,
+    series_id: Sequence[str],
+    col_name: str,
+    rename: Union[Callable[[str], str], None] = None,
+    base_series_id: Optional[str] = None,
+) -> Frames:
+    """Load the frames for a series collection, preferring an on-disk snapshot.
+
+    Parameters
+    ----------
+    name : str
+        Snapshot name of the collection.
+    series_id : Sequence[str]
+        Series in the collection.
+    col_name : str
+        Name of the series label column in the long frame.
+    rename : Callable[[str], str] | None, optional
+        Function to parse series titles into labels.
+    base_series_id : str | None, optional
+        If given, also build a wide frame as-of merged onto this series.
+
+    Returns
+    -------
+    Dict[str, pd.DataFrame]
+        The "long" frame, and the "wide" frame when ``base_series_id`` is given.
+    """
+    settings = get_settings()
+    snapshot = latest_snapshot(name)
+
+    if settings.offline:
+        if snapshot is None:
+            raise SnapshotNotFoundError(
+                f"No '{name}' snapshot in {settings.snapshot_dir}. "
+                "Run the dashboard once with network access to create it."
+            )
+        return _read_collection(name, snapshot)
+
+    if (
+        snapshot is not None
+        and set(snapshot.series) == set(series_id)
+        and snapshot.age < settings.cache_ttl
+    ):
+        return _read_collection(name, snapshot)
+
+    # Series metadata is cheap compared to observations, so check whether FRED has
+    # published anything new before downloading decades of history again.
+    if snapshot is not None:
+        last_updated = get_client().get_last_updated(series_id)
+        snapshot = find_snapshot(name, compute_vintage(last_updated))
+        if snapshot is not None:
+            return _read_collection(name, snapshot)
+
+    sc = get_client().get_series_collection(series_id, rename=rename)
+    frames = {"long": sc.merge_long(col_name=col_name)}
+    if base_series_id is not None:
+        frames["wide"] = sc.merge_asof(base_series_id=base_series_id)
+
+    try:
+        snapshot = write_snapshot(
+            name,
+            series={s.info.id: s.info.last_updated for s in sc},
+            frames=frames,
+        )
+    except OSError:
+        logger.warning("Unable to write '%s' snapshot", name)
+        _vintages[name] = None
+        return frames
+    # Serve the memory-mapped copy so processes share it through the page cache.
+    return _read_collection(name, snapshot)
+
+
+def get_category_series(category_id: str) -> Dict[str, pf.SeriesInfo]:
+    """Series metadata for a FRED category, keyed by series id."""
+    return data_cache.get_or_set(
+        ("category_series", category_id),
+        lambda: _load_category_series(category_id),
+    )
+
+
+def _load_series_catalog() -> SeriesCatalog:
+    """Load the series catalog from disk when fresh, otherwise crawl FRED for it."""
+    settings = get_settings()
+    stored = read_json(
+        "catalog", max_age=None if settings.offline else settings.catalog_ttl
+    )
+    if stored is not None:
+        return SeriesCatalog.from_dict(stored)
+    if settings.offline:
+        # Category listings stored before the catalog existed hold the same series.
+        return SeriesCatalog(
+            {
+                category_id: list(_load_category_series(category_id).values())
+                for category_id in CATALOG_CATEGORY_IDS
+            }
+        )
+
+    with profiling.phase("fred catalog"):
+        catalog = SeriesCatalog.crawl(CATALOG_CATEGORY_IDS)
+    try:
+        write_json("catalog", catalog.to_dict())
+    except OSError:
+        logger.warning("Unable to store the series catalog")
+    return catalog
+
+
+@memoize(data_cache, "catalog")
+def get_series_catalog() -> SeriesCatalog:
+    """Searchable metadata of every series under the CPI and special indexes categories.
+
+    The category tree is crawled once and stored on disk for
+    ``INFLATION_DASHBOARD_CATALOG_TTL`` seconds; see `inflation_dashboard.catalog`.
+    """
+    return _load_series_catalog()
+
+
+def get_series_options(name: str) -> List[str]:
+    """Labels of the series in a collection, in collection order, from the catalog.
+
+    For series selection widgets, so building one needs neither the collection's data
+    nor a scan of its category listing. Falls back to the labels in the loaded data
+    if the catalog is missing one of the series.
+    """
+    params = _collection_params(name)
+    labels = get_series_catalog().labels(params["series_id"], params.get("rename"))
+    if len(labels) < len(params["series_id"]):
+        long_df = {
+            "cpi": get_inflation_long_df,
+            "sticky": get_sticky_long_df,
+            "pce": get_pce_long_df,
+        }[name]()
+        labels = long_df[params["col_name"]].unique().tolist()
+    return labels
+
+
+def get_all_cpi_series() -> Dict[str, pf.SeriesInfo]:
+    """Series metadata for the FRED CPI category, keyed by series id."""
+    return {info.id: info for info in get_series_catalog().in_category(CPI_CATEGORY_ID)}
+
+
+def get_all_personal_income_and_outlays_series() -> Dict[str, pf.SeriesInfo]:
+    """Series metadata for the FRED personal income & outlays category, keyed by series id."""
+    return get_category_series(PERSONAL_INCOME_AND_OUTLAYS_CATEGORY_ID)
+
+
+@memoize(data_cache, "inflation_sc")
+def get_inflation_sc() -> pf.SeriesCollection:
+    """Series collection holding the tracked CPI series. Always requests FRED."""
+    return get_client().get_series_collection(
+        cpi_series, rename=_parse_cpi_series_title
+    )
+
+
+def _collection_params(name: str) -> Dict[str, Any]:
+    """Arguments describing a named series collection."""
+    if name == "cpi":
+        return dict(
+            series_id=cpi_series,
+            col_name=cpi_series_column_name,
+            rename=_parse_cpi_series_title,
+            base_series_id="CPIAUCSL",
+        )
+    if name == "sticky":
+        return dict(
+            series_id=[si.id for si in get_sticky_price_series()],
+            col_name=sticky_series_column_name,
+        )
+    if name == "pce":
+        return dict(
+            series_id=[si.id for si in get_pce_series()],
+            col_name=pce_series_column_name,
+        )
+    raise ValueError(f"Unknown series collection '{name}'")
+
+
+@memoize(data_cache, "cpi")
+def _get_cpi_frames() -> Frames:
+    global _cpi_loaded
+    frames = compact_frames("cpi", _load_collection("cpi", **_collection_params("cpi")))
+    # The first load defines version 0; reloads after the TTL expires move it.
+    if _cpi_loaded:
+        _bump_data_version()
+    _cpi_loaded = True
+    return frames
+
+
+def get_inflation_long_df() -> pd.DataFrame:
+    """Long dataframe of the tracked CPI series with columns date, value, cpi_series &
+    period, in the compact form made by `compact_frames`."""
+    return _get_cpi_frames()["long"]
+
+
+def get_inflation_wide_df() -> pd.DataFrame:
+    """Wide dataframe of the tracked CPI series, as-of merged onto CPIAUCSL dates."""
+    return _get_cpi_frames()["wide"]
+
+
+@memoize(data_cache, "cpi_matrix")
+def get_series_matrix() -> SeriesMatrix:
+    """The CPI series as a dense dates × series matrix, one column per series.
+
+    Built once per data refresh; use it for computations over every series at once,
+    and `SeriesMatrix.to_frame` for a wide dataframe view of it.
+    """
+    return SeriesMatrix.from_long_df(get_inflation_long_df(), by=cpi_series_column_name)
+
+
+@memoize(data_cache, "cpi_pct_chg_cube")
+def get_pct_chg_cube() -> pd.DataFrame:
+    """Percent changes of the CPI series for every period in `PCT_CHG_PERIODS`.
+
+    Indexed by (cpi_series, date, lag). Built from `get_series_matrix` once per data
+    refresh and shared by every dashboard page; take slices with
+    `utils.pandas.slice_pct_chg_cube`.
+    """
+    return get_series_matrix().pct_chg_cube(PCT_CHG_PERIODS)
+
+
+@memoize(data_cache, "cpi_date_index")
+def get_date_index() -> DateIndex:
+    """As-of index of the observation dates of each CPI series.
+
+    Built once per data refresh; use it for "vs. N months ago" lookups instead of
+    scanning the long dataframe.
+    """
+    return DateIndex.from_long_df(get_inflation_long_df(), by=cpi_series_column_name)
+
+
+def get_sticky_price_series() -> List[pf.SeriesInfo]:
+    """Metadata of the sticky price indexes in the FRED special indexes category."""
+    return get_series_catalog().search(
+        prefix="Sticky", category=SPECIAL_INDEXES_CATEGORY_ID
+    )
+
+
+@memoize(data_cache, "sticky")
+def get_sticky_long_df() -> pd.DataFrame:
+    """Long dataframe of the sticky price indexes, in the compact form."""
+    frames = _load_collection("sticky", **_collection_params("sticky"))
+    return compact_frames("sticky", frames)["long"]
+
+
+def get_pce_series() -> List[pf.SeriesInfo]:
+    """Metadata of the personal consumption expenditures price indexes."""
+    return get_series_catalog().search(
+        prefix="Personal Consumption Expenditures:", category=CPI_CATEGORY_ID
+    )
+
+
+@memoize(data_cache, "pce")
+def get_pce_long_df() -> pd.DataFrame:
+    """Long dataframe of the personal consumption expenditures price indexes, in the
+    compact form."""
+    frames = _load_collection("pce", **_collection_params("pce"))
+    return compact_frames("pce", frames)["long"]
+
+
+def preload(collections: Sequence[str] = ("cpi",)) -> None:
+    """Load collections and their derived data into the cache ahead of requests.
+
+    Call it in a server's parent process before forking workers, e.g. from a
+    gunicorn ``when_ready`` hook with ``preload_app``, so the workers inherit one
+    copy of the data instead of each loading their own.
+
+    Parameters
+    ----------
+    collections : Sequence[str], optional
+        Names of the collections to load: "cpi", "sticky" or "pce". Defaults to
+        "cpi", the only collection the Dash app uses.
+    """
+    loaders = {
+        "cpi": [_get_cpi_frames, get_series_matrix, get_pct_chg_cube, get_date_index],
+        "sticky": [get_sticky_long_df],
+        "pce": [get_pce_long_df],
+    }
+    for name in collections:
+        for loader in loaders[name]:
+            with profiling.phase(f"data {loader.__name__.lstrip('_')}"):
+                loader()
+
+
+def refresh(
+    collections: Sequence[str] = ("cpi", "sticky", "pce"),
+    full: bool = False,
+    loaded_only: bool = False,
+) -> Dict[str, RefreshResult]:
+    """Incrementally refresh series collections from FRED and update the cache.
+
+    The refreshed frames and the data derived from them are built before any of it
+    is swapped into the cache, in one step, so readers see either the old data or the
+    new data and never a mix, and never wait on a refresh. The data version moves only
+    when something changed; otherwise the cached entries just have their TTL renewed.
+
+    Parameters
+    ----------
+    collections : Sequence[str], optional
+        Names of the collections to refresh. Defaults to all of them.
+    full : bool, optional
+        Rebuild from scratch instead of only requesting new observations.
+        Defaults to False.
+    loaded_only : bool, optional
+        Skip collections this process has not loaded yet. Defaults to False.
+
+    Returns
+    -------
+    Dict[str, RefreshResult]
+        Refresh results keyed by collection name.
+    """
+    results = {}
+    for name in collections:
+        if loaded_only and name not in _vintages:
+            continue
+        results[name] = refresh_collection(name, full=full, **_collection_params(name))
+    _swap_in(results, touch=list(results))
+    return results
+
+
+def reload(collections: Sequence[str] = ("cpi", "sticky", "pce")) -> List[str]:
+    """Swap in the latest snapshots written by another process, without asking FRED.
+
+    Only collections this process has loaded are considered. Like `refresh`, the
+    data derived from a newer snapshot is built before it is all swapped into the
+    cache in one step, and the cached entries of the others have their TTL renewed.
+
+    Parameters
+    ----------
+    collections : Sequence[str], optional
+        Names of the collections to reload. Defaults to all of them.
+
+    Returns
+    -------
+    List[str]
+        Names of the collections a newer snapshot was swapped in for.
+    """
+    loaded = [name for name in collections if name in _vintages]
+    results = {}
+    for name in loaded:
+        snapshot = latest_snapshot(name)
+        if snapshot is None or snapshot.vintage == _vintages[name]:
+            continue
+        frames = _read_frames(snapshot)
+        results[name] = RefreshResult(
+            frames=frames,
+            new_df=frames["long"].iloc[:0],
+            updated_series=[],
+            vintage=snapshot.vintage,
+        )
+    _swap_in(results, touch=loaded)
+    return list(results)
+
+
+def renew(collections: Sequence[str] = ("cpi", "sticky", "pce")) -> None:
+    """Renew the TTL of the cached entries of loaded collections.
+
+    Called when a refresh fails, so the data loaded last keeps being served, even past
+    its TTL, instead of expiring and making requests wait on FRED.
+
+    Parameters
+    ----------
+    collections : Sequence[str], optional
+        Names of the collections to renew. Defaults to all of them.
+    """
+    data_cache.touch(
+        key
+        for name in collections
+        if name in _vintages
+        for key in _collection_keys[name]
+    )
+
+
+def _swap_in(results: Dict[str, RefreshResult], touch: Sequence[str]) -> None:
+    """Cache the data derived from refreshed collections in one step, and renew the
+    TTL of the cached entries of the ``touch`` collections.
+    """
+    updates: Dict[str, Any] = {}
+    for name, result in results.items():
+        # A newer snapshot written by another process also counts as a change.
+        if not result.changed and result.vintage == _vintages.get(name):
+            continue
+        if name == "cpi":
+            updates.update(_derive_cpi(result))
+        else:
+            updates[name] = compact_frames(name, result.frames)["long"]
+
+    if updates:
+        data_cache.set_many(updates)
+        for name, result in results.items():
+            _vintages[name] = result.vintage
+        _bump_data_version()
+    data_cache.touch(key for name in touch for key in _collection_keys[name])
+
+
+def _derive_cpi(result: RefreshResult) -> Dict[str, Any]:
+    """Cache entries for refreshed CPI frames, built without touching the cache."""
+    frames = compact_frames("cpi", result.frames)
+    long_df = frames["long"]
+    matrix = SeriesMatrix.from_long_df(long_df, by=cpi_series_column_name)
+    # Rebuilding the cube from the matrix takes a few vectorized steps over the whole
+    # history, less than splicing the changed months into the cached cube would.
+    return {
+        "cpi": frames,
+        "cpi_matrix": matrix,
+        "cpi_pct_chg_cube": matrix.pct_chg_cube(PCT_CHG_PERIODS),
+        "cpi_date_index": DateIndex.from_long_df(long_df, by=cpi_series_column_name),
+    }
+
+
+def invalidate(key: Optional[str] = None) -> None:
+    """Drop cached data so the next accessor call loads it again.
+
+    Parameters
+    ----------
+    key : str | None, optional
+        Name of the cached dataset: "cpi", "cpi_matrix", "cpi_pct_chg_cube",
+        "cpi_date_index", "sticky", "pce", "catalog" or "inflation_sc".
+        Defaults to None, which drops everything.
+    """
+    data_cache.invalidate(key)
+    if key == "cpi":
+        for derived in _collection_keys["cpi"][1:]:
+            data_cache.invalidate(derived)
+    _bump_data_version()
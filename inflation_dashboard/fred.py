@@ -0,0 +1,299 @@
+"""FRED API client with a pooled HTTP session, rate limiting, retries and concurrent fetches.
+
+`pyfredapi.SeriesCollection` requests its series one after another, so cold-start
+latency grows linearly with the number of series. `FredClient` issues the requests
+for a collection from a bounded thread pool over one pooled `requests.Session`,
+throttled by a token bucket to stay inside FRED's rate limit and retried with
+exponential backoff on transient failures. Results are assembled into a regular
+`pyfredapi.SeriesCollection`, so `merge_long` and `merge_asof` behave exactly as before.
+"""
+
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from http import HTTPStatus
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    TypeVar,
+    Union,
+)
+
+import pandas as pd
+import pyfredapi as pf
+import requests
+from pyfredapi.exceptions import APIKeyNotFound, FredAPIRequestError
+from requests.adapters import HTTPAdapter
+
+from inflation_dashboard import metrics, profiling
+from inflation_dashboard.config import get_settings
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+RETRY_STATUS_CODES = {
+    HTTPStatus.TOO_MANY_REQUESTS,
+    HTTPStatus.INTERNAL_SERVER_ERROR,
+    HTTPStatus.BAD_GATEWAY,
+    HTTPStatus.SERVICE_UNAVAILABLE,
+    HTTPStatus.GATEWAY_TIMEOUT,
+}
+FRED_DATE_COLS = ["date", "realtime_start", "realtime_end"]
+
+FRED_REQUEST_SECONDS = metrics.Histogram(
+    "inflation_dashboard_fred_request_seconds",
+    "Latency of each FRED request attempt, including failed ones.",
+    ["endpoint"],
+)
+FRED_ERRORS = metrics.Counter(
+    "inflation_dashboard_fred_errors_total",
+    "Failed FRED request attempts, by HTTP status or 'connection'.",
+    ["endpoint", "reason"],
+)
+
+
+class RateLimiter:
+    """Token bucket allowing ``rate`` requests per second with bursts of up to ``burst``."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a request may be made."""
+        if self.rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            # Reserve a token now and sleep off any deficit outside the lock.
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+
+
+def _observations_to_df(observations: List[Dict[str, Any]]) -> pd.DataFrame:
+    """Convert ``series/observations`` results the same way pyfredapi does."""
+    df = pd.DataFrame(observations)
+    for col in [c for c in df.columns if c in FRED_DATE_COLS]:
+        df[col] = pd.to_datetime(df[col], errors="coerce")
+    if "value" in df.columns:
+        df["value"] = pd.to_numeric(df["value"], errors="coerce")
+    return df
+
+
+class FredClient:
+    """Client for the FRED endpoints the dashboards use.
+
+    Parameters
+    ----------
+    api_key : str | None, optional
+        FRED API key. Defaults to the FRED_API_KEY environment variable.
+    base_url : str | None, optional
+        Base URL of the FRED API. Defaults to the configured URL.
+    max_workers : int | None, optional
+        Size of the thread pool used for concurrent requests. Defaults to the configured value.
+    rate_limit : float | None, optional
+        Requests per second. Defaults to the configured value.
+    burst : int | None, optional
+        Requests allowed in a burst above ``rate_limit``. Defaults to the configured value.
+    max_retries : int | None, optional
+        Retries for failed requests. Defaults to the configured value.
+    timeout : float, optional
+        Request timeout in seconds. Defaults to 30.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        rate_limit: Optional[float] = None,
+        burst: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        timeout: float = 30,
+    ):
+        settings = get_settings()
+        self.api_key = api_key or os.environ.get("FRED_API_KEY")
+        self.base_url = (base_url or settings.fred_base_url).rstrip("/")
+        self.max_workers = max_workers or settings.fred_max_workers
+        self.max_retries = (
+            max_retries if max_retries is not None else settings.fred_max_retries
+        )
+        self.timeout = timeout
+        self.rate_limiter = RateLimiter(
+            rate=rate_limit if rate_limit is not None else settings.fred_rate_limit,
+            burst=burst or settings.fred_burst,
+        )
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=self.max_workers, max_retries=0
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get(self, endpoint: str, **params: Any) -> Dict[str, Any]:
+        """Request a FRED endpoint and return the json response.
+
+        Transient failures, i.e. connection errors, timeouts, 429 and 5xx responses,
+        are retried with exponential backoff and jitter.
+
+        Raises
+        ------
+        FredAPIRequestError
+            If the request fails after all retries or FRED rejects it.
+        """
+        if self.api_key is None:
+            raise APIKeyNotFound()
+
+        query = {"api_key": self.api_key, "file_type": "json", **params}
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire()
+            try:
+                with FRED_REQUEST_SECONDS.time(endpoint=endpoint):
+                    response = self.session.get(
+                        f"{self.base_url}/{endpoint}",
+                        params=query,
+                        timeout=self.timeout,
+                    )
+            except requests.exceptions.RequestException as e:
+                FRED_ERRORS.inc(endpoint=endpoint, reason="connection")
+                error = FredAPIRequestError(
+                    message=f"Error invoking Fred API: {e}", status_code=None
+                )
+            else:
+                if response.status_code == HTTPStatus.OK:
+                    return response.json()
+                FRED_ERRORS.inc(endpoint=endpoint, reason=response.status_code)
+                error = FredAPIRequestError(
+                    message=self._error_message(response),
+                    status_code=response.status_code,
+                )
+                if response.status_code not in RETRY_STATUS_CODES:
+                    raise error
+
+            if attempt < self.max_retries:
+                time.sleep(0.5 * 2**attempt + random.uniform(0, 0.25))  # noqa: S311
+        raise error
+
+    @staticmethod
+    def _error_message(response: requests.Response) -> str:
+        try:
+            return response.json()["error_message"]
+        except (ValueError, KeyError):
+            return response.text
+
+    def map(self, func: Callable[[T], R], items: Iterable[T]) -> List[R]:
+        """Apply ``func`` to ``items`` on the client's bounded thread pool, preserving order."""
+        items = list(items)
+        if len(items) <= 1:
+            return [func(item) for item in items]
+        with ThreadPoolExecutor(
+            max_workers=min(self.max_workers, len(items)),
+            thread_name_prefix="fred",
+        ) as pool:
+            return list(pool.map(func, items))
+
+    def get_series_info(self, series_id: str) -> pf.SeriesInfo:
+        """Metadata of a series, from the ``series`` endpoint."""
+        response = self.get("series", series_id=series_id)
+        return pf.SeriesInfo(**response["seriess"][0])
+
+    def get_series(self, series_id: str, **params: Any) -> pd.DataFrame:
+        """Observations of a series, from the ``series/observations`` endpoint."""
+        response = self.get("series/observations", series_id=series_id, **params)
+        return _observations_to_df(response["observations"])
+
+    def get_category_series(self, category_id: str) -> Dict[str, pf.SeriesInfo]:
+        """Metadata of the series in a category, keyed by series id."""
+        response = self.get("category/series", category_id=category_id)
+        return {series["id"]: pf.SeriesInfo(**series) for series in response["seriess"]}
+
+    def get_category_children(self, category_id: str) -> List[str]:
+        """Ids of the subcategories of a category."""
+        response = self.get("category/children", category_id=category_id)
+        return [str(category["id"]) for category in response["categories"]]
+
+    def get_last_updated(self, series_id: Sequence[str]) -> Dict[str, str]:
+        """FRED ``last_updated`` timestamp of each series, requested concurrently."""
+        infos = self.map(self.get_series_info, series_id)
+        return {series_info.id: series_info.last_updated for series_info in infos}
+
+    def get_series_data(
+        self,
+        series_id: str,
+        rename: Union[Callable[[str], str], None] = None,
+        drop_realtime: bool = True,
+        **params: Any,
+    ) -> pf.SeriesData:
+        """Request a series' metadata and observations, labelled as `SeriesCollection` does."""
+        series_info = self.get_series_info(series_id)
+        df = self.get_series(series_id, **params)
+        if drop_realtime:
+            df = df.drop(columns=["realtime_start", "realtime_end"], errors="ignore")
+
+        series_name = rename(series_info.title) if rename is not None else None
+        if series_name is None:
+            series_name = series_info.id
+        df = df.rename(columns={"value": series_name})
+        return pf.SeriesData(info=series_info, df=df)
+
+    def get_series_collection(
+        self,
+        series_id: Sequence[str],
+        rename: Union[Callable[[str], str], None] = None,
+        **params: Any,
+    ) -> pf.SeriesCollection:
+        """Fetch every series concurrently into a `pyfredapi.SeriesCollection`.
+
+        Parameters
+        ----------
+        series_id : Sequence[str]
+            Series to fetch.
+        rename : Callable[[str], str] | None, optional
+            Function to parse series titles into labels. Defaults to the series id.
+        **params : dict, optional
+            Additional parameters to the ``series/observations`` endpoint.
+
+        Returns
+        -------
+        pf.SeriesCollection
+        """
+        with profiling.phase("fred get_series_collection"):
+            series_data = self.map(
+                lambda sid: self.get_series_data(sid, rename=rename, **params),
+                list(dict.fromkeys(series_id)),
+            )
+        sc = pf.SeriesCollection(series_id=[], api_key=self.api_key, rename=rename)
+        for data in series_data:
+            sc.data.append(data)
+            setattr(sc, data.info.id, data)
+        return sc
+
+
+@lru_cache(maxsize=None)
+def get_client() -> FredClient:
+    """Process wide FRED client, so every request shares one connection pool."""
+    return FredClient()
+
+
+# A forked child, e.g. a gunicorn worker, must not reuse the parent's pooled
+# connections or executor threads, which do not survive the fork.
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=get_client.cache_clear)
@@ -0,0 +1,582 @@
+"""Local stand-in for the FRED API, serving recorded responses.
+
+Serves the endpoints the dashboards request, ``category/children``,
+``category/series``, ``series`` and ``series/observations``, from json fixtures on
+disk, with optional latency and injected failures. Cold starts, refreshes and
+concurrency can then be measured reproducibly without network access. Point the
+dashboards at it with ``INFLATION_DASHBOARD_FRED_URL``; any ``FRED_API_KEY`` is
+accepted.
+
+    # record the live responses, which needs network access and a FRED_API_KEY
+    python -m inflation_dashboard.fred_server record fixtures/
+    # or generate random walks with the same shape, without network access
+    python -m inflation_dashboard.fred_server synthesize fixtures/
+    python -m inflation_dashboard.fred_server serve fixtures/ --latency 0.05 --failure-rate 0.01
+    INFLATION_DASHBOARD_FRED_URL=http://127.0.0.1:8089/fred FRED_API_KEY=stand-in \\
+        python inflation_dashboard/dash/app.py
+
+Fixtures are FRED's json responses stored as ``<fixtures>/<endpoint>/<id>.json``, where
+the id is the request's ``category_id`` or ``series_id``, e.g.
+``series/observations/CPIAUCSL.json``. They are read on every request, so editing them,
+e.g. with `publish_observation`, simulates FRED publishing new data while the server
+runs. Categories without a ``category/children`` fixture are served as having no
+subcategories.
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+from inflation_dashboard import cpi_series
+from inflation_dashboard.data import (
+    CATALOG_CATEGORY_IDS,
+    CPI_CATEGORY_ID,
+    PERSONAL_INCOME_AND_OUTLAYS_CATEGORY_ID,
+    SPECIAL_INDEXES_CATEGORY_ID,
+)
+from inflation_dashboard.fred import get_client
+
+# Endpoints served, and the query parameter naming the fixture of each.
+ENDPOINTS = {
+    "category/children": "category_id",
+    "category/series": "category_id",
+    "series": "series_id",
+    "series/observations": "series_id",
+}
+URL_PREFIX = "fred"
+DEFAULT_PORT = 8089
+
+# Labels of the tracked CPI series, for synthesized fixtures.
+CPI_SERIES_LABELS = {
+    "CPIAUCSL": "All Items",
+    "CPIUFDSL": "Food",
+    "CUSR0000SAF11": "Food at Home",
+    "CUSR0000SEFV": "Food Away from Home",
+    "CPIENGSL": "Energy",
+    "CUSR0000SETB01": "Gasoline (All Types)",
+    "CUUR0000SEHE": "Fuel Oil and Other Fuels",
+    "CUSR0000SEHF": "Energy Services",
+    "CUSR0000SACE": "Energy Commodities",
+    "CUSR0000SEHF01": "Electricity",
+    "CUSR0000SEHF02": "Utility (Piped) Gas Service",
+    "CPILFESL": "All Items Less Food and Energy",
+    "CUSR0000SACL1E": "Commodities Less Food and Energy Commodities",
+    "CUSR0000SETA01": "New Vehicles",
+    "CUSR0000SETA02": "Used Cars and Trucks",
+    "CPIAPPSL": "Apparel",
+    "CUUR0000SAM1": "Medical Care Commodities",
+    "CUSR0000SASLE": "Services Less Energy Services",
+    "CPIMEDSL": "Medical Care",
+    "CUSR0000SEEA": "Educational Books and Supplies",
+    "CUSR0000SEEB": "Tuition, Other School Fees, and Childcare",
+    "CUSR0000SEHA": "Rent of Primary Residence",
+    "CUSR0000SEHC": "Owners' Equivalent Rent of Residences",
+}
+PCE_SERIES_TITLES = {
+    "PCEPI": "Personal Consumption Expenditures: Chain-type Price Index",
+    "PCEPILFE": "Personal Consumption Expenditures Excluding Food and Energy (Chain-Type Price Index)",
+    "DGDSRG3M086SBEA": "Personal Consumption Expenditures: Goods (Chain-type Price Index)",
+}
+STICKY_SERIES_TITLES = {
+    "CORESTICKM159SFRBATL": "Sticky Price Consumer Price Index less Food and Energy",
+    "STICKCPIM157SFRBATL": "Sticky Price Consumer Price Index",
+    "FLEXCPIM679SFRBATL": "Flexible Price Consumer Price Index",
+}
+
+
+def fixture_path(root: Union[str, Path], endpoint: str, key: str) -> Path:
+    """Path of the fixture answering ``endpoint`` for a category or series id."""
+    return Path(root) / endpoint / f"{key}.json"
+
+
+def write_fixture(
+    root: Union[str, Path], endpoint: str, key: str, response: Dict[str, Any]
+) -> None:
+    """Store a FRED json response as a fixture."""
+    path = fixture_path(root, endpoint, key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(response))
+    tmp.replace(path)
+
+
+def read_fixture(
+    root: Union[str, Path], endpoint: str, key: str
+) -> Optional[Dict[str, Any]]:
+    """Load a fixture, or None if none was recorded for ``key``."""
+    path = fixture_path(root, endpoint, key)
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def _filter_observations(
+    response: Dict[str, Any], params: Dict[str, str]
+) -> Dict[str, Any]:
+    """Apply the ``observation_start`` and ``observation_end`` parameters."""
+    start = params.get("observation_start", "0000-00-00")
+    end = params.get("observation_end", "9999-12-31")
+    observations = [
+        obs for obs in response["observations"] if start <= obs["date"] <= end
+    ]
+    return {**response, "count": len(observations), "observations": observations}
+
+
+class FredRequestHandler(BaseHTTPRequestHandler):
+    """Answers FRED requests from the fixtures of its `FredServer`."""
+
+    server: "FredServer"
+
+    def do_GET(self) -> None:  # noqa: N802
+        url = urlparse(self.path)
+        endpoint = url.path.strip("/")
+        if endpoint.startswith(f"{URL_PREFIX}/"):
+            endpoint = endpoint[len(URL_PREFIX) + 1 :]
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        status, body = self.server.respond(endpoint, params)
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class FredServer(ThreadingHTTPServer):
+    """Threaded HTTP server standing in for the FRED API.
+
+    Parameters
+    ----------
+    fixtures : str | Path
+        Directory of recorded responses.
+    host : str, optional
+        Interface to listen on. Defaults to "127.0.0.1".
+    port : int, optional
+        Port to listen on. ``0`` picks a free port. Defaults to 8089.
+    latency : float, optional
+        Seconds added to every response. Defaults to 0.
+    jitter : float, optional
+        Up to this many seconds are added at random on top of ``latency``.
+        Defaults to 0.
+    failure_rate : float, optional
+        Fraction of requests answered with ``failure_status`` instead. Defaults to 0.
+    failure_status : int, optional
+        Status of injected failures. Defaults to 503, which the client retries.
+    seed : int | None, optional
+        Seed for the jitter and failure injection. Defaults to None.
+    verbose : bool, optional
+        Log every request to stderr. Defaults to False.
+
+    Attributes
+    ----------
+    requests : Counter
+        Number of requests received per endpoint, including failed ones.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        fixtures: Union[str, Path],
+        host: str = "127.0.0.1",
+        port: int = DEFAULT_PORT,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        failure_rate: float = 0.0,
+        failure_status: int = HTTPStatus.SERVICE_UNAVAILABLE,
+        seed: Optional[int] = None,
+        verbose: bool = False,
+    ):
+        super().__init__((host, port), FredRequestHandler)
+        self.fixtures = Path(fixtures)
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.failure_status = int(failure_status)
+        self.verbose = verbose
+        self.requests: Counter = Counter()
+        self._random = random.Random(seed)  # noqa: S311
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        """Base URL to set as ``INFLATION_DASHBOARD_FRED_URL``."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/{URL_PREFIX}"
+
+    def respond(
+        self, endpoint: str, params: Dict[str, str]
+    ) -> Tuple[int, Dict[str, Any]]:
+        """Status and json body answering a request."""
+        with self._lock:
+            self.requests[endpoint] += 1
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            failed = self._random.random() < self.failure_rate
+        if delay:
+            time.sleep(delay)
+        if failed:
+            return self.failure_status, _error(self.failure_status, "Injected failure.")
+
+        if endpoint not in ENDPOINTS:
+            return HTTPStatus.NOT_FOUND, _error(HTTPStatus.NOT_FOUND, "Not Found.")
+        if not params.get("api_key"):
+            return HTTPStatus.BAD_REQUEST, _error(
+                HTTPStatus.BAD_REQUEST, "Bad Request.  Variable api_key is not set."
+            )
+        key_param = ENDPOINTS[endpoint]
+        response = read_fixture(self.fixtures, endpoint, params.get(key_param, ""))
+        if response is None and endpoint == "category/children":
+            response = {"categories": []}
+        if response is None:
+            return HTTPStatus.BAD_REQUEST, _error(
+                HTTPStatus.BAD_REQUEST,
+                f"Bad Request.  No fixture for {key_param} {params.get(key_param)!r}.",
+            )
+        if endpoint == "series/observations":
+            response = _filter_observations(response, params)
+        return HTTPStatus.OK, response
+
+
+def _error(status: int, message: str) -> Dict[str, Any]:
+    return {"error_code": int(status), "error_message": message}
+
+
+@contextmanager
+def running_server(fixtures: Union[str, Path], **kwargs: Any) -> Iterator[FredServer]:
+    """Run a `FredServer` on a background thread for the duration of the block.
+
+    Takes the arguments of `FredServer`, except ``port`` defaults to a free port.
+    """
+    kwargs.setdefault("port", 0)
+    server = FredServer(fixtures, **kwargs)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+def record_fixtures(
+    root: Union[str, Path],
+    category_id: Sequence[str] = (
+        CPI_CATEGORY_ID,
+        PERSONAL_INCOME_AND_OUTLAYS_CATEGORY_ID,
+        SPECIAL_INDEXES_CATEGORY_ID,
+    ),
+    series_id: Optional[Sequence[str]] = None,
+) -> List[str]:
+    """Record live FRED responses as fixtures.
+
+    Parameters
+    ----------
+    root : str | Path
+        Fixture directory.
+    category_id : Sequence[str], optional
+        Categories to record listings of. Defaults to the categories the dashboards
+        list. The trees under the series catalog's categories are always recorded
+        whole, listings and subcategories.
+    series_id : Sequence[str] | None, optional
+        Series to record metadata and observations of. Defaults to None, which records
+        the series of every collection the dashboards load.
+
+    Returns
+    -------
+    List[str]
+        The recorded series ids.
+    """
+    client = get_client()
+    listed_category_id = list(dict.fromkeys(category_id))
+    n_requested = len(listed_category_id)
+    level = list(CATALOG_CATEGORY_IDS)
+    while level:
+        children = client.map(
+            lambda cid: client.get("category/children", category_id=cid), level
+        )
+        for cid, response in zip(level, children):
+            write_fixture(root, "category/children", cid, response)
+        level = [
+            str(category["id"])
+            for response in children
+            for category in response["categories"]
+            if str(category["id"]) not in listed_category_id
+        ]
+        listed_category_id.extend(level)
+
+    categories = client.map(
+        lambda cid: client.get("category/series", category_id=cid), listed_category_id
+    )
+    for cid, response in zip(listed_category_id, categories):
+        write_fixture(root, "category/series", cid, response)
+
+    if series_id is None:
+        listed = {
+            series["id"]: series["title"]
+            for response in categories[:n_requested]
+            for series in response["seriess"]
+        }
+        series_id = list(cpi_series) + [
+            sid
+            for sid, title in listed.items()
+            if title.startswith("Sticky")
+            or title.startswith("Personal Consumption Expenditures:")
+        ]
+
+    def record(sid: str) -> None:
+        for endpoint in ("series", "series/observations"):
+            write_fixture(root, endpoint, sid, client.get(endpoint, series_id=sid))
+
+    client.map(record, series_id)
+    return list(series_id)
+
+
+def _series_info(
+    series_id: str, title: str, start: str, end: str, last_updated: str
+) -> Dict[str, Any]:
+    today = pd.Timestamp.today().strftime("%Y-%m-%d")
+    return {
+        "id": series_id,
+        "realtime_start": today,
+        "realtime_end": today,
+        "title": title,
+        "observation_start": start,
+        "observation_end": end,
+        "frequency": "Monthly",
+        "frequency_short": "M",
+        "units": "Index 1982-1984=100",
+        "units_short": "Index 1982-1984=100",
+        "seasonal_adjustment": "Seasonally Adjusted",
+        "seasonal_adjustment_short": "SA",
+        "last_updated": last_updated,
+        "popularity": 50,
+        "notes": "Synthetic series served by inflation_dashboard.fred_server.",
+    }
+
+
+def synthesize_fixtures(
+    root: Union[str, Path],
+    n_months: int = 915,
+    extra_series: int = 0,
+    seed: int = 0,
+) -> List[str]:
+    """Write fixtures of random walk series shaped like the ones the dashboards load.
+
+    Covers the tracked CPI series, with their real titles, and a few personal
+    consumption expenditures and sticky price series, listed in the same categories
+    as on FRED.
+
+    Parameters
+    ----------
+    root : str | Path
+        Fixture directory.
+    n_months : int, optional
+        Monthly observations per series, ending last month. Defaults to 915, about
+        the history of CPIAUCSL.
+    extra_series : int, optional
+        Additional CPI series listed in the CPI category, for load tests of larger
+        catalogs. Defaults to 0.
+    seed : int, optional
+        Random seed. Defaults to 0.
+
+    Returns
+    -------
+    List[str]
+        The synthesized series ids.
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(
+        end=pd.Timestamp.today().normalize() - pd.offsets.MonthBegin(1),
+        periods=n_months,
+        freq="MS",
+    ).strftime("%Y-%m-%d")
+    last_updated = f"{dates[-1]} 07:38:01-05"
+
+    titles = {
+        sid: f"Consumer Price Index for All Urban Consumers: {label} in U.S. City Average"
+        for sid, label in CPI_SERIES_LABELS.items()
+    }
+    titles.update(
+        {
+            f"CUSR{i:08d}": f"Consumer Price Index for All Urban Consumers: Synthetic Item {i} in U.S. City Average"
+            for i in range(extra_series)
+        }
+    )
+    titles.update(PCE_SERIES_TITLES)
+    titles.update(STICKY_SERIES_TITLES)
+
+    infos = {}
+    for sid, title in titles.items():
+        steps = rng.normal(0.002, 0.004, n_months)
+        if sid in STICKY_SERIES_TITLES:
+            # The sticky price indexes are published as percent changes.
+            values = rng.normal(3, 1.5, n_months)
+        else:
+            values = 20 * np.exp(np.cumsum(steps))
+        write_fixture(
+            root,
+            "series/observations",
+            sid,
+            {
+                "observation_start": dates[0],
+                "observation_end": dates[-1],
+                "count": n_months,
+                "observations": [
+                    {
+                        "realtime_start": dates[-1],
+                        "realtime_end": dates[-1],
+                        "date": date,
+                        "value": f"{value:.3f}",
+                    }
+                    for date, value in zip(dates, values)
+                ],
+            },
+        )
+        infos[sid] = _series_info(sid, title, dates[0], dates[-1], last_updated)
+        write_fixture(root, "series", sid, {"seriess": [infos[sid]]})
+
+    listings = {
+        CPI_CATEGORY_ID: [sid for sid in titles if sid not in STICKY_SERIES_TITLES],
+        PERSONAL_INCOME_AND_OUTLAYS_CATEGORY_ID: list(PCE_SERIES_TITLES),
+        SPECIAL_INDEXES_CATEGORY_ID: list(STICKY_SERIES_TITLES),
+    }
+    for cid, listed in listings.items():
+        write_fixture(
+            root,
+            "category/series",
+            cid,
+            {"count": len(listed), "seriess": [infos[sid] for sid in listed]},
+        )
+        write_fixture(root, "category/children", cid, {"categories": []})
+    return list(titles)
+
+
+def publish_observation(
+    root: Union[str, Path],
+    series_id: str,
+    date: str,
+    value: float,
+    last_updated: Optional[str] = None,
+) -> None:
+    """Append an observation to a series' fixtures, as if FRED had just published it.
+
+    Parameters
+    ----------
+    root : str | Path
+        Fixture directory.
+    series_id : str
+        Series to update.
+    date : str
+        Observation date, as YYYY-MM-DD.
+    value : float
+        Observation value.
+    last_updated : str | None, optional
+        New ``last_updated`` timestamp of the series. Defaults to now.
+    """
+    if last_updated is None:
+        last_updated = pd.Timestamp.now(tz="UTC").strftime("%Y-%m-%d %H:%M:%S+00")
+
+    observations = read_fixture(root, "series/observations", series_id)
+    observations["observations"].append(
+        {
+            "realtime_start": date,
+            "realtime_end": date,
+            "date": date,
+            "value": str(value),
+        }
+    )
+    observations["observation_end"] = date
+    observations["count"] = len(observations["observations"])
+    write_fixture(root, "series/observations", series_id, observations)
+
+    info = read_fixture(root, "series", series_id)
+    info["seriess"][0].update(observation_end=date, last_updated=last_updated)
+    write_fixture(root, "series", series_id, info)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m inflation_dashboard.fred_server",
+        description=__doc__.split("\n")[0],
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="serve fixtures over HTTP")
+    serve.add_argument("fixtures", type=Path)
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve.add_argument(
+        "--latency", type=float, default=0.0, help="seconds per response"
+    )
+    serve.add_argument("--jitter", type=float, default=0.0, help="random extra seconds")
+    serve.add_argument("--failure-rate", type=float, default=0.0)
+    serve.add_argument(
+        "--failure-status", type=int, default=HTTPStatus.SERVICE_UNAVAILABLE
+    )
+    serve.add_argument("--seed", type=int)
+    serve.add_argument("--verbose", action="store_true")
+
+    record = commands.add_parser("record", help="record fixtures from the live API")
+    record.add_argument("fixtures", type=Path)
+    record.add_argument("--series", nargs="*", help="series ids to record")
+
+    synthesize = commands.add_parser(
+        "synthesize", help="write random walk fixtures without network access"
+    )
+    synthesize.add_argument("fixtures", type=Path)
+    synthesize.add_argument("--months", type=int, default=915)
+    synthesize.add_argument("--extra-series", type=int, default=0)
+    synthesize.add_argument("--seed", type=int, default=0)
+
+    args = parser.parse_args(argv)
+    if args.command == "record":
+        recorded = record_fixtures(args.fixtures, series_id=args.series or None)
+        print(f"Recorded {len(recorded)} series to {args.fixtures}")
+    elif args.command == "synthesize":
+        synthesized = synthesize_fixtures(
+            args.fixtures,
+            n_months=args.months,
+            extra_series=args.extra_series,
+            seed=args.seed,
+        )
+        print(f"Synthesized {len(synthesized)} series in {args.fixtures}")
+    else:
+        server = FredServer(
+            args.fixtures,
+            host=args.host,
+            port=args.port,
+            latency=args.latency,
+            jitter=args.jitter,
+            failure_rate=args.failure_rate,
+            failure_status=args.failure_status,
+            seed=args.seed,
+            verbose=args.verbose,
+        )
+        print(f"Serving {args.fixtures} at {server.url}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,434 @@
+"""Prometheus metrics for the dashboards, rendered without a client library.
+
+Metrics are declared as module level `Counter`, `Gauge` and `Histogram` objects in the
+modules they measure and registered in the process wide `registry`. `render` formats
+them in the Prometheus text exposition format; the Dash app serves it at ``/metrics``.
+
+Under gunicorn every worker records its own metrics. When ``metrics_dir`` is set, as
+``gunicorn.conf.py`` does, each worker writes its samples there every few seconds and
+``/metrics`` reports the sum over all workers, whichever worker answers the scrape.
+Counters and histograms of workers that have exited are kept so totals never go down:
+the first scrape after a worker exits folds its samples into one ``exited.json`` file
+and deletes the worker's own. Gauges are reported per live worker with a ``pid`` label.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: the files of exited workers are kept.
+    fcntl = None  # type: ignore[assignment]
+
+from inflation_dashboard.config import get_settings
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+# Seconds between writes of a worker's samples to the metrics directory.
+FLUSH_INTERVAL = 5.0
+# Summed counters and histograms of the workers that have exited, in the metrics dir.
+EXITED_FILE = "exited.json"
+EXITED_LOCK_FILE = "exited.lock"
+
+Labels = Tuple[str, ...]
+# (name suffix, label pairs, value)
+Sample = Tuple[str, Tuple[Tuple[str, str], ...], float]
+
+
+class Registry:
+    """Collection of the metrics rendered by `render`."""
+
+    def __init__(self):
+        self.metrics: Dict[str, "_Metric"] = {}
+        self.caches: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: "_Metric") -> None:
+        with self._lock:
+            if metric.name in self.metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self.metrics[metric.name] = metric
+
+    def register_cache(self, name: str, cache: Any) -> None:
+        """Report the ``hits`` and ``misses`` counters of a cache, labelled ``name``."""
+        self.caches[name] = cache
+
+    def reset(self) -> None:
+        """Zero every recorded value, e.g. in a worker forked from a loaded parent."""
+        for metric in self.metrics.values():
+            metric.reset()
+        for cache in self.caches.values():
+            cache.hits = cache.misses = 0
+
+    def collect(self) -> Dict[str, Dict[str, Any]]:
+        """Every metric's type, help text and samples, keyed by name."""
+        return {
+            name: {
+                "type": metric.type,
+                "help": metric.documentation,
+                "samples": list(metric.samples()),
+            }
+            for name, metric in self.metrics.items()
+        }
+
+
+registry = Registry()
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        function: Optional[Callable[[], Any]] = None,
+        registry: Registry = registry,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.function = function
+        self._values: Dict[Labels, Any] = {}
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def _key(self, labels: Dict[str, Any]) -> Labels:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _pairs(self, key: Labels) -> Tuple[Tuple[str, str], ...]:
+        return tuple(zip(self.labelnames, key))
+
+    def _function_values(self) -> Dict[Labels, float]:
+        value = self.function()  # type: ignore[misc]
+        if not self.labelnames:
+            return {} if value is None else {(): value}
+        return {key: v for key, v in value.items() if v is not None}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def samples(self) -> Iterator[Sample]:
+        values = self._function_values() if self.function is not None else self._values
+        with self._lock:
+            items = list(values.items())
+        for key, value in items:
+            yield "", self._pairs(key), float(value)
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, optionally read from ``function`` at scrape."""
+
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """Value that goes up and down, optionally read from ``function`` at scrape."""
+
+    type = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Distribution of observed values, e.g. latencies in seconds, in cumulative buckets."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        registry: Registry = registry,
+    ):
+        super().__init__(name, documentation, labelnames, registry=registry)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [0] * len(self.buckets) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            counts[-1] += value
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        """Observe the wall time of the enclosed block, even if it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> Iterator[Sample]:
+        with self._lock:
+            items = [(key, list(counts)) for key, counts in self._values.items()]
+        for key, counts in items:
+            pairs = self._pairs(key)
+            for bound, count in zip(self.buckets, counts):
+                yield "_bucket", pairs + (("le", _format_value(bound)),), count
+            yield "_sum", pairs, counts[-1]
+            yield "_count", pairs, counts[len(self.buckets) - 1]
+
+
+def _cache_counts(attribute: str) -> Callable[[], Dict[Labels, float]]:
+    def counts() -> Dict[Labels, float]:
+        return {
+            (name,): getattr(cache, attribute)
+            for name, cache in registry.caches.items()
+        }
+
+    return counts
+
+
+def _resident_memory() -> Optional[float]:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+CACHE_HITS = Counter(
+    "inflation_dashboard_cache_hits_total",
+    "Cache lookups answered from the cache.",
+    ["cache"],
+    function=_cache_counts("hits"),
+)
+CACHE_MISSES = Counter(
+    "inflation_dashboard_cache_misses_total",
+    "Cache lookups that had to load or build the value.",
+    ["cache"],
+    function=_cache_counts("misses"),
+)
+RESIDENT_MEMORY = Gauge(
+    "process_resident_memory_bytes",
+    "Resident memory size in bytes.",
+    function=_resident_memory,
+)
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if value == float("-inf"):
+        return "-Inf"
+    if value != value:
+        return "NaN"
+    return repr(float(value)) if value != int(value) else f"{int(value)}.0"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format(collected: Dict[str, Dict[str, Any]]) -> str:
+    lines = []
+    for name, metric in sorted(collected.items()):
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        for suffix, pairs, value in metric["samples"]:
+            labels = ",".join(f'{k}="{_escape(v)}"' for k, v in pairs)
+            labels = f"{{{labels}}}" if labels else ""
+            lines.append(f"{name}{suffix}{labels} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def _metrics_dir() -> Optional[Path]:
+    metrics_dir = get_settings().metrics_dir
+    return Path(metrics_dir) if metrics_dir else None
+
+
+def flush() -> None:
+    """Write this process's samples to the metrics directory, if one is configured."""
+    metrics_dir = _metrics_dir()
+    if metrics_dir is None:
+        return
+    metrics_dir.mkdir(parents=True, exist_ok=True)
+    _write_json(metrics_dir / f"{os.getpid()}.json", registry.collect())
+
+
+def _write_json(path: Path, collected: Dict[str, Dict[str, Any]]) -> None:
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(collected))
+    tmp.replace(path)
+
+
+def _read_json(path: Path) -> Optional[Dict[str, Dict[str, Any]]]:
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _merge(collected: List[Tuple[int, bool, Dict[str, Dict[str, Any]]]]) -> Dict:
+    """Sum counters and histograms over processes; label gauges with their pid."""
+    merged: Dict[str, Dict[str, Any]] = {}
+    for pid, alive, metrics in collected:
+        for name, metric in metrics.items():
+            target = merged.setdefault(
+                name, {"type": metric["type"], "help": metric["help"], "values": {}}
+            )
+            values = target["values"]
+            for suffix, pairs, value in metric["samples"]:
+                pairs = tuple(tuple(pair) for pair in pairs)
+                if metric["type"] == "gauge":
+                    if alive:
+                        values[(suffix, pairs + (("pid", str(pid)),))] = value
+                else:
+                    values[(suffix, pairs)] = values.get((suffix, pairs), 0) + value
+    return {
+        name: {
+            "type": metric["type"],
+            "help": metric["help"],
+            "samples": [(s, p, v) for (s, p), v in metric["values"].items()],
+        }
+        for name, metric in merged.items()
+    }
+
+
+def _fold_exited(metrics_dir: Path, paths: List[Path]) -> None:
+    """Add the samples in ``paths``, of exited workers, to the exited file and delete them.
+
+    Workers scraped at the same time take turns on a lock file, so each exited worker
+    is counted once.
+    """
+    with open(metrics_dir / EXITED_LOCK_FILE, "ab") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        exited_path = metrics_dir / EXITED_FILE
+        exited = _read_json(exited_path)
+        collected = [(0, False, exited)] if exited is not None else []
+        folded = []
+        for path in paths:
+            # Missing if another worker folded it while this one waited on the lock.
+            metrics = _read_json(path)
+            if metrics is not None:
+                collected.append((int(path.stem), False, metrics))
+                folded.append(path)
+        if not folded:
+            return
+        _write_json(exited_path, _merge(collected))
+        for path in folded:
+            path.unlink()
+            path.with_suffix(".tmp").unlink(missing_ok=True)
+
+
+def _collect_exited(
+    metrics_dir: Path, paths: List[Path]
+) -> List[Tuple[int, bool, Dict[str, Dict[str, Any]]]]:
+    """Samples of the exited workers, after folding the files in ``paths``."""
+    if fcntl is None:
+        collected = [(int(path.stem), False, _read_json(path)) for path in paths]
+    else:
+        if paths:
+            _fold_exited(metrics_dir, paths)
+        collected = [(0, False, _read_json(metrics_dir / EXITED_FILE))]
+    return [(pid, alive, metrics) for pid, alive, metrics in collected if metrics]
+
+
+def render() -> str:
+    """Every metric in the Prometheus text exposition format.
+
+    With a metrics directory configured, the samples of every worker are merged.
+    """
+    own = registry.collect()
+    metrics_dir = _metrics_dir()
+    if metrics_dir is None or not metrics_dir.exists():
+        return _format(own)
+
+    collected = [(os.getpid(), True, own)]
+    exited = []
+    for path in metrics_dir.glob("*.json"):
+        if path.name == EXITED_FILE:
+            continue
+        pid = int(path.stem)
+        if pid == os.getpid():
+            continue
+        if not _alive(pid):
+            exited.append(path)
+            continue
+        metrics = _read_json(path)
+        if metrics is not None:
+            collected.append((pid, True, metrics))
+    return _format(_merge(collected + _collect_exited(metrics_dir, exited)))
+
+
+class _Writer(threading.Thread):
+    def __init__(self, interval: float):
+        super().__init__(name="inflation-dashboard-metrics", daemon=True)
+        self.interval = interval
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            flush()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+
+_writer: Optional[_Writer] = None
+
+
+def start_writer(interval: float = FLUSH_INTERVAL) -> None:
+    """Write this process's samples to the metrics directory every ``interval`` seconds.
+
+    Does nothing when no metrics directory is configured.
+    """
+    global _writer
+    if _metrics_dir() is None or (_writer is not None and _writer.is_alive()):
+        return
+    _writer = _Writer(interval)
+    _writer.start()
+
+
+def stop_writer() -> None:
+    """Stop writing samples and write them one last time."""
+    if _writer is not None:
+        _writer.stop()
+    flush()
+
+
+def _after_fork_in_child() -> None:
+    global _writer
+    _writer = None
+    registry.reset()
+
+
+# A forked worker starts counting from zero rather than repeating what its parent
+# recorded, e.g. the misses of building every page in gunicorn's master.
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
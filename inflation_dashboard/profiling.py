@@ -0,0 +1,316 @@
+"""Startup profiler recording wall time and allocations per phase and per imported module.
+
+Set ``INFLATION_DASHBOARD_PROFILE_STARTUP`` to an output path prefix to profile a
+process's startup; ``{pid}`` in it is replaced with the process id. The profiler
+starts when `inflation_dashboard` is imported and times every module imported after
+it, nested the way ``python -X importtime`` nests them, along with the phases marked
+with `phase`: loading each dataset, requesting FRED, building figures and rendering
+pages. It stops at `finish`, which the Dash app calls once its pages are built, or
+when the process exits, and writes
+
+``<prefix>.json``
+    The phase and import tree with wall time and allocations of every node, and a
+    flat list of modules sorted by their own import time.
+``<prefix>.folded``
+    Wall time in microseconds as folded stacks, one ``root;phase;module count`` line
+    per node, for flamegraph.pl, speedscope or inferno.
+``<prefix>.alloc.folded``
+    Bytes allocated and still alive at the end of each node, as folded stacks.
+
+Allocations are traced with `tracemalloc`, which slows Python code down severalfold;
+set ``INFLATION_DASHBOARD_PROFILE_ALLOCATIONS=0`` for wall times closer to an
+unprofiled start. Only the thread that imported `inflation_dashboard` first is
+profiled: the main thread of a Dash server, or the script thread of Streamlit's
+first run.
+"""
+
+import atexit
+import importlib.abc
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from typing import Any, ContextManager, Dict, Iterator, List, Optional, Tuple
+
+from inflation_dashboard.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Span:
+    """A timed phase or module import, and the spans nested in it."""
+
+    name: str
+    kind: str
+    wall: float = 0.0
+    allocated: int = 0
+    peak: int = 0
+    children: List["Span"] = field(default_factory=list)
+    _started: float = 0.0
+    _memory: int = 0
+    _peak: int = 0
+
+    @property
+    def self_wall(self) -> float:
+        """Wall time not spent in nested spans."""
+        return max(self.wall - sum(child.wall for child in self.children), 0.0)
+
+    @property
+    def self_allocated(self) -> int:
+        """Allocations not made in nested spans."""
+        return self.allocated - sum(child.allocated for child in self.children)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "wall": self.wall,
+            "self_wall": self.self_wall,
+            "allocated": self.allocated,
+            "peak": self.peak,
+            "children": [child.to_dict() for child in self.children],
+        }
+
+
+class StartupProfiler:
+    """Records nested spans of wall time and traced memory on the starting thread.
+
+    Parameters
+    ----------
+    trace_allocations : bool, optional
+        Trace memory with `tracemalloc`. Defaults to True.
+    """
+
+    def __init__(self, trace_allocations: bool = True):
+        self.trace_allocations = trace_allocations
+        self.root = Span("startup", "process")
+        self._stack = [self.root]
+        self._finder = _ImportTimer(self)
+        self._thread = threading.current_thread()
+        self.active = False
+
+    def _memory(self) -> Tuple[int, int]:
+        if not self.trace_allocations:
+            return 0, 0
+        return tracemalloc.get_traced_memory()
+
+    def _enter(self, span: Span) -> None:
+        parent = self._stack[-1]
+        current, peak = self._memory()
+        parent._peak = max(parent._peak, peak)
+        span._started, span._memory, span._peak = time.perf_counter(), current, current
+        parent.children.append(span)
+        self._stack.append(span)
+        if self.trace_allocations and hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+
+    def _exit(self, span: Span) -> None:
+        current, peak = self._memory()
+        span.wall = time.perf_counter() - span._started
+        span.allocated = current - span._memory
+        span._peak = max(span._peak, peak)
+        span.peak = span._peak - span._memory
+        self._stack.pop()
+        parent = self._stack[-1]
+        parent._peak = max(parent._peak, span._peak)
+        if self.trace_allocations and hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+
+    @contextmanager
+    def span(self, name: str, kind: str = "phase") -> Iterator[None]:
+        """Record the enclosed block as a span nested in the current one."""
+        if not self.active or threading.current_thread() is not self._thread:
+            yield
+            return
+        span = Span(name, kind)
+        self._enter(span)
+        try:
+            yield
+        finally:
+            # Spans left open by an exception in a nested span are closed too.
+            while self._stack[-1] is not span:
+                self._exit(self._stack[-1])
+            self._exit(span)
+
+    def start(self) -> None:
+        """Start tracing and timing imports."""
+        if self.trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.active = True
+        sys.meta_path.insert(0, self._finder)
+        self.root._started = time.perf_counter()
+        self.root._memory = self.root._peak = self._memory()[0]
+
+    def stop(self) -> Dict[str, Any]:
+        """Stop profiling and return the report."""
+        if self._finder in sys.meta_path:
+            sys.meta_path.remove(self._finder)
+        while len(self._stack) > 1:
+            self._exit(self._stack[-1])
+        current, peak = self._memory()
+        self.root.wall = time.perf_counter() - self.root._started
+        self.root.allocated = current - self.root._memory
+        self.root.peak = max(self.root._peak, peak) - self.root._memory
+        self.active = False
+        if self.trace_allocations:
+            tracemalloc.stop()
+        return self.report()
+
+    def report(self) -> Dict[str, Any]:
+        """Phase and import tree, and modules sorted by their own import time."""
+        modules = [
+            {
+                "name": span.name,
+                "wall": span.wall,
+                "self_wall": span.self_wall,
+                "allocated": span.allocated,
+                "self_allocated": span.self_allocated,
+            }
+            for span in _walk(self.root)
+            if span.kind == "import"
+        ]
+        return {
+            "pid": os.getpid(),
+            "argv": sys.argv,
+            "trace_allocations": self.trace_allocations,
+            "wall": self.root.wall,
+            "allocated": self.root.allocated,
+            "peak": self.root.peak,
+            "tree": self.root.to_dict(),
+            "modules": sorted(modules, key=lambda m: m["self_wall"], reverse=True),
+        }
+
+    def folded(self, metric: str = "wall") -> List[str]:
+        """Folded stack lines of the span tree, weighted by ``metric``.
+
+        Parameters
+        ----------
+        metric : str, optional
+            "wall" for self wall time in microseconds, or "allocated" for bytes
+            allocated in each span itself. Defaults to "wall".
+
+        Returns
+        -------
+        List[str]
+        """
+        lines = []
+
+        def visit(span: Span, stack: str) -> None:
+            stack = f"{stack};{span.name}" if stack else span.name
+            if metric == "wall":
+                weight = int(span.self_wall * 1e6)
+            else:
+                weight = span.self_allocated
+            if weight > 0:
+                lines.append(f"{stack} {weight}")
+            for child in span.children:
+                visit(child, stack)
+
+        visit(self.root, "")
+        return lines
+
+
+def _walk(span: Span) -> Iterator[Span]:
+    yield span
+    for child in span.children:
+        yield from _walk(child)
+
+
+class _ImportTimer(importlib.abc.MetaPathFinder):
+    """Meta path finder wrapping each found module's ``exec_module`` in a span."""
+
+    def __init__(self, profiler: StartupProfiler):
+        self.profiler = profiler
+        self._finding = threading.local()
+
+    def find_spec(self, fullname, path, target=None):
+        if getattr(self._finding, "active", False):
+            return None
+        self._finding.active = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._finding.active = False
+
+        loader = spec.loader
+        # Builtin and frozen importers are classes shared by every module they load.
+        if loader is None or isinstance(loader, type):
+            return spec
+        exec_module = getattr(loader, "exec_module", None)
+        if exec_module is None:
+            return spec
+
+        def timed_exec_module(module):
+            with self.profiler.span(fullname, kind="import"):
+                exec_module(module)
+
+        try:
+            loader.exec_module = timed_exec_module
+        except AttributeError:
+            pass
+        return spec
+
+
+_profiler: Optional[StartupProfiler] = None
+_output: Optional[str] = None
+
+
+def start_from_env() -> Optional[StartupProfiler]:
+    """Start the profiler if ``INFLATION_DASHBOARD_PROFILE_STARTUP`` is set."""
+    global _profiler, _output
+    settings = get_settings()
+    if _profiler is not None or not settings.profile_startup:
+        return _profiler
+    _output = settings.profile_startup.format(pid=os.getpid())
+    _profiler = StartupProfiler(trace_allocations=settings.profile_allocations)
+    _profiler.start()
+    atexit.register(finish)
+    return _profiler
+
+
+def is_active() -> bool:
+    """Whether the startup profiler is running."""
+    return _profiler is not None and _profiler.active
+
+
+def phase(name: str) -> ContextManager[None]:
+    """Record the enclosed block as a startup phase. Does nothing when not profiling."""
+    if _profiler is None or not _profiler.active:
+        return nullcontext()
+    return _profiler.span(name)
+
+
+def finish() -> Optional[str]:
+    """Stop the profiler and write its report.
+
+    Returns
+    -------
+    str | None
+        Path of the json report, or None when the profiler was not running.
+    """
+    if not is_active():
+        return None
+    report = _profiler.stop()
+    path = f"{_output}.json"
+    with open(path, "w") as f:
+        json.dump(report, f, indent=1)
+    with open(f"{_output}.folded", "w") as f:
+        f.write("\n".join(_profiler.folded("wall")) + "\n")
+    if _profiler.trace_allocations:
+        with open(f"{_output}.alloc.folded", "w") as f:
+            f.write("\n".join(_profiler.folded("allocated")) + "\n")
+    logger.info("Startup took %.2fs, profile written to %s", report["wall"], path)
+    return path
@@ -0,0 +1,232 @@
+"""Incremental refresh of snapshotted series collections.
+
+FRED publishes one new monthly observation per CPI series at a time, so instead of
+rebuilding a `SeriesCollection` from scratch the refresher only requests observations
+newer than the last date held in the latest snapshot, for the series whose FRED
+``last_updated`` timestamp has moved. The new rows are appended to the long frame,
+the tail of the wide frame is re-merged, and a new snapshot vintage is written.
+
+Revisions to already published observations are not picked up by an incremental
+refresh; pass ``full=True`` to `refresh_collection` to rebuild from scratch.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Union
+
+import pandas as pd
+import pyfredapi as pf
+
+from inflation_dashboard.fred import get_client
+from inflation_dashboard.snapshot import latest_snapshot, write_snapshot
+from inflation_dashboard.utils.pandas import get_dates, sort_long_df
+
+Frames = Dict[str, pd.DataFrame]
+
+
+@dataclass
+class RefreshResult:
+    """Outcome of an incremental refresh.
+
+    Attributes
+    ----------
+    frames : Dict[str, pd.DataFrame]
+        The refreshed "long" frame, and "wide" frame if the collection has one.
+    new_df : pd.DataFrame
+        Rows appended to the long frame. Empty when nothing changed.
+    updated_series : List[str]
+        Series ids whose FRED ``last_updated`` timestamp changed.
+    vintage : str | None
+        Vintage of the snapshot holding the refreshed frames.
+    base_vintage : str | None
+        Vintage of the snapshot ``new_df`` was appended to. None for a full rebuild.
+    """
+
+    frames: Frames
+    new_df: pd.DataFrame
+    updated_series: List[str]
+    vintage: Optional[str] = None
+    base_vintage: Optional[str] = None
+
+    @property
+    def changed(self) -> bool:
+        """True if any observations were added."""
+        return not self.new_df.empty
+
+
+def _series_label(
+    series_info: pf.SeriesInfo, rename: Union[Callable[[str], str], None]
+) -> str:
+    """Label a series the same way `SeriesCollection` does."""
+    label = rename(series_info.title) if rename is not None else None
+    return label if label is not None else series_info.id
+
+
+def _fetch_new_observations(
+    series_id: str, after: Optional[pd.Timestamp]
+) -> pd.DataFrame:
+    """Request observations of a series dated after ``after``.
+
+    FRED can move a series' ``last_updated`` without publishing an observation, e.g.
+    for a metadata change, and then answers with no observations and no columns.
+    An empty frame with the usual columns is returned for it.
+    """
+    kwargs = {}
+    if after is not None:
+        kwargs["observation_start"] = str((after + pd.Timedelta(days=1)).date())
+    df = get_client().get_series(series_id, **kwargs)
+    if df.empty:
+        return pd.DataFrame(
+            {
+                "date": pd.Series(dtype="datetime64[ns]"),
+                "value": pd.Series(dtype="float64"),
+            }
+        )
+    return df[["date", "value"]]
+
+
+def merge_asof_tail(
+    wide_df: pd.DataFrame,
+    long_df: pd.DataFrame,
+    col_name: str,
+    base_label: str,
+    since: pd.Timestamp,
+) -> pd.DataFrame:
+    """Recompute the rows of an as-of merged wide frame dated on or after ``since``.
+
+    Parameters
+    ----------
+    wide_df : pd.DataFrame
+        Wide frame built with `SeriesCollection.merge_asof`.
+    long_df : pd.DataFrame
+        Long frame holding the same series, including any new observations.
+    col_name : str
+        Name of the series label column in ``long_df``.
+    base_label : str
+        Label of the series whose dates form the wide frame's rows.
+    since : pd.Timestamp
+        Earliest date that may have changed.
+
+    Returns
+    -------
+    pd.DataFrame
+    """
+    base = long_df.loc[
+        (long_df[col_name] == base_label) & (long_df["date"] >= since), ["date"]
+    ].sort_values("date")
+    tail = base.reset_index(drop=True)
+    for label in wide_df.columns.drop("date"):
+        series_df = (
+            long_df.loc[long_df[col_name] == label, ["date", "value"]]
+            .rename(columns={"value": label})
+            .sort_values("date")
+        )
+        tail = pd.merge_asof(left=tail, right=series_df, on="date")
+
+    head = wide_df[wide_df["date"] < since]
+    return pd.concat([head, tail[wide_df.columns]], ignore_index=True)
+
+
+def refresh_collection(
+    name: str,
+    series_id: Sequence[str],
+    col_name: str,
+    rename: Union[Callable[[str], str], None] = None,
+    base_series_id: Optional[str] = None,
+    full: bool = False,
+) -> RefreshResult:
+    """Bring a snapshotted series collection up to date with FRED.
+
+    Parameters
+    ----------
+    name : str
+        Snapshot name of the collection.
+    series_id : Sequence[str]
+        Series in the collection.
+    col_name : str
+        Name of the series label column in the long frame.
+    rename : Callable[[str], str] | None, optional
+        Function to parse series titles into labels.
+    base_series_id : str | None, optional
+        Series the wide frame is as-of merged onto, if the collection has one.
+    full : bool, optional
+        Rebuild from scratch instead of appending. Defaults to False.
+
+    Returns
+    -------
+    RefreshResult
+    """
+    snapshot = None if full else latest_snapshot(name)
+    if snapshot is None or set(snapshot.series) != set(series_id):
+        sc = get_client().get_series_collection(series_id, rename=rename)
+        frames = {"long": sc.merge_long(col_name=col_name)}
+        if base_series_id is not None:
+            frames["wide"] = sc.merge_asof(base_series_id=base_series_id)
+        snapshot = write_snapshot(
+            name, series={s.info.id: s.info.last_updated for s in sc}, frames=frames
+        )
+        return RefreshResult(
+            frames=frames,
+            new_df=frames["long"],
+            updated_series=list(series_id),
+            vintage=snapshot.vintage,
+        )
+
+    base_vintage = snapshot.vintage
+    frames = {frame: snapshot.read_frame(frame) for frame in snapshot.frames}
+    long_df = frames["long"]
+    last_updated = dict(snapshot.series)
+    client = get_client()
+    series_infos = {
+        series_info.id: series_info
+        for series_info in client.map(client.get_series_info, series_id)
+    }
+    labels = {sid: _series_label(info, rename) for sid, info in series_infos.items()}
+    stale = [
+        sid
+        for sid in series_id
+        if series_infos[sid].last_updated != snapshot.series[sid]
+    ]
+
+    def fetch(sid: str) -> pd.DataFrame:
+        series_df = long_df[long_df[col_name] == labels[sid]]
+        after = pd.Timestamp(get_dates(series_df).max) if len(series_df) else None
+        new_df = _fetch_new_observations(sid, after=after)
+        new_df[col_name] = labels[sid]
+        return new_df
+
+    # Series updated without new observations only have their timestamp recorded.
+    new_dfs = [new_df for new_df in client.map(fetch, stale) if not new_df.empty]
+    for sid in stale:
+        last_updated[sid] = series_infos[sid].last_updated
+
+    updated_series = [
+        sid for sid in series_id if last_updated[sid] != snapshot.series[sid]
+    ]
+    new_df = pd.concat(new_dfs, ignore_index=True) if new_dfs else long_df.iloc[:0]
+    new_df = new_df.dropna(subset=["value"])
+
+    if not new_df.empty:
+        long_df = sort_long_df(
+            pd.concat([long_df, new_df[long_df.columns]], ignore_index=True),
+            by=col_name,
+        )
+        frames["long"] = long_df
+        if "wide" in frames and base_series_id is not None:
+            frames["wide"] = merge_asof_tail(
+                frames["wide"],
+                long_df,
+                col_name=col_name,
+                base_label=labels[base_series_id],
+                since=new_df["date"].min(),
+            )
+
+    if updated_series:
+        snapshot = write_snapshot(name, series=last_updated, frames=frames)
+
+    return RefreshResult(
+        frames=frames,
+        new_df=new_df,
+        updated_series=updated_series,
+        vintage=snapshot.vintage,
+        base_vintage=base_vintage,
+    )
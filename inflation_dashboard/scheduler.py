@@ -0,0 +1,248 @@
+"""Background refresh of the cached data from FRED.
+
+`Refresher` is a daemon thread that calls `data.refresh` on a schedule: every
+``refresh_interval`` seconds, or every ``refresh_release_interval`` seconds during the
+morning of a CPI release day, when the BLS publishes at 8:30 ET and FRED follows
+within minutes. A refresh only asks FRED for series metadata unless something was
+published, and rebuilds the derived data before swapping it into the cache, so
+requests keep being served from the previous data while it runs. When a refresh fails,
+the cached data has its TTL renewed with `data.renew`, so it stays served until FRED
+answers again rather than expiring into a synchronous load.
+
+Threads do not survive a fork, so start the refresher in each server process after it
+has forked, e.g. from gunicorn's ``post_fork`` hook, with `start_refresher`. Processes
+sharing a snapshot directory elect one refresher through a lock file held for the life
+of the process: only that one polls FRED and writes snapshots, the others swap in the
+snapshots it writes with `data.reload`. If it exits, the next process to tick takes the
+lock over.
+"""
+
+import logging
+import random
+import threading
+from datetime import date
+from pathlib import Path
+from typing import IO, Callable, Iterable, Optional, Sequence, Set
+
+try:
+    import fcntl
+except ImportError:  # Windows: every process refreshes on its own.
+    fcntl = None  # type: ignore[assignment]
+
+import pandas as pd
+
+from inflation_dashboard import data
+from inflation_dashboard.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+RELEASE_TZ = "America/New_York"
+# The CPI is published at 8:30 ET on a weekday, usually between the 10th and 15th.
+RELEASE_DAYS = range(10, 16)
+RELEASE_HOURS = range(8, 12)
+# Fraction of the interval added or removed at random, so processes polling the same
+# snapshots do not all hit FRED at once.
+JITTER = 0.1
+LEADER_LOCK_FILE = "refresh.lock"
+
+
+def in_release_window(
+    now: Optional[pd.Timestamp] = None,
+    release_dates: Optional[Iterable[str]] = None,
+) -> bool:
+    """Whether ``now`` falls in the morning of a CPI release day, Eastern time.
+
+    Parameters
+    ----------
+    now : pd.Timestamp | None, optional
+        Timezone aware time to check. Defaults to None, the current time.
+    release_dates : Iterable[str] | None, optional
+        Known release dates as YYYY-MM-DD. Defaults to None, or if empty, which
+        treats every weekday in `RELEASE_DAYS` as a possible release day.
+
+    Returns
+    -------
+    bool
+    """
+    now = pd.Timestamp.now(tz=RELEASE_TZ) if now is None else now.tz_convert(RELEASE_TZ)
+    if now.hour not in RELEASE_HOURS:
+        return False
+    dates: Set[date] = {pd.Timestamp(d).date() for d in release_dates or ()}
+    if dates:
+        return now.date() in dates
+    return now.dayofweek < 5 and now.day in RELEASE_DAYS
+
+
+class LeaderLock:
+    """Non-blocking, process wide exclusive lock on a file.
+
+    Parameters
+    ----------
+    path : Path
+        Lock file, created if missing.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._file: Optional[IO[bytes]] = None
+
+    @property
+    def held(self) -> bool:
+        return self._file is not None
+
+    def acquire(self) -> bool:
+        """Take the lock unless another process holds it. Returns whether it is held."""
+        if self._file is not None or fcntl is None:
+            return True
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        lock_file = open(self.path, "ab")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._file = lock_file
+        return True
+
+    def release(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class Refresher(threading.Thread):
+    """Daemon thread refreshing loaded data collections from FRED on a schedule.
+
+    Parameters
+    ----------
+    collections : Sequence[str], optional
+        Collections to keep fresh. Only those the process has loaded are refreshed.
+        Defaults to "cpi".
+    on_change : Callable[[], None] | None, optional
+        Called after a refresh that changed the data, e.g. to rebuild pages ahead
+        of requests. Defaults to None.
+    interval : float | None, optional
+        Seconds between refreshes. Defaults to the configured ``refresh_interval``.
+    release_interval : float | None, optional
+        Seconds between refreshes in a release window. Defaults to the configured
+        ``refresh_release_interval``.
+    release_dates : Sequence[str] | None, optional
+        Known CPI release dates. Defaults to the configured ``release_dates``.
+    lock : LeaderLock | None, optional
+        Lock electing the process that refreshes from FRED. Defaults to None, a lock
+        file in the configured snapshot directory.
+    """
+
+    def __init__(
+        self,
+        collections: Sequence[str] = ("cpi",),
+        on_change: Optional[Callable[[], None]] = None,
+        interval: Optional[float] = None,
+        release_interval: Optional[float] = None,
+        release_dates: Optional[Sequence[str]] = None,
+        lock: Optional[LeaderLock] = None,
+    ):
+        super().__init__(name="inflation-dashboard-refresher", daemon=True)
+        settings = get_settings()
+        self.collections = tuple(collections)
+        self.on_change = on_change
+        self.interval = settings.refresh_interval if interval is None else interval
+        self.release_interval = (
+            settings.refresh_release_interval
+            if release_interval is None
+            else release_interval
+        )
+        self.release_dates = (
+            settings.release_dates if release_dates is None else release_dates
+        )
+        self.lock = (
+            LeaderLock(settings.snapshot_dir / LEADER_LOCK_FILE)
+            if lock is None
+            else lock
+        )
+        self._stopped = threading.Event()
+
+    def next_delay(self, now: Optional[pd.Timestamp] = None) -> float:
+        """Seconds to wait before the next refresh."""
+        interval = self.interval
+        if in_release_window(now, self.release_dates):
+            interval = min(interval, self.release_interval)
+        return interval * random.uniform(1 - JITTER, 1 + JITTER)
+
+    def refresh_once(self) -> bool:
+        """Refresh the collections now. Returns whether the data changed.
+
+        The elected process refreshes them from FRED, the others reload them from
+        the snapshots it wrote. If that fails, the cached data is renewed before the
+        error is raised.
+        """
+        version = data.get_data_version()
+        try:
+            if self.lock.acquire():
+                refreshed = list(data.refresh(self.collections, loaded_only=True))
+            else:
+                refreshed = data.reload(self.collections)
+        except Exception:
+            data.renew(self.collections)
+            raise
+        changed = data.get_data_version() != version
+        if changed:
+            logger.info(
+                "Refreshed %s, data version %d",
+                ", ".join(refreshed),
+                data.get_data_version(),
+            )
+            if self.on_change is not None:
+                self.on_change()
+        return changed
+
+    def run(self) -> None:
+        while not self._stopped.wait(self.next_delay()):
+            try:
+                self.refresh_once()
+            except Exception:
+                # The current data is still served; try again on the next tick.
+                logger.exception("Background refresh failed")
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the thread, waiting up to ``timeout`` seconds for a refresh in flight."""
+        self._stopped.set()
+        if self.is_alive():
+            self.join(timeout)
+        if not self.is_alive():
+            self.lock.release()
+
+
+_refresher: Optional[Refresher] = None
+_refresher_lock = threading.Lock()
+
+
+def start_refresher(
+    collections: Sequence[str] = ("cpi",),
+    on_change: Optional[Callable[[], None]] = None,
+) -> Optional[Refresher]:
+    """Start this process's background refresher, unless it is already running.
+
+    Does nothing in offline mode or when ``refresh_interval`` is 0.
+
+    Parameters
+    ----------
+    collections : Sequence[str], optional
+        Collections to keep fresh. Defaults to "cpi".
+    on_change : Callable[[], None] | None, optional
+        Called after a refresh that changed the data. Defaults to None.
+
+    Returns
+    -------
+    Refresher | None
+        The running refresher, or None when background refresh is disabled.
+    """
+    global _refresher
+    settings = get_settings()
+    if settings.offline or settings.refresh_interval <= 0:
+        return None
+    with _refresher_lock:
+        if _refresher is None or not _refresher.is_alive():
+            _refresher = Refresher(collections, on_change=on_change)
+            _refresher.start()
+    return _refresher
@@ -0,0 +1,248 @@
+"""Versioned on-disk snapshots of FRED data in Arrow IPC format.
+
+A snapshot holds the frames built from one series collection, e.g. the long and wide
+CPI frames, together with a manifest recording the FRED ``last_updated`` timestamp
+of every series. The vintage of a snapshot is derived from those timestamps, so a new
+FRED release produces a new snapshot directory rather than overwriting the old one::
+
+    <snapshot_dir>/<name>/<vintage>/manifest.json
+    <snapshot_dir>/<name>/<vintage>/<frame>.arrow
+    <snapshot_dir>/<name>/LATEST
+
+Frames are written uncompressed so they can be memory-mapped on read instead of
+being parsed into fresh buffers. Numeric and date columns of a frame read back are
+views of the mapped file, so every process reading the same snapshot shares one copy
+in the OS page cache. Those columns are read-only.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from inflation_dashboard.config import get_settings
+
+MANIFEST_FILE = "manifest.json"
+LATEST_FILE = "LATEST"
+
+
+class SnapshotNotFoundError(LookupError):
+    """Raised when a snapshot is required, e.g. in offline mode, but none exists."""
+
+
+@dataclass
+class Snapshot:
+    """A snapshot on disk.
+
+    Attributes
+    ----------
+    name : str
+        Name of the series collection, e.g. "cpi".
+    vintage : str
+        Identifier derived from the series ids and their FRED ``last_updated`` timestamps.
+    path : Path
+        Directory holding the snapshot.
+    series : Dict[str, str]
+        Series id to FRED ``last_updated`` timestamp.
+    created : float
+        Unix timestamp the snapshot was written.
+    frames : List[str]
+        Names of the frames stored in the snapshot.
+    """
+
+    name: str
+    vintage: str
+    path: Path
+    series: Dict[str, str]
+    created: float
+    frames: List[str] = field(default_factory=list)
+
+    @property
+    def age(self) -> float:
+        """Seconds since the snapshot was written."""
+        return time.time() - self.created
+
+    def read_frame(self, frame: str) -> pd.DataFrame:
+        """Read a frame by memory-mapping its Arrow IPC file.
+
+        Columns are kept in separate blocks so numeric and date columns are zero-copy
+        views of the mapping rather than being consolidated into new arrays.
+        """
+        table = feather.read_table(self.path / f"{frame}.arrow", memory_map=True)
+        return table.to_pandas(split_blocks=True)
+
+
+def snapshot_root(root: Optional[Path] = None) -> Path:
+    """Directory snapshots are stored in. Defaults to the configured snapshot directory."""
+    return Path(root) if root is not None else get_settings().snapshot_dir
+
+
+def compute_vintage(series: Dict[str, str]) -> str:
+    """Derive a snapshot vintage from series ids and their FRED ``last_updated`` timestamps."""
+    payload = json.dumps(sorted(series.items())).encode()
+    return hashlib.sha1(payload).hexdigest()[:16]  # noqa: S324
+
+
+def _read_manifest(path: Path) -> Snapshot:
+    manifest = json.loads((path / MANIFEST_FILE).read_text())
+    return Snapshot(
+        name=manifest["name"],
+        vintage=manifest["vintage"],
+        path=path,
+        series=manifest["series"],
+        created=manifest["created"],
+        frames=manifest["frames"],
+    )
+
+
+def find_snapshot(
+    name: str, vintage: str, root: Optional[Path] = None
+) -> Optional[Snapshot]:
+    """Get the snapshot for a given vintage, or None if it has not been written."""
+    path = snapshot_root(root) / name / vintage
+    if not (path / MANIFEST_FILE).exists():
+        return None
+    return _read_manifest(path)
+
+
+def latest_snapshot(name: str, root: Optional[Path] = None) -> Optional[Snapshot]:
+    """Get the most recently written snapshot, or None if there are no snapshots."""
+    latest = snapshot_root(root) / name / LATEST_FILE
+    if not latest.exists():
+        return None
+    return find_snapshot(name, latest.read_text().strip(), root=root)
+
+
+def _write_atomic_text(path: Path, text: str) -> None:
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}")
+    tmp.write_text(text)
+    os.replace(tmp, path)
+
+
+def write_snapshot(
+    name: str,
+    series: Dict[str, str],
+    frames: Dict[str, pd.DataFrame],
+    root: Optional[Path] = None,
+    keep: Optional[int] = None,
+) -> Snapshot:
+    """Write frames as a new snapshot and mark it as the latest.
+
+    The snapshot is assembled in a temporary directory and renamed into place, so
+    readers never observe a partially written snapshot. When several processes write
+    the same vintage at once, the first rename wins and the others keep its snapshot.
+
+    Parameters
+    ----------
+    name : str
+        Name of the series collection.
+    series : Dict[str, str]
+        Series id to FRED ``last_updated`` timestamp.
+    frames : Dict[str, pd.DataFrame]
+        Frames to store, keyed by frame name.
+    root : Path | None, optional
+        Snapshot directory. Defaults to the configured snapshot directory.
+    keep : int | None, optional
+        Number of vintages to retain. Defaults to the configured value.
+
+    Returns
+    -------
+    Snapshot
+    """
+    vintage = compute_vintage(series)
+    collection_dir = snapshot_root(root) / name
+    collection_dir.mkdir(parents=True, exist_ok=True)
+
+    tmp_dir = collection_dir / f".tmp-{uuid.uuid4().hex}"
+    tmp_dir.mkdir()
+    try:
+        for frame_name, df in frames.items():
+            table = pa.Table.from_pandas(
+                df.reset_index(drop=True), preserve_index=False
+            )
+            feather.write_feather(
+                table, tmp_dir / f"{frame_name}.arrow", compression="uncompressed"
+            )
+        manifest = {
+            "name": name,
+            "vintage": vintage,
+            "series": series,
+            "created": time.time(),
+            "frames": list(frames),
+        }
+        (tmp_dir / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2))
+
+        target = collection_dir / vintage
+        try:
+            os.replace(tmp_dir, target)
+            snapshot = Snapshot(path=target, **manifest)
+        except OSError:
+            # Another process, e.g. a sibling gunicorn worker refreshing too, wrote
+            # this vintage first. A vintage is derived from the series' timestamps,
+            # so that snapshot holds the same data: keep it rather than deleting files
+            # readers may have memory-mapped.
+            if not (target / MANIFEST_FILE).exists():
+                raise
+            snapshot = _read_manifest(target)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    _write_atomic_text(collection_dir / LATEST_FILE, vintage)
+    prune_snapshots(name, keep=keep, root=root)
+    return snapshot
+
+
+def prune_snapshots(
+    name: str, keep: Optional[int] = None, root: Optional[Path] = None
+) -> None:
+    """Delete all but the ``keep`` most recent vintages of a snapshot.
+
+    The vintage marked as the latest is never deleted.
+    """
+    if keep is None:
+        keep = get_settings().snapshot_keep
+    collection_dir = snapshot_root(root) / name
+    latest = latest_snapshot(name, root=root)
+    snapshots = []
+    for path in collection_dir.iterdir():
+        try:
+            snapshots.append(_read_manifest(path))
+        except (OSError, ValueError):
+            # Not a snapshot, or one another process is pruning at the same time.
+            continue
+    snapshots.sort(key=lambda s: s.created, reverse=True)
+    for snapshot in snapshots[max(keep, 1) :]:
+        if latest is None or snapshot.vintage != latest.vintage:
+            shutil.rmtree(snapshot.path, ignore_errors=True)
+
+
+def write_json(name: str, obj: Any, root: Optional[Path] = None) -> None:
+    """Persist JSON serializable metadata, e.g. a FRED category listing."""
+    path = snapshot_root(root) / "meta" / f"{name}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _write_atomic_text(path, json.dumps({"created": time.time(), "data": obj}))
+
+
+def read_json(
+    name: str, max_age: Optional[float] = None, root: Optional[Path] = None
+) -> Optional[Any]:
+    """Read metadata written with `write_json`.
+
+    Returns None if the metadata does not exist or is older than ``max_age`` seconds.
+    """
+    path = snapshot_root(root) / "meta" / f"{name}.json"
+    if not path.exists():
+        return None
+    payload = json.loads(path.read_text())
+    if max_age is not None and time.time() - payload["created"] > max_age:
+        return None
+    return payload["data"]
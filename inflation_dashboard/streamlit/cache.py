@@ -0,0 +1,149 @@
+"""Cached data, percent changes and figures for the Streamlit pages.
+
+Every function here is wrapped in a Streamlit cache that expires after the configured
+cache TTL. Arguments are hashed into the cache key, and each function takes the
+current ``data_version`` so results are recomputed after the data refreshes. Series
+selections must be passed as tuples so they hash the same regardless of the list
+object a widget returned.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+import streamlit as st
+from plotly.graph_objects import Figure
+
+from inflation_dashboard import scheduler
+from inflation_dashboard.config import get_settings
+from inflation_dashboard.data import (
+    get_data_version,
+    get_inflation_long_df,
+    get_pce_long_df,
+    get_pct_chg_cube,
+    get_series_options,
+    get_sticky_long_df,
+    series_column_names,
+)
+from inflation_dashboard.utils.pandas import (
+    Date,
+    calc_groupby_pct_chg,
+    get_dates,
+    slice_pct_chg_cube,
+    subset_long_df,
+)
+from inflation_dashboard.utils.plotly import _mk_bar_plot, _mk_line_plot
+
+CACHE_TTL = get_settings().cache_ttl
+
+_loaders = {
+    "cpi": get_inflation_long_df,
+    "sticky": get_sticky_long_df,
+    "pce": get_pce_long_df,
+}
+
+
+@st.cache_resource
+def _start_refresher() -> None:
+    scheduler.start_refresher(tuple(_loaders))
+
+
+def data_version() -> int:
+    """Current data version, to pass to the cached functions.
+
+    Also starts the background refresher on the first call, which bumps the version
+    whenever new data is swapped in.
+    """
+    _start_refresher()
+    return get_data_version()
+
+
+@st.cache_resource(ttl=CACHE_TTL, show_spinner="Loading data from FRED...")
+def load_long_df(collection: str, data_version: int) -> pd.DataFrame:
+    """Long dataframe of a series collection: "cpi", "sticky" or "pce".
+
+    Cached as a shared resource, so callers must not modify the returned frame.
+    """
+    return _loaders[collection]()
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def date_range(collection: str, data_version: int) -> Date:
+    """First and last observation dates of a collection."""
+    return get_dates(load_long_df(collection, data_version), "date")
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def series_options(collection: str, data_version: int) -> List[str]:
+    """Sorted labels of a collection's series, for its multiselects, from the catalog."""
+    return sorted(get_series_options(collection))
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def pct_chg(
+    collection: str,
+    periods: int,
+    series: Tuple[str, ...],
+    data_version: int,
+) -> pd.DataFrame:
+    """Percent change over ``periods`` months for the selected series, or all if empty."""
+    if collection == "cpi":
+        return slice_pct_chg_cube(
+            get_pct_chg_cube(), periods=periods, series=list(series)
+        )
+
+    series_col = series_column_names[collection]
+    long_df = subset_long_df(
+        load_long_df(collection, data_version), by=series_col, series=list(series)
+    )
+    return calc_groupby_pct_chg(df=long_df, by=series_col, periods=periods)
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def line_plot(
+    collection: str,
+    periods: int,
+    series: Tuple[str, ...],
+    title: str,
+    data_version: int,
+    plot_size: Optional[Dict[str, int]] = None,
+) -> Figure:
+    """Line plot of the percent change over ``periods`` months for the selected series."""
+    return _mk_line_plot(
+        df=pct_chg(collection, periods, series, data_version),
+        title=title,
+        series_column_name=series_column_names[collection],
+        plot_size=plot_size,
+    )
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def bar_plot(
+    collection: str,
+    series: Tuple[str, ...],
+    title: str,
+    data_version: int,
+    plot_size: Optional[Dict[str, int]] = None,
+) -> Figure:
+    """Grouped bar plot of the latest 1 & 12 month percent change for the selected series."""
+    series_col = series_column_names[collection]
+    bar_dfs = []
+    for periods, group in [
+        (1, "1 Month Percent Change"),
+        (12, "12 Month Percent Change"),
+    ]:
+        bar_df = (
+            pct_chg(collection, periods, series, data_version)
+            .groupby(series_col, observed=True)
+            .tail(1)
+            .reset_index(drop=True)
+        )
+        bar_df["group"] = group
+        bar_dfs.append(bar_df)
+
+    bar_plot_df = pd.concat(bar_dfs).sort_values(series_col).reset_index(drop=True)
+    return _mk_bar_plot(
+        df=bar_plot_df,
+        title=title,
+        series_column_name=series_col,
+        plot_size=plot_size,
+    )
@@ -0,0 +1,206 @@
+"""Thread-safe in-process memoization with a time to live or a size budget."""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import wraps
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class _Entry:
+    value: Any
+    expires_at: float
+
+
+class TTLCache:
+    """Memoizing cache whose entries expire ``ttl`` seconds after they are set.
+
+    Concurrent callers asking for the same missing key wait on a per-key lock,
+    so an expensive loader runs once per expiry rather than once per caller.
+    `get_or_set` counts hits, and misses that ran the loader.
+
+    Parameters
+    ----------
+    ttl : float
+        Seconds an entry stays fresh. ``0`` or less disables expiry.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[Hashable, _Entry] = {}
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+
+    def _fresh(self, entry: Optional[_Entry]) -> bool:
+        return entry is not None and (
+            self.ttl <= 0 or time.monotonic() < entry.expires_at
+        )
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for ``key`` or ``default`` if missing or stale."""
+        entry = self._entries.get(key)
+        return entry.value if self._fresh(entry) else default
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store ``value`` under ``key``."""
+        with self._lock:
+            self._entries[key] = _Entry(value, time.monotonic() + self.ttl)
+
+    def set_many(self, items: Dict[Hashable, Any]) -> None:
+        """Store several values at once, so readers never see only some of them."""
+        with self._lock:
+            expires_at = time.monotonic() + self.ttl
+            for key, value in items.items():
+                self._entries[key] = _Entry(value, expires_at)
+
+    def touch(self, keys: Optional[Iterable[Hashable]] = None) -> None:
+        """Restart the time to live of ``keys``, or of every entry when None."""
+        with self._lock:
+            expires_at = time.monotonic() + self.ttl
+            for key in list(self._entries) if keys is None else keys:
+                if key in self._entries:
+                    self._entries[key].expires_at = expires_at
+
+    def get_or_set(self, key: Hashable, loader: Callable[[], T]) -> T:
+        """Return the cached value for ``key``, calling ``loader`` to fill it on a miss."""
+        entry = self._entries.get(key)
+        if self._fresh(entry):
+            self.hits += 1
+            return entry.value  # type: ignore[union-attr]
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # Another thread may have filled the entry while we waited.
+            entry = self._entries.get(key)
+            if self._fresh(entry):
+                self.hits += 1
+                return entry.value  # type: ignore[union-attr]
+            self.misses += 1
+            value = loader()
+            self.set(key, value)
+            with self._lock:
+                self._key_locks.pop(key, None)
+            return value
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """Drop ``key`` from the cache, or every entry when ``key`` is None."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self._fresh(self._entries.get(key))
+
+
+class LRUCache:
+    """Memoizing cache bounded by the total size of its values in bytes.
+
+    When adding an entry would exceed ``max_bytes`` the least recently used entries
+    are evicted. Values larger than the whole budget are returned but not stored.
+    Hits and misses are counted so the cache's effectiveness can be monitored.
+
+    Parameters
+    ----------
+    max_bytes : int
+        Total size of the cached values, as measured by ``sizeof``.
+    sizeof : Callable[[Any], int], optional
+        Size of a value in bytes. Defaults to `sys.getsizeof`, which suits strings
+        and bytes but not containers.
+    """
+
+    def __init__(self, max_bytes: int, sizeof: Callable[[Any], int] = sys.getsizeof):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for ``key`` and mark it recently used, or ``default``."""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store ``value`` under ``key``, evicting least recently used entries to fit."""
+        size = self.sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self.nbytes -= self.sizeof(self._entries.pop(key))
+            if size > self.max_bytes:
+                return
+            while self.nbytes + size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.nbytes -= self.sizeof(evicted)
+            self._entries[key] = value
+            self.nbytes += size
+
+    def get_or_set(self, key: Hashable, loader: Callable[[], T]) -> T:
+        """Return the cached value for ``key``, calling ``loader`` to fill it on a miss."""
+        missing = object()
+        value = self.get(key, missing)
+        if value is not missing:
+            return value
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # Another thread may have filled the entry while we waited.
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    return self._entries[key]
+            value = loader()
+            self.set(key, value)
+            with self._lock:
+                self._key_locks.pop(key, None)
+            return value
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """Drop ``key`` from the cache, or every entry when ``key`` is None."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self.nbytes = 0
+            elif key in self._entries:
+                self.nbytes -= self.sizeof(self._entries.pop(key))
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def memoize(
+    cache: TTLCache, key: Hashable
+) -> Callable[[Callable[[], T]], Callable[[], T]]:
+    """Decorate a zero argument loader so its result is stored in ``cache`` under ``key``."""
+
+    def decorator(func: Callable[[], T]) -> Callable[[], T]:
+        @wraps(func)
+        def wrapper() -> T:
+            return cache.get_or_set(key, func)
+
+        return wrapper
+
+    return decorator
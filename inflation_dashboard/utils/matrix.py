@@ -0,0 +1,371 @@
+"""Dense dates × series matrix of a long dataframe, for whole-collection computations.
+
+`SeriesMatrix` places every observation of a long dataframe at (month, series) in one
+float matrix, with a validity mask and the series labels, so percent changes, rolling
+windows and latest-value lookups over every series are a few NumPy calls instead of a
+group by. Rows are consecutive calendar months, so a change over ``n`` periods compares
+values ``n`` months apart; for monthly series without gaps, like those FRED publishes,
+that is the same as `utils.pandas.calc_groupby_pct_chg`.
+
+The matrix is stored in Fortran order: each series is one contiguous column, which is
+also how pandas lays out the blocks of a float dataframe, so `SeriesMatrix.to_frame`
+and `SeriesMatrix.column` hand out views rather than copies.
+"""
+
+from typing import List, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from inflation_dashboard.utils.pandas import from_period_ordinal, to_period_ordinal
+
+
+class SeriesMatrix:
+    """Monthly observations of several series as a dense dates × series matrix.
+
+    Build with `SeriesMatrix.from_long_df`.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        ``(n_periods, n_series)`` float matrix; NaN where ``valid`` is False.
+    valid : np.ndarray
+        Boolean matrix of the same shape, True where a series has a value.
+    start : int
+        Month ordinal of the first row, see `utils.pandas.to_period_ordinal`.
+    labels : pd.Index
+        Series label of each column.
+    """
+
+    def __init__(
+        self,
+        values: np.ndarray,
+        valid: np.ndarray,
+        start: int,
+        labels: pd.Index,
+    ):
+        self.values = np.asfortranarray(values)
+        self.valid = np.asfortranarray(valid)
+        self.start = int(start)
+        self.labels = labels
+        self.periods = np.arange(
+            self.start, self.start + self.values.shape[0], dtype=np.int32
+        )
+        self.dates = from_period_ordinal(self.periods)
+        self._filled = None
+
+    @classmethod
+    def from_long_df(
+        cls,
+        df: pd.DataFrame,
+        by: str,
+        value_col: str = "value",
+        date_col: str = "date",
+        period_col: str = "period",
+    ) -> "SeriesMatrix":
+        """Build the matrix from a long dataframe.
+
+        Observations are placed directly at their month ordinal and series code, so
+        rows need not be sorted. If a series has several observations in a month,
+        the last one is kept.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            A long pandas dataframe, e.g. made by `utils.pandas.compact_long_df`.
+        by : str
+            Name of the column holding the series labels. Its categories, if it is
+            categorical, become the columns in order.
+        value_col : str, optional
+            Name of the values column. Defaults to "value".
+        date_col : str, optional
+            Name of the dates column, used when there is no ``period_col``.
+            Defaults to "date".
+        period_col : str, optional
+            Name of the month ordinal column. Defaults to "period".
+
+        Returns
+        -------
+        SeriesMatrix
+        """
+        column = df[by]
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            codes = column.cat.codes.to_numpy()
+            labels = pd.Index(column.cat.categories, name=by)
+        else:
+            codes, uniques = pd.factorize(column, sort=False)
+            labels = pd.Index(uniques, name=by)
+        if period_col in df:
+            periods = df[period_col].to_numpy()
+        else:
+            periods = to_period_ordinal(df[date_col])
+        values = df[value_col].to_numpy()
+        dtype = np.result_type(values.dtype, np.float32)
+
+        keep = (codes >= 0) & (periods != np.iinfo(np.int32).min)
+        codes, periods, values = codes[keep], periods[keep], values[keep]
+        start = int(periods.min()) if len(periods) else 0
+        n_periods = int(periods.max()) - start + 1 if len(periods) else 0
+
+        matrix = np.full((n_periods, len(labels)), np.nan, dtype=dtype, order="F")
+        matrix[periods - start, codes] = values
+        return cls(values=matrix, valid=~np.isnan(matrix), start=start, labels=labels)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.values.shape
+
+    def loc(self, series: Union[str, Sequence[str]]) -> np.ndarray:
+        """Column position of each label in ``series``; -1 for unknown labels."""
+        if isinstance(series, str):
+            series = [series]
+        return self.labels.get_indexer(list(series))
+
+    def column(self, series: str) -> np.ndarray:
+        """Values of one series, as a view of the matrix aligned with `dates`."""
+        position = self.loc(series)[0]
+        if position < 0:
+            raise KeyError(series)
+        return self.values[:, position]
+
+    def to_frame(self, values: Union[np.ndarray, None] = None) -> pd.DataFrame:
+        """Wide dataframe of ``values``, dates by series, without copying them.
+
+        Parameters
+        ----------
+        values : np.ndarray | None, optional
+            A matrix aligned with this one, e.g. from `SeriesMatrix.pct_change`.
+            Defaults to None, the values themselves.
+
+        Returns
+        -------
+        pd.DataFrame
+        """
+        values = self.values if values is None else values
+        return pd.DataFrame(
+            values,
+            index=pd.DatetimeIndex(self.dates, name="date"),
+            columns=pd.Index(np.asarray(self.labels), name=self.labels.name),
+            copy=False,
+        )
+
+    def filled(self) -> np.ndarray:
+        """Values forward filled down each series; NaN before its first value."""
+        if self._filled is None:
+            rows = np.arange(self.shape[0])[:, None]
+            last = np.where(self.valid, rows, -1)
+            np.maximum.accumulate(last, axis=0, out=last)
+            filled = np.take_along_axis(self.values, np.maximum(last, 0), axis=0)
+            filled[last < 0] = np.nan
+            self._filled = np.asfortranarray(filled)
+        return self._filled
+
+    def pct_change(self, periods: int = 1) -> np.ndarray:
+        """Percent change of every series over ``periods`` months.
+
+        Like `pd.Series.pct_change`, missing values are forward filled first. The
+        change is NaN where a series has no value, or none ``periods`` months before.
+
+        Returns
+        -------
+        np.ndarray
+            Matrix aligned with `values`.
+        """
+        filled = self.filled()
+        pct_chg = np.full(self.shape, np.nan, dtype=self.values.dtype, order="F")
+        if periods < self.shape[0]:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                np.divide(filled[periods:], filled[:-periods], out=pct_chg[periods:])
+            pct_chg[periods:] -= 1
+        pct_chg[~self.valid] = np.nan
+        return pct_chg
+
+    def pct_changes(self, periods: Sequence[int]) -> np.ndarray:
+        """`SeriesMatrix.pct_change` for several periods, stacked on a first axis."""
+        return np.stack([self.pct_change(lag) for lag in periods])
+
+    def rolling_mean(
+        self,
+        window: int,
+        values: Union[np.ndarray, None] = None,
+        min_periods: Union[int, None] = None,
+    ) -> np.ndarray:
+        """Mean of each series over the trailing ``window`` months.
+
+        Parameters
+        ----------
+        window : int
+            Months in the window, including the current one.
+        values : np.ndarray | None, optional
+            A matrix aligned with this one, e.g. from `SeriesMatrix.pct_change`.
+            Defaults to None, the values themselves.
+        min_periods : int | None, optional
+            Values the window must hold for a mean. Defaults to None, ``window``.
+
+        Returns
+        -------
+        np.ndarray
+            Matrix aligned with `values`; NaN where the window holds too few values.
+        """
+        values = self.values if values is None else values
+        min_periods = window if min_periods is None else min_periods
+        present = ~np.isnan(values)
+        totals = np.cumsum(np.where(present, values, 0), axis=0, dtype=np.float64)
+        counts = np.cumsum(present, axis=0)
+        totals[window:] -= totals[:-window].copy()
+        counts[window:] -= counts[:-window].copy()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = totals / counts
+        mean[counts < max(min_periods, 1)] = np.nan
+        return np.asfortranarray(mean.astype(values.dtype, copy=False))
+
+    def latest(
+        self, values: Union[np.ndarray, None] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Row of the latest non-missing entry of each series, and the entry.
+
+        Parameters
+        ----------
+        values : np.ndarray | None, optional
+            A matrix aligned with this one. Defaults to None, the values themselves.
+
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray]
+            Row positions, -1 for a series with no entry, and the entries, NaN for
+            those series.
+        """
+        values = self.values if values is None else values
+        present = ~np.isnan(values)
+        rows = values.shape[0] - 1 - np.argmax(present[::-1], axis=0)
+        rows[~present.any(axis=0)] = -1
+        latest = values[np.maximum(rows, 0), np.arange(values.shape[1])]
+        latest[rows < 0] = np.nan
+        return rows, latest
+
+    def latest_pct_chg_df(
+        self,
+        periods: int,
+        value_col: str = "value",
+        series: Union[List[str], str, None] = None,
+    ) -> pd.DataFrame:
+        """Latest percent change over ``periods`` months of each series.
+
+        Has the columns `SeriesMatrix.pct_chg_long_df` has, one row per series, as
+        the last row of each series in its output would be.
+
+        Parameters
+        ----------
+        periods : int
+            Months to compare over.
+        value_col : str, optional
+            Name to give the values column. Defaults to "value".
+        series : List[str] | str | None, optional
+            Series to take. Defaults to None, which takes every series.
+
+        Returns
+        -------
+        pd.DataFrame
+        """
+        rows, pct_chg = self.latest(self.pct_change(periods))
+        columns = np.arange(self.shape[1])
+        if series is not None:
+            columns = self.loc(series)
+            columns = columns[columns >= 0]
+        columns = columns[rows[columns] >= 0]
+        rows = rows[columns]
+        return self._long_df(
+            rows, columns, value_col, {"pct_chg_" + value_col: pct_chg[columns]}
+        )
+
+    def pct_chg_long_df(
+        self,
+        periods: Union[int, List[int]] = 1,
+        value_col: str = "value",
+        period_col: str = "lag",
+    ) -> pd.DataFrame:
+        """Long dataframe of percent changes, like `utils.pandas.calc_groupby_pct_chg`.
+
+        Rows are ordered by series, in column order, then date, and are kept where the
+        change is defined.
+
+        Parameters
+        ----------
+        periods : int | List[int], optional
+            Months to compare over. When a list is given, the results for every
+            period are stacked and labelled in ``period_col``. Defaults to 1.
+        value_col : str, optional
+            Name to give the values column. Defaults to "value".
+        period_col : str, optional
+            Name of the column holding the period when ``periods`` is a list.
+            Defaults to "lag".
+
+        Returns
+        -------
+        pd.DataFrame
+        """
+        lags = [periods] if isinstance(periods, int) else list(periods)
+        positions, pct_chgs = [], []
+        for lag in lags:
+            # Fortran order ravels series by series, each in date order.
+            flat = self.pct_change(lag).ravel(order="F")
+            keep = np.flatnonzero(~np.isnan(flat))
+            positions.append(keep)
+            pct_chgs.append(flat[keep])
+
+        columns, rows = np.divmod(np.concatenate(positions), self.shape[0])
+        extra = {"pct_chg_" + value_col: np.concatenate(pct_chgs)}
+        if not isinstance(periods, int):
+            extra[period_col] = np.repeat(lags, [len(keep) for keep in positions])
+        return self._long_df(rows, columns, value_col, extra)
+
+    def pct_chg_cube(
+        self,
+        periods: List[int],
+        value_col: str = "value",
+        period_col: str = "lag",
+    ) -> pd.DataFrame:
+        """`SeriesMatrix.pct_chg_long_df` for several periods, indexed as a cube.
+
+        The result is indexed by (series, date, period) so consumers can take what
+        they need with `utils.pandas.slice_pct_chg_cube` instead of recomputing
+        percent changes. Rows are ordered by period, then series, then date.
+
+        Parameters
+        ----------
+        periods : List[int]
+            Months to compare over.
+        value_col : str, optional
+            Name to give the values column. Defaults to "value".
+        period_col : str, optional
+            Name of the period index level. Defaults to "lag".
+
+        Returns
+        -------
+        pd.DataFrame
+        """
+        pct_chg_df = self.pct_chg_long_df(
+            list(periods), value_col=value_col, period_col=period_col
+        )
+        return pct_chg_df.set_index([self.labels.name, "date", period_col])
+
+    def _long_df(
+        self,
+        rows: np.ndarray,
+        columns: np.ndarray,
+        value_col: str,
+        extra: dict,
+    ) -> pd.DataFrame:
+        """Long dataframe of the entries at ``rows`` and ``columns``."""
+        by = self.labels.name
+        return pd.DataFrame(
+            {
+                "date": self.dates[rows],
+                value_col: self.values[rows, columns],
+                by: pd.Categorical.from_codes(
+                    columns, dtype=pd.CategoricalDtype(self.labels.rename(None))
+                ),
+                "period": self.periods[rows],
+                **extra,
+            }
+        )
@@ -0,0 +1,49 @@
+"""Notebook presentation helpers for the dataframes built by `utils.pandas`.
+
+Needs IPython, which is not a dependency of the dashboards; install it with the
+``notebook`` extra, ``pip install inflation-dashboard[notebook]``.
+"""
+
+import pandas as pd
+
+try:
+    from IPython.display import display
+except ImportError as e:
+    raise ImportError(
+        "inflation_dashboard.utils.notebook requires IPython. "
+        "Install it with `pip install inflation-dashboard[notebook]`."
+    ) from e
+
+
+def display_pct_chg_df(df: pd.DataFrame, title: str) -> None:
+    """Applies formatting and title to table and displays.
+
+    Designed to used with the `pivot_pct_chg_tbl` function.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Pandas dataframe.
+    title : str
+        Table title.
+
+    Returns
+    -------
+    None
+    """
+    display(
+        df.style.format("{:.1%}")
+        .set_caption(f"{title}")
+        .set_table_styles(
+            [
+                {
+                    "selector": "caption",
+                    "props": [
+                        ("font-size", "18px"),
+                        ("font-weight", "bold"),
+                        ("text-align", "center"),
+                    ],
+                }
+            ]
+        )
+    )
@@ -1,10 +1,11 @@
 import datetime
+import threading
 from dataclasses import dataclass
-from typing import List, Union
+from typing import Dict, Iterable, List, Tuple, Union
 
+import numpy as np
 import pandas as pd
 from dateutil.relativedelta import relativedelta
-from IPython.display import display
 
 
 @dataclass
@@ -34,6 +35,361 @@ def get_dates(df: pd.DataFrame, date_col: str = "date") -> Date:
     return Date(min=min_date, max=max_date)
 
 
+# Month ordinals are months since January 1970, the epoch of ``datetime64[M]``.
+PERIOD_NA = np.iinfo(np.int32).min
+
+
+def to_period_ordinal(dates) -> np.ndarray:
+    """Month of each date as an ``int32`` ordinal, `PERIOD_NA` for missing dates.
+
+    Parameters
+    ----------
+    dates :
+        Dates; anything `pd.to_datetime` accepts.
+
+    Returns
+    -------
+    np.ndarray
+    """
+    dates = pd.to_datetime(np.atleast_1d(dates)).to_numpy(dtype="datetime64[ns]")
+    periods = dates.astype("datetime64[M]").astype(np.int64)
+    return np.where(np.isnat(dates), PERIOD_NA, periods).astype(np.int32)
+
+
+def from_period_ordinal(periods) -> np.ndarray:
+    """First day of the month of each ``int32`` ordinal, NaT for `PERIOD_NA`.
+
+    Parameters
+    ----------
+    periods :
+        Month ordinals made by `to_period_ordinal`.
+
+    Returns
+    -------
+    np.ndarray
+        ``datetime64[ns]`` array.
+    """
+    periods = np.asarray(periods, dtype=np.int64)
+    dates = periods.astype("datetime64[M]").astype("datetime64[ns]")
+    dates[periods == PERIOD_NA] = np.datetime64("NaT")
+    return dates
+
+
+class SeriesRegistry:
+    """Append-only mapping of series labels to stable integer codes.
+
+    Labels keep the code they were first registered with, so the categorical series
+    columns made with `SeriesRegistry.categorical` share one dtype and their codes
+    can be compared and concatenated across refreshes; new series are appended.
+
+    Parameters
+    ----------
+    labels : Iterable[str], optional
+        Labels to register up front. Defaults to none.
+    """
+
+    def __init__(self, labels: Iterable[str] = ()):
+        self._codes: Dict[str, int] = {}
+        self._labels: List[str] = []
+        self._dtype = pd.CategoricalDtype([])
+        self._lock = threading.Lock()
+        self.register(labels)
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def __contains__(self, label) -> bool:
+        return label in self._codes
+
+    @property
+    def labels(self) -> List[str]:
+        """Registered labels in code order."""
+        return list(self._labels)
+
+    @property
+    def dtype(self) -> pd.CategoricalDtype:
+        """Categorical dtype whose categories are the registered labels."""
+        return self._dtype
+
+    def register(self, labels: Iterable[str]) -> np.ndarray:
+        """Register any new ``labels`` and return the code of each."""
+        labels = list(labels)
+        with self._lock:
+            new = [label for label in dict.fromkeys(labels) if label not in self._codes]
+            if new:
+                for label in new:
+                    self._codes[label] = len(self._labels)
+                    self._labels.append(label)
+                self._dtype = pd.CategoricalDtype(self._labels)
+        return self.codes(labels)
+
+    def codes(self, labels: Iterable[str]) -> np.ndarray:
+        """Code of each label, -1 for labels that are not registered."""
+        return np.array([self._codes.get(label, -1) for label in labels], dtype=np.intp)
+
+    def categorical(self, values) -> pd.Categorical:
+        """Labels as a `pd.Categorical` of `SeriesRegistry.dtype`, registering new ones.
+
+        Each distinct label is hashed once, so this is cheap for long columns with few
+        series, and free for a column that already has the registry's dtype.
+        """
+        if isinstance(getattr(values, "dtype", None), pd.CategoricalDtype):
+            values = pd.Categorical(values)
+            codes = self.register(values.categories)
+            if (codes == np.arange(len(codes))).all() and values.dtype == self.dtype:
+                return values
+            uniques, inverse = values.categories, values.codes
+        else:
+            inverse, uniques = pd.factorize(np.asarray(values, dtype=object))
+            codes = self.register(uniques)
+        codes = np.where(inverse >= 0, codes[inverse], -1)
+        return pd.Categorical.from_codes(codes, dtype=self.dtype)
+
+
+def compact_long_df(
+    df: pd.DataFrame,
+    by: str,
+    registry: Union[SeriesRegistry, None] = None,
+    date_col: str = "date",
+    value_col: str = "value",
+    period_col: str = "period",
+    float32: bool = False,
+) -> pd.DataFrame:
+    """Compact representation of a long dataframe.
+
+    Series labels become a categorical column backed by ``registry``, so every row
+    holds a small integer code instead of a reference to a title string, and the
+    month of each date is added as an ``int32`` ordinal for period arithmetic and
+    array indexing. The date and value columns are not copied, except to cast values
+    to ``float32``, so a frame read from a memory-mapped snapshot stays shared.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        A long pandas dataframe.
+    by : str
+        Name of the column holding the series labels.
+    registry : SeriesRegistry | None, optional
+        Registry assigning the category codes. Defaults to None, which registers the
+        labels of ``df`` in a new one.
+    date_col : str, optional
+        Name of the dates column. Defaults to "date".
+    value_col : str, optional
+        Name of the values column. Defaults to "value".
+    period_col : str, optional
+        Name to give the month ordinal column. Defaults to "period".
+    float32 : bool, optional
+        Store values as ``float32``. Halves their size at the cost of precision
+        beyond about seven significant digits. Defaults to False.
+
+    Returns
+    -------
+    pd.DataFrame
+    """
+    if registry is None:
+        registry = SeriesRegistry()
+    columns = {col: df[col] for col in df.columns if col != period_col}
+    columns[by] = pd.Series(registry.categorical(df[by]), index=df.index, name=by)
+    if float32:
+        columns[value_col] = df[value_col].astype(np.float32)
+    columns[period_col] = pd.Series(
+        to_period_ordinal(df[date_col]), index=df.index, name=period_col
+    )
+    return pd.DataFrame(columns, index=df.index, copy=False)
+
+
+def subset_long_df(
+    df: pd.DataFrame,
+    by: str,
+    series: Union[List[str], str, None] = None,
+) -> pd.DataFrame:
+    """Rows of a long dataframe belonging to ``series``.
+
+    For a categorical series column, as made by `compact_long_df`, the labels are
+    resolved to category codes once and rows are matched on their integer codes
+    rather than by comparing strings.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        A long pandas dataframe.
+    by : str
+        Name of the column holding the series labels.
+    series : List[str] | str | None, optional
+        Series to take. Defaults to None, which takes every series.
+
+    Returns
+    -------
+    pd.DataFrame
+    """
+    if isinstance(series, str):
+        series = [series]
+    if not series:
+        return df
+
+    column = df[by]
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        wanted = column.cat.categories.get_indexer(list(series))
+        mask = np.isin(column.cat.codes.to_numpy(), wanted[wanted >= 0])
+    else:
+        mask = column.isin(series).to_numpy()
+    return df[mask]
+
+
+class DateIndex:
+    """Sorted index of the observation dates of each series in a long dataframe.
+
+    Dates are held as ``datetime64`` arrays, one sorted and de-duplicated run per
+    series, so as-of lookups are binary searches: O(log n) per query date whether
+    one date or many are resolved in a call. Dates are compared to the second.
+
+    Build once per dataset with `DateIndex.from_long_df` and reuse it for every
+    lookup.
+
+    Parameters
+    ----------
+    dates : np.ndarray
+        ``datetime64`` observation dates, sorted and unique within each series.
+    starts : np.ndarray
+        Offsets of each series' run in ``dates``, with ``len(dates)`` appended.
+    series : pd.Index, optional
+        Series labels in the order of their runs. Defaults to None, meaning
+        ``dates`` is a single run shared by every series.
+    """
+
+    def __init__(
+        self,
+        dates: np.ndarray,
+        starts: np.ndarray,
+        series: Union[pd.Index, None] = None,
+    ):
+        self.dates = dates.astype("datetime64[ns]")
+        self.starts = starts
+        self.series = series
+        seconds = dates.astype("datetime64[s]").astype(np.int64)
+        codes = np.repeat(np.arange(len(starts) - 1), np.diff(starts))
+        # One sorted int64 key for all runs: (series code, seconds since base).
+        self._base = seconds.min() - 1 if len(seconds) else 0
+        self._span = seconds.max() - self._base + 2 if len(seconds) else 2
+        self._keys = codes * self._span + (seconds - self._base)
+
+    @classmethod
+    def from_long_df(
+        cls,
+        df: pd.DataFrame,
+        by: Union[str, None] = None,
+        date_col: str = "date",
+    ) -> "DateIndex":
+        """Build the index from a long dataframe.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            A long pandas dataframe.
+        by : str | None, optional
+            Name of the column holding the series labels. Defaults to None, which
+            indexes the dates of every row as one series.
+        date_col : str, optional
+            Name of the dates column. Defaults to "date".
+
+        Returns
+        -------
+        DateIndex
+        """
+        dates = df[date_col].to_numpy(dtype="datetime64[ns]")
+        if by is None:
+            dates = np.unique(dates[~np.isnat(dates)])
+            return cls(dates=dates, starts=np.array([0, len(dates)]))
+
+        codes, series = pd.factorize(df[by], sort=False)
+        keep = (codes >= 0) & ~np.isnat(dates)
+        codes, dates = codes[keep], dates[keep]
+        order = np.lexsort((dates, codes))
+        codes, dates = codes[order], dates[order]
+        unique = np.ones(len(dates), dtype=bool)
+        unique[1:] = (codes[1:] != codes[:-1]) | (dates[1:] != dates[:-1])
+        codes, dates = codes[unique], dates[unique]
+        starts = np.searchsorted(codes, np.arange(len(series) + 1))
+        return cls(dates=dates, starts=starts, series=series)
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def asof_many(
+        self,
+        dates,
+        series=None,
+        strict: bool = False,
+    ) -> np.ndarray:
+        """Latest observation date on or before each of ``dates``.
+
+        Parameters
+        ----------
+        dates :
+            Query dates; anything `pd.to_datetime` accepts.
+        series : str | array-like | None, optional
+            Series to look each date up in: one label for all dates, or one label
+            per date. Defaults to None, which requires an index without series.
+        strict : bool, optional
+            Only return dates strictly before the query date. Defaults to False.
+
+        Returns
+        -------
+        np.ndarray
+            ``datetime64[ns]`` array aligned with ``dates``; NaT where a series has
+            no observation early enough, or is not in the index.
+        """
+        if isinstance(dates, np.ndarray) and np.issubdtype(dates.dtype, np.datetime64):
+            query = dates.astype("datetime64[ns]")
+        else:
+            query = pd.to_datetime(np.atleast_1d(dates)).to_numpy(
+                dtype="datetime64[ns]"
+            )
+        codes = self._series_codes(series, len(query))
+
+        seconds = query.astype("datetime64[s]").astype(np.int64)
+        offset = np.clip(seconds - self._base, 0, self._span - 1)
+        positions = np.searchsorted(
+            self._keys,
+            np.where(codes >= 0, codes, 0) * self._span + offset,
+            side="left" if strict else "right",
+        )
+        positions -= 1
+
+        found = (codes >= 0) & ~np.isnat(query)
+        found &= positions >= self.starts[np.where(codes >= 0, codes, 0)]
+        result = np.full(len(query), np.datetime64("NaT"), dtype="datetime64[ns]")
+        result[found] = self.dates[positions[found]]
+        return result
+
+    def asof(self, date, series: Union[str, None] = None, strict: bool = False):
+        """Latest observation date on or before ``date``; NaT if there is none.
+
+        See `DateIndex.asof_many` for the parameters.
+
+        Returns
+        -------
+        pd.Timestamp
+        """
+        query = np.array([pd.Timestamp(date).to_datetime64()])
+        return pd.Timestamp(self.asof_many(query, series=series, strict=strict)[0])
+
+    def _series_codes(self, series, n: int) -> np.ndarray:
+        """Position of the run to search for each of ``n`` query dates."""
+        if self.series is None:
+            if series is not None:
+                raise ValueError("This DateIndex was built without series labels")
+            return np.zeros(n, dtype=np.intp)
+        if series is None:
+            raise ValueError("A series label is required to look up dates")
+        if isinstance(series, str):
+            return np.full(n, self.series.get_indexer([series])[0], dtype=np.intp)
+        codes = self.series.get_indexer(pd.Index(series))
+        if len(codes) != n:
+            raise ValueError("Expected one series label per query date")
+        return codes
+
+
 def calc_pct_chg_for_latest_obv(
     df: pd.DataFrame,
     periods: List[int],
@@ -41,6 +397,7 @@ def calc_pct_chg_for_latest_obv(
     value_col: str = "value",
     date_col: str = "date",
     period_col: str = "lag",
+    wide: bool = False,
 ) -> pd.DataFrame:
     """Calculate the percent change the for given periods and extracts the latest observation
     into a new dataframe.
@@ -48,6 +405,9 @@ def calc_pct_chg_for_latest_obv(
     For example, suppose you have CPI data and want to calculate the percent change in the latest
     print from 1-month ago, 6-months ago, 12-months ago, and 24-months ago.
 
+    Only the latest observation of each series is compared, so the cost grows with the
+    number of series times the number of periods rather than with the length of history.
+
     Parameters
     ----------
     df : pd.DataFrame
@@ -63,47 +423,115 @@ def calc_pct_chg_for_latest_obv(
     period_col : str, optional
         Name to give the column representing the period for the percent change.
         Defaults to "lag".
+    wide : bool, optional
+        If True, return one row per series with the latest date & value and a
+        ``pct_chg_{value_col}_{period}`` column per period. Defaults to False, which
+        returns one row per series and period.
 
     Returns
     -------
     Pandas dataframe.
     """
-    dates = get_dates(df=df)
-    max_date = dates.max
+    max_date = get_dates(df=df, date_col=date_col).max
+    pct_chg_col = f"pct_chg_{value_col}"
 
-    df = df.set_index(date_col)
-    pct_chg_dfs = []
-    for lag in periods:
-        pct_chg_df = calc_groupby_pct_chg(
-            df=df,
-            by=series_col,
-            periods=lag,
-            value_col=value_col,
-        )
+    latest_df, pct_chg = _latest_pct_chg(
+        df=df, periods=periods, by=series_col, value_col=value_col, date_col=date_col
+    )
+    latest_df = latest_df[[date_col] + latest_df.columns.drop(date_col).tolist()]
 
-        pct_chg_df = round(
-            pct_chg_df.groupby(series_col, sort=False, group_keys=True).tail(1), 4
-        )
+    if wide:
+        wide_df = latest_df.set_index(series_col)
+        for i, lag in enumerate(periods):
+            wide_df[f"{pct_chg_col}_{lag}"] = pct_chg[:, i]
+        return round(wide_df, 4)
 
+    pct_chg_dfs = []
+    for i, lag in enumerate(periods):
+        pct_chg_df = latest_df.copy()
+        pct_chg_df[pct_chg_col] = pct_chg[:, i]
+        pct_chg_df = round(pct_chg_df, 4)
         pct_chg_df["vs_date"] = pd.to_datetime(max_date - relativedelta(months=lag))
         pct_chg_df["lag"] = lag
         pct_chg_df[period_col] = lag
         pct_chg_dfs.append(pct_chg_df)
 
-    pct_chg_df = pd.concat(pct_chg_dfs)
-    pct_chg_df = pct_chg_df.reset_index()
+    pct_chg_df = pd.concat(pct_chg_dfs, ignore_index=True)
     return pct_chg_df.dropna()
 
 
+def _latest_pct_chg(
+    df: pd.DataFrame,
+    periods: List[int],
+    by: str,
+    value_col: str = "value",
+    date_col: str = "date",
+) -> Tuple[pd.DataFrame, np.ndarray]:
+    """Percent change of the latest observation of each series versus ``periods`` observations earlier.
+
+    Rows are ordered by series and date into flat arrays, missing values are forward
+    filled within each series, and the earlier value for each period is read directly
+    at ``latest position - period``.
+
+    Returns
+    -------
+    Tuple[pd.DataFrame, np.ndarray]
+        The latest row of each series, in order of first appearance, and a
+        ``(series, periods)`` array of percent changes. Series with fewer than
+        ``period + 1`` observations get NaN.
+    """
+    codes = df.groupby(by, sort=False, observed=True).ngroup().to_numpy()
+    has_group = codes >= 0
+    row_order = np.flatnonzero(has_group)
+    row_order = row_order[
+        np.lexsort((df[date_col].to_numpy()[row_order], codes[row_order]))
+    ]
+    sorted_codes = codes[row_order]
+
+    values = pd.Series(df[value_col].to_numpy(dtype=float)[row_order])
+    observed = values.notna().to_numpy()
+    filled = values.groupby(sorted_codes).ffill().to_numpy()
+
+    positions = np.arange(len(row_order))
+    n_groups = sorted_codes.max() + 1 if len(sorted_codes) else 0
+    starts = np.searchsorted(sorted_codes, np.arange(n_groups))
+    latest = (
+        pd.Series(positions[observed])
+        .groupby(sorted_codes[observed])
+        .max()
+        .reindex(range(n_groups))
+    )
+    latest = latest.dropna().astype(int)
+    latest_pos = latest.to_numpy()
+    latest_starts = starts[latest.index.to_numpy()]
+
+    pct_chg = np.full((len(latest_pos), len(periods)), np.nan)
+    for i, lag in enumerate(periods):
+        prior_pos = latest_pos - lag
+        has_prior = prior_pos >= latest_starts
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pct_chg[has_prior, i] = (
+                filled[latest_pos[has_prior]] / filled[prior_pos[has_prior]] - 1
+            )
+
+    latest_df = df.iloc[row_order[latest_pos]].reset_index(drop=True)
+    return latest_df, pct_chg
+
+
 def calc_groupby_pct_chg(
     df: pd.DataFrame,
     by: Union[str, List[str]],
-    periods: int = 1,
+    periods: Union[int, List[int]] = 1,
     value_col: str = "value",
+    period_col: str = "lag",
 ) -> pd.DataFrame:
     """Calculate a group by percent change. Useful when calculating a percent change
     on a long dataframe.
 
+    The percent change is computed with vectorized group-wise shifts, so rows only
+    need to be in date order within each group; groups do not have to be contiguous.
+    Missing values are forward filled within each group before the change is formed,
+    as `pd.Series.pct_change` does.
 
     Parameters
     ----------
@@ -111,23 +539,118 @@ def calc_groupby_pct_chg(
         A long pandas dataframe.
     by :
         Columns to group by.
-    periods : int
-        Periods to shift for forming percent change.
+    periods : int | List[int]
+        Periods to shift for forming percent change. When a list is given, the
+        results for every period are stacked and labelled in ``period_col``.
     value_col : str
         Column to calculate percent change on.
+    period_col : str, optional
+        Name of the column holding the period when ``periods`` is a list.
+        Defaults to "lag".
 
     Return
     -------
     pd.DataFrame
     """
-    pct_chg_df = df.copy()
-    pct_chg_df[f"pct_chg_{value_col}"] = (
-        pct_chg_df.groupby(by, sort=False, group_keys=True)[value_col]
-        .apply(lambda x: x.pct_change(periods))
-        .to_numpy()
+    grouper = df.groupby(by, sort=False, observed=True)
+    codes = grouper.ngroup().to_numpy().astype(float)
+    codes[codes < 0] = np.nan
+    filled = grouper[value_col].ffill()
+    filled_grouper = filled.groupby(codes)
+    filled_values = filled.to_numpy(dtype=float)
+    complete = df.notna().all(axis=1).to_numpy()
+    # float32 values give float32 changes; anything else float64.
+    pct_chg_dtype = np.result_type(df[value_col].dtype, np.float32)
+
+    pct_chg_col = f"pct_chg_{value_col}"
+    pct_chg_dfs = []
+    for lag in [periods] if isinstance(periods, int) else periods:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pct_chg = (
+                filled_values / filled_grouper.shift(lag).to_numpy(dtype=float) - 1
+            )
+        keep = complete & ~np.isnan(pct_chg)
+
+        pct_chg_df = df.loc[keep].copy(deep=False)
+        pct_chg_df[pct_chg_col] = pct_chg[keep].astype(pct_chg_dtype, copy=False)
+        if not isinstance(periods, int):
+            pct_chg_df[period_col] = lag
+        pct_chg_dfs.append(pct_chg_df)
+
+    if isinstance(periods, int):
+        return pct_chg_dfs[0]
+    return pd.concat(pct_chg_dfs)
+
+
+def sort_long_df(
+    df: pd.DataFrame,
+    by: str,
+    date_col: str = "date",
+) -> pd.DataFrame:
+    """Sort a long dataframe so each series is contiguous and in date order.
+
+    Series keep the order in which they first appear in ``df``.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        A long pandas dataframe.
+    by : str
+        Name of the column holding the series labels.
+    date_col : str, optional
+        Name of the dates column. Defaults to "date".
+
+    Returns
+    -------
+    pd.DataFrame
+    """
+    series_order = pd.Categorical(df[by], categories=df[by].unique(), ordered=True)
+    order = pd.DataFrame(
+        {"series": series_order.codes, "date": df[date_col].to_numpy()}
     )
+    positions = order.sort_values(["series", "date"], kind="stable").index
+    return df.iloc[positions].reset_index(drop=True)
 
-    return pct_chg_df.dropna()
+
+def slice_pct_chg_cube(
+    cube: pd.DataFrame,
+    periods: int,
+    series: Union[List[str], str, None] = None,
+) -> pd.DataFrame:
+    """Take one period, and optionally a subset of series, from a percent change cube.
+
+    Returns the same columns `calc_groupby_pct_chg` does for a single period, with
+    series in the order they appear in the cube.
+
+    Parameters
+    ----------
+    cube : pd.DataFrame
+        Output of `utils.matrix.SeriesMatrix.pct_chg_cube`.
+    periods : int
+        Period to take.
+    series : List[str] | str | None, optional
+        Series to take. Defaults to None, which takes every series.
+
+    Returns
+    -------
+    pd.DataFrame
+    """
+    by, date_col, period_col = cube.index.names
+    index = cube.index
+
+    mask = index.codes[2] == index.levels[2].get_indexer([periods])[0]
+    if isinstance(series, str):
+        series = [series]
+    if series:
+        wanted = index.levels[0].get_indexer(series)
+        mask &= np.isin(index.codes[0], wanted[wanted >= 0])
+
+    pct_chg_df = cube[mask].reset_index().drop(columns=period_col)
+    pct_chg_cols = [c for c in pct_chg_df.columns if str(c).startswith("pct_chg_")]
+    other_cols = [
+        c for c in pct_chg_df.columns if c not in (date_col, by, *pct_chg_cols)
+    ]
+    return pct_chg_df[[date_col, *other_cols, by, *pct_chg_cols]]
 
 
 def pivot_pct_chg_tbl(
@@ -137,10 +660,18 @@ def pivot_pct_chg_tbl(
     date_col: str = "date",
     n: Union[int, str] = 6,
     other_cols: List[str] = None,
+    period_col: str = "period",
 ) -> pd.DataFrame:
     """Pivot a percent change dataframe. Designed to work with the `calc_groupby_pct_chg` and
     `calc_pct_chg_for_latest_obv` functions.
 
+    Dates are reduced to month ordinals, the last ``n`` distinct months are selected
+    numerically and every value is placed directly at its (row, column) position, so
+    only the output column labels are formatted. Columns are in chronological order,
+    then in order of appearance of ``other_cols``; rows are in order of appearance.
+    Values sharing a row and column are averaged, and rows or columns without any
+    value are dropped, as `pd.pivot_table` does.
+
     Parameters
     ----------
     df : pd.DataFrame
@@ -156,92 +687,114 @@ def pivot_pct_chg_tbl(
         Accepts positive in or "all".
     other_cols : List[str]
         Other columns to include in the pivot table header.
+    period_col : str, optional
+        Name of the month ordinal column, as added by `compact_long_df`. Used instead
+        of the dates when ``df`` has it. Defaults to "period".
 
     Returns
     -------
     pd.DataFrame
         Pandas pivot table.
     """
-    pv_df = df.copy()
-    pv_df["Date"] = pv_df[date_col].dt.strftime("%b %Y")
-
+    if period_col in df:
+        periods = df[period_col].to_numpy()
+    else:
+        periods = to_period_ordinal(df[date_col])
+    months = np.unique(periods[periods != PERIOD_NA])
+    if n != "all":
+        months = months[len(months) - min(n, len(months)) :]
     if n == "all":
-        pv_dates = pv_df["Date"].tolist()
-        pv_dates = sorted(list(set(pv_dates)))
+        keep = np.flatnonzero(periods != PERIOD_NA)
     else:
-        pv_dates = pv_df["Date"].tail(n).tolist()
-
-    pv_df = pv_df.loc[pv_df["Date"].isin(pv_dates)]
-
-    columns = ["Date"]
-    if isinstance(other_cols, list):
-        for col in other_cols:
-            pv_df = pv_df.rename(columns={col: col.replace("_", " ").title()})
-        columns = columns + [c.replace("_", " ").title() for c in other_cols]
-    pivot_table = pd.pivot_table(
-        pv_df,
-        index=index_col,
-        values=pct_chg_col,
-        columns=columns,
-        sort=False,
+        keep = np.flatnonzero(np.isin(periods, months))
+
+    # Factorizing the columns rather than their values uses categorical codes as is.
+    row_codes, rows = pd.factorize(df[index_col].iloc[keep], sort=False)
+    # Column keys: month position, then the other columns in order of appearance.
+    col_codes = np.searchsorted(months, periods[keep])
+    levels = [from_period_ordinal(months)]
+    for col in other_cols or []:
+        codes, uniques = pd.factorize(df[col].iloc[keep], sort=False)
+        col_codes = col_codes * len(uniques) + codes
+        levels.append(np.asarray(uniques))
+    col_keys, col_codes = np.unique(col_codes, return_inverse=True)
+
+    values = df[pct_chg_col].to_numpy(dtype=float)[keep]
+    present = ~np.isnan(values)
+    positions = row_codes * len(col_keys) + col_codes
+    size = len(rows) * len(col_keys)
+    totals = np.bincount(positions[present], weights=values[present], minlength=size)
+    counts = np.bincount(positions[present], minlength=size)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        table = (totals / counts).reshape(len(rows), len(col_keys))
+    counts = counts.reshape(len(rows), len(col_keys))
+
+    # Unravel each column key into its level codes, last level varying fastest.
+    key_codes = []
+    for level in reversed(levels):
+        col_keys, codes = np.divmod(col_keys, len(level))
+        key_codes.append(codes)
+    key_codes.reverse()
+    arrays = [pd.DatetimeIndex(levels[0][key_codes[0]]).strftime("%b %Y")]
+    arrays += [level[codes] for level, codes in zip(levels[1:], key_codes[1:])]
+    names = ["Date"] + [c.replace("_", " ").title() for c in other_cols or []]
+    if len(arrays) == 1:
+        columns = pd.Index(arrays[0], name=names[0])
+    else:
+        columns = pd.MultiIndex.from_arrays(arrays, names=names)
+
+    has_rows, has_cols = counts.any(axis=1), counts.any(axis=0)
+    index = pd.Index(
+        np.asarray(rows)[has_rows], name=index_col.replace("_", " ").title()
+    )
+    return pd.DataFrame(
+        table[has_rows][:, has_cols], index=index, columns=columns[has_cols]
     )
-    pivot_table.index.name = index_col.replace("_", " ").title()
 
-    return pivot_table
 
+def _get_subset_long_cpi_data(
+    long_df: pd.DataFrame,
+    series: Union[List[str], str, None] = None,
+) -> pd.DataFrame:
+    """Get a subset of the CPI series in the CPI series collection."""
+    return subset_long_df(long_df, by="cpi_series", series=series)
 
-def display_pct_chg_df(df: pd.DataFrame, title: str) -> None:
-    """Applies formatting and title to table and displays.
 
-    Designed to used with the `pivot_pct_chg_tbl` function.
+def walkback_to_nearest_date(
+    df: pd.DataFrame,
+    date,
+    date_index: Union[DateIndex, None] = None,
+) -> str:
+    """Take a pandas dataframe and returns the latest date before the given date.
 
     Parameters
     ----------
     df : pd.DataFrame
-        Pandas dataframe.
-    title : str
-        Table title.
+        Pandas dataframe with a date column.
+    date :
+        Date to walk back from.
+    date_index : DateIndex, optional
+        Prebuilt index of the dates in ``df``; pass one when making repeated lookups
+        so each is a binary search. Defaults to None, which builds one.
 
     Returns
     -------
-    None
+    str
+        The date formatted as YYYY-MM-DD.
     """
-    display(
-        df.style.format("{:.1%}")
-        .set_caption(f"{title}")
-        .set_table_styles(
-            [
-                {
-                    "selector": "caption",
-                    "props": [
-                        ("font-size", "18px"),
-                        ("font-weight", "bold"),
-                        ("text-align", "center"),
-                    ],
-                }
-            ]
-        )
-    )
-
-
-def _get_subset_long_cpi_data(
-    long_df: pd.DataFrame,
-    series: Union[List[str], str, None] = None,
-) -> pd.DataFrame:
-    """Get a subset of the CPI series in the CPI series collection."""
-
-    if isinstance(series, str):
-        series = [series]
-
-    if series:
-        long_df = long_df[long_df["cpi_series"].isin(series)]
+    if date_index is None:
+        date_index = DateIndex.from_long_df(df)
+    nearest_date = date_index.asof(date, strict=True)
+    if pd.isna(nearest_date):
+        raise ValueError(f"No date before {date}")
+    return str(nearest_date.date())
 
-    return long_df
 
+def __getattr__(name: str):
+    # The notebook helpers need IPython, which the dashboards do not; import them
+    # only when asked for, from their own module.
+    if name == "display_pct_chg_df":
+        from inflation_dashboard.utils import notebook
 
-def walkback_to_nearest_date(df, date) -> str:
-    """Take a pandas dataframe and returns the date on of before the given date."""
-    date_list = [date.to_pydatetime() for date in df.date.tolist()]
-    wb_dict = {(date - df_date).days: df_date for df_date in date_list}
-    nearest_date = wb_dict[min([days for days in wb_dict.keys() if int(days) > 0])]
-    return str(nearest_date.date())
+        return notebook.display_pct_chg_df
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,10 +1,155 @@
 """Make plotly time series plot for percent change"""
 
-from typing import Dict
+import json
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Sequence, Tuple
 
+import numpy as np
 import pandas as pd
 import plotly.express as px
 from plotly.graph_objects import Figure
+from plotly.io.json import to_json_plotly
+
+from inflation_dashboard import metrics, profiling
+from inflation_dashboard.config import get_settings
+from inflation_dashboard.utils.cache import LRUCache
+
+# Above this many points a line plot is drawn with WebGL (Scattergl) and downsampled.
+LARGE_PLOT_POINTS = 5000
+# Points drawn per pixel of plot width, shared by every trace, once downsampled.
+POINTS_PER_PIXEL = 2
+
+
+@dataclass(frozen=True)
+class _CachedFigure:
+    figure: Any
+    # Length of the figure's JSON, which the cache's byte budget is counted in.
+    nbytes: int
+
+
+# Built figures, shared by every page and session in the process.
+figure_cache = LRUCache(
+    max_bytes=int(get_settings().figure_cache_mb * 2**20),
+    sizeof=lambda entry: entry.nbytes,
+)
+metrics.registry.register_cache("figure", figure_cache)
+
+FIGURE_BUILD_SECONDS = metrics.Histogram(
+    "inflation_dashboard_figure_build_seconds",
+    "Time to build and serialize a figure missing from the figure cache.",
+    ["kind"],
+)
+
+
+def cached_figure(
+    kind: str,
+    series: Sequence[str] | None,
+    periods: int | Tuple[int, ...] | None,
+    data_version: int,
+    build: Callable[[], Figure | Any],
+    **params: Any,
+) -> Any:
+    """Figure dictionary from `figure_cache`, building it on a miss.
+
+    On a miss the figure is built and serialized once, and the plain dictionary
+    decoded from its JSON is cached. A repeated view skips the plotly express
+    construction, the figure validation and the JSON round trip, and hands Dash
+    plain lists and dicts, which it encodes several times faster than a figure.
+    The dictionary is shared by every caller, so it must not be modified.
+
+    Parameters
+    ----------
+    kind : str
+        Kind of figure, e.g. "line" or "bar".
+    series : Sequence[str] | None
+        Series in the figure; None or empty for every series.
+    periods : int | Tuple[int, ...] | None
+        Percent change horizon of the figure.
+    data_version : int
+        Version of the data the figure is built from.
+    build : Callable[[], Figure | Any]
+        Builds the figure, or a part of one such as its traces, on a miss.
+    **params
+        Anything else the figure depends on, such as its title.
+
+    Returns
+    -------
+    Any
+        The decoded JSON of what ``build`` returned.
+    """
+    key = (
+        kind,
+        tuple(series or ()),
+        periods,
+        data_version,
+        tuple(sorted(params.items())),
+    )
+
+    def build_figure() -> _CachedFigure:
+        with profiling.phase(f"figure {kind}"), FIGURE_BUILD_SECONDS.time(kind=kind):
+            figure_json = to_json_plotly(build())
+            return _CachedFigure(json.loads(figure_json), nbytes=len(figure_json))
+
+    return figure_cache.get_or_set(key, build_figure).figure
+
+
+def downsample_minmax(
+    df: pd.DataFrame,
+    n_points: int,
+    by: str = "cpi_series",
+    x: str = "date",
+    y: str = "pct_chg_value",
+) -> pd.DataFrame:
+    """Reduce each series to at most about ``n_points`` rows, keeping its extremes.
+
+    Each series is cut into ``n_points // 2`` buckets of consecutive rows and only the
+    minimum and maximum of ``y`` in every bucket are kept, along with the first and
+    last rows, so spikes and troughs survive downsampling.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Long pandas dataframe.
+    n_points : int
+        Maximum points per series.
+    by : str, optional
+        Column holding the series labels, by default "cpi_series"
+    x : str, optional
+        Column the series are ordered by, by default "date"
+    y : str, optional
+        Column whose extremes are kept, by default "pct_chg_value"
+
+    Returns
+    -------
+    pd.DataFrame
+        The kept rows of ``df``, ordered by series and ``x``.
+    """
+    codes = df.groupby(by, sort=False, observed=True).ngroup().to_numpy()
+    order = np.lexsort((df[x].to_numpy(), codes))
+    codes = codes[order]
+    counts = np.bincount(codes[codes >= 0])
+    if not len(counts) or counts.max() <= n_points:
+        return df.iloc[order]
+
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    positions = np.arange(len(order)) - starts[codes]
+    n_buckets = max(n_points // 2, 1)
+    buckets = positions * n_buckets // counts[codes]
+
+    # Order rows by bucket then value: each bucket's first row is its minimum and
+    # its last row its maximum.
+    values = df[y].to_numpy(dtype=float)[order]
+    bucket_ids = codes * n_buckets + buckets
+    valid = np.flatnonzero(~np.isnan(values))
+    by_value = valid[np.lexsort((values[valid], bucket_ids[valid]))]
+    bucket_ids = bucket_ids[by_value]
+    new_bucket = bucket_ids[1:] != bucket_ids[:-1]
+    keep = np.zeros(len(order), dtype=bool)
+    keep[by_value[np.concatenate([[True], new_bucket])]] = True
+    keep[by_value[np.concatenate([new_bucket, [True]])]] = True
+    keep[starts] = True
+    keep[starts + counts - 1] = True
+    return df.iloc[order[keep]]
 
 
 def _mk_line_plot(
@@ -12,10 +157,16 @@ def _mk_line_plot(
     title: str,
     series_column_name: str = "cpi_series",
     plot_size: Dict[str, int] | None = None,
+    x_range: Sequence | None = None,
     **kwargs,
 ) -> Figure:
     """Create plotly line graph for CPI Series.
 
+    Plots with more than `LARGE_PLOT_POINTS` points are drawn with WebGL and each
+    series is downsampled with `downsample_minmax` to fit `POINTS_PER_PIXEL` points
+    per pixel of plot width. Pass the zoomed ``x_range`` to redraw a viewport at full
+    resolution.
+
     Parameters
     ----------
     df : pd.DataFrame
@@ -28,6 +179,8 @@ def _mk_line_plot(
         Customize the plot size with dictionary, by default None
         Example:
             {"height": 600, "width": 800}
+    x_range : Sequence | None, optional
+        Only plot dates within this [start, end] range, by default None
 
     Returns
     -------
@@ -35,6 +188,9 @@ def _mk_line_plot(
     """
     if plot_size is None:
         plot_size = {"height": 800, "width": 1400}
+    df, render_mode = _prepare_line_df(df, series_column_name, plot_size, x_range)
+    if render_mode is not None:
+        kwargs.setdefault("render_mode", render_mode)
     plot = px.line(
         data_frame=df,
         x="date",
@@ -50,5 +206,151 @@ def _mk_line_plot(
         **kwargs,
     )
     plot.layout.yaxis.tickformat = ",.2%"
+    if x_range is not None:
+        plot.layout.xaxis.range = list(x_range)
+
+    return plot
+
+
+def _mk_bar_plot(
+    df: pd.DataFrame,
+    title: str,
+    series_column_name: str = "cpi_series",
+    plot_size: Dict[str, int] | None = None,
+    **kwargs,
+) -> Figure:
+    """Create plotly grouped bar graph of the latest percent change for CPI Series.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Long pandas data frame with one row per series and "group" (percent change period)
+    title : str
+        Graph title
+    series_column_name : str, optional
+        Column name of the cpi series, by default "cpi_series"
+    plot_size : Dict[str, int] | None, optional
+        Customize the plot size with dictionary, by default None
+
+    Returns
+    -------
+    Figure
+    """
+    if plot_size is None:
+        plot_size = {}
+    plot = px.bar(
+        data_frame=df,
+        x=series_column_name,
+        color="group",
+        y="pct_chg_value",
+        hover_data={"pct_chg_value": ":.2%"},
+        barmode="group",
+        color_discrete_sequence=px.colors.qualitative.Safe,
+        labels={
+            series_column_name: "CPI Category",
+            "group": "Months Ago",
+            "pct_chg_value": "Percent Change",
+            "date": "Date",
+        },
+        **plot_size,
+        **kwargs,
+    )
+    plot.layout.yaxis.tickformat = ",.0%"
+    plot.update_layout(title_text=title)
 
     return plot
+
+
+def _prepare_line_df(
+    df: pd.DataFrame,
+    series_column_name: str,
+    plot_size: Dict[str, int],
+    x_range: Sequence | None,
+) -> Tuple[pd.DataFrame, str | None]:
+    """Clip a line plot's data to ``x_range`` and downsample it if it is large.
+
+    Returns the data to plot and "webgl" if it should be drawn with WebGL, else None.
+    """
+    if x_range is not None:
+        df = _clip_to_range(df, x_range, series_column_name)
+    if len(df) <= LARGE_PLOT_POINTS:
+        return df, None
+    n_series = max(df[series_column_name].nunique(), 1)
+    n_points = POINTS_PER_PIXEL * plot_size.get("width", 1400) // n_series
+    return downsample_minmax(df, n_points=n_points, by=series_column_name), "webgl"
+
+
+def _line_traces(
+    df: pd.DataFrame,
+    series_column_name: str = "cpi_series",
+    plot_size: Dict[str, int] | None = None,
+    x_range: Sequence | None = None,
+) -> List[Dict[str, Any]]:
+    """Traces `_mk_line_plot` would draw, built directly without plotly express.
+
+    Much cheaper than building a figure, so it suits updating the traces of a figure
+    that is already on screen, e.g. with a `dash.Patch`.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Long pandas data frame
+    series_column_name : str, optional
+        Column name of the cpi series, by default "cpi_series"
+    plot_size : Dict[str, int] | None, optional
+        Size of the plot the traces are drawn in, by default None
+    x_range : Sequence | None, optional
+        Only include dates within this [start, end] range, by default None
+
+    Returns
+    -------
+    List[Dict[str, Any]]
+    """
+    if plot_size is None:
+        plot_size = {"height": 800, "width": 1400}
+    df, render_mode = _prepare_line_df(df, series_column_name, plot_size, x_range)
+    label = "CPI Series" if series_column_name == "cpi_series" else series_column_name
+    colors = px.colors.qualitative.Safe
+    # Plotly express's "auto" render mode also draws with WebGL above 1000 points.
+    webgl = render_mode == "webgl" or len(df) > 1000
+
+    traces = []
+    for i, (series, group) in enumerate(
+        df.groupby(series_column_name, sort=False, observed=True)
+    ):
+        traces.append(
+            {
+                "hovertemplate": f"{label}={series}<br>Date=%{{x}}<br>"
+                "Percent Change=%{y:.2%}<extra></extra>",
+                "legendgroup": series,
+                "line": {"color": colors[i % len(colors)], "dash": "solid"},
+                "marker": {"symbol": "circle"},
+                "mode": "lines",
+                "name": series,
+                "showlegend": True,
+                "x": group["date"].dt.strftime("%Y-%m-%d").tolist(),
+                "xaxis": "x",
+                "y": group["pct_chg_value"].round(6).tolist(),
+                "yaxis": "y",
+                "type": "scattergl" if webgl else "scatter",
+            }
+        )
+    return traces
+
+
+def _clip_to_range(
+    df: pd.DataFrame, x_range: Sequence, series_column_name: str
+) -> pd.DataFrame:
+    """Rows within ``x_range``, plus the nearest row outside each edge of every series
+    so lines run to the edges of the plot."""
+    dates = df["date"]
+    series = df[series_column_name]
+    start, end = pd.to_datetime(x_range[0]), pd.to_datetime(x_range[1])
+    inside = (dates >= start) & (dates <= end)
+    before = dates == dates.where(dates < start).groupby(
+        series, observed=True
+    ).transform("max")
+    after = dates == dates.where(dates > end).groupby(series, observed=True).transform(
+        "min"
+    )
+    return df[inside | before | after]
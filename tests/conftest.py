@@ -0,0 +1,19 @@
+import pytest
+
+from inflation_dashboard.fred import get_client
+from inflation_dashboard.fred_server import running_server, synthesize_fixtures
+
+
+@pytest.fixture
+def fixtures(tmp_path, monkeypatch):
+    """Synthesized fixtures served by the FRED stand-in, with an empty snapshot dir."""
+    fixtures = tmp_path / "fixtures"
+    synthesize_fixtures(fixtures, n_months=24)
+    with running_server(fixtures) as server:
+        monkeypatch.setenv("INFLATION_DASHBOARD_FRED_URL", server.url)
+        monkeypatch.setenv("INFLATION_DASHBOARD_FRED_RATE_LIMIT", "0")
+        monkeypatch.setenv("FRED_API_KEY", "stand-in")
+        monkeypatch.setenv("INFLATION_DASHBOARD_SNAPSHOT_DIR", str(tmp_path / "snap"))
+        get_client.cache_clear()
+        yield fixtures
+    get_client.cache_clear()
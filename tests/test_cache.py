@@ -0,0 +1,106 @@
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from inflation_dashboard.utils.cache import LRUCache, TTLCache
+
+
+def test_lru_cache_evicts_least_recently_used_to_fit_budget():
+    cache = LRUCache(max_bytes=3 * sys.getsizeof("a" * 100))
+    for key in "abc":
+        cache.set(key, key * 100)
+    assert len(cache) == 3
+    assert cache.nbytes == cache.max_bytes
+
+    # Reading "a" makes "b" the least recently used entry.
+    assert cache.get("a") == "a" * 100
+    cache.set("d", "d" * 100)
+    assert "b" not in cache
+    assert [key for key in "acd" if key in cache] == ["a", "c", "d"]
+
+    # A value twice the size evicts the two oldest entries.
+    cache.set("e", "e" * 200)
+    assert "a" not in cache and "c" not in cache
+    assert cache.nbytes <= cache.max_bytes
+
+    # A value larger than the whole budget is not stored.
+    assert cache.get_or_set("f", lambda: "f" * 1000) == "f" * 1000
+    assert "f" not in cache
+
+    cache.invalidate()
+    assert len(cache) == 0 and cache.nbytes == 0
+
+
+def test_lru_cache_counts_hits_and_misses_with_custom_sizes():
+    cache = LRUCache(max_bytes=10, sizeof=len)
+    calls = []
+
+    def load():
+        calls.append(1)
+        return [0] * 6
+
+    assert cache.get_or_set("x", load) == [0] * 6
+    assert cache.get_or_set("x", load) == [0] * 6
+    assert len(calls) == 1
+    assert (cache.hits, cache.misses, cache.nbytes) == (1, 1, 6)
+
+    cache.set("y", [1] * 6)
+    assert "x" not in cache and cache.nbytes == 6
+
+
+def test_ttl_cache_expires_touches_and_invalidates(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    cache = TTLCache(ttl=10)
+    cache.set_many({"a": 1, "b": 2})
+
+    now[0] = 9.9
+    assert cache.get("a") == 1 and "b" in cache
+    cache.touch(["a", "missing"])
+    assert "missing" not in cache
+
+    # Past its TTL "b" is stale, while the touched "a" stays fresh until 19.9.
+    now[0] = 10
+    assert "b" not in cache and cache.get("b", "stale") == "stale"
+    assert cache.get_or_set("b", lambda: 3) == 3
+    now[0] = 19.8
+    assert cache.get("a") == 1
+    now[0] = 19.9
+    assert "a" not in cache
+
+    cache.invalidate("b")
+    assert cache.get_or_set("b", lambda: 4) == 4
+    cache.invalidate()
+    assert "b" not in cache
+
+    never = TTLCache(ttl=0)
+    never.set("a", 1)
+    now[0] = 1e9
+    assert never.get("a") == 1
+
+
+def test_ttl_cache_loads_once_and_drops_key_locks():
+    cache = TTLCache(ttl=60)
+    calls = []
+    started = threading.Event()
+
+    def load():
+        calls.append(1)
+        started.set()
+        time.sleep(0.05)
+        return "value"
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        first = pool.submit(cache.get_or_set, "key", load)
+        started.wait()
+        others = [pool.submit(cache.get_or_set, "key", load) for _ in range(3)]
+        results = [first.result()] + [future.result() for future in others]
+
+    assert results == ["value"] * 4
+    assert len(calls) == 1
+    assert (cache.hits, cache.misses) == (3, 1)
+
+    for key in range(100):
+        cache.get_or_set(key, lambda key=key: key)
+    assert cache._key_locks == {}
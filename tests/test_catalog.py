@@ -0,0 +1,122 @@
+import json
+
+import pyfredapi as pf
+import pytest
+
+from inflation_dashboard.catalog import SeriesCatalog, tokenize
+from inflation_dashboard.fred import FredClient
+from inflation_dashboard.fred_server import (
+    running_server,
+    synthesize_fixtures,
+    write_fixture,
+)
+
+
+def _info(series_id, title, frequency="Monthly", seasonal_adjustment="SA"):
+    return pf.SeriesInfo(
+        id=series_id,
+        realtime_start="2024-01-01",
+        realtime_end="2024-01-01",
+        title=title,
+        observation_start="1947-01-01",
+        observation_end="2023-12-01",
+        frequency=frequency,
+        frequency_short=frequency[0],
+        units="Index 1982-1984=100",
+        units_short="Index 1982-1984=100",
+        seasonal_adjustment=seasonal_adjustment,
+        seasonal_adjustment_short=seasonal_adjustment,
+        last_updated="2024-01-11 07:38:01-06",
+        popularity=50,
+        notes="",
+    )
+
+
+CATALOG = SeriesCatalog(
+    {
+        "9": [
+            _info("CPIAUCSL", "Consumer Price Index: All Items"),
+            _info("CUSR0000SAF11", "Consumer Price Index: Food at Home"),
+            _info("CUSR0000SEFV", "Consumer Price Index: Food Away from Home"),
+            _info("PCEPI", "Personal Consumption Expenditures: Chain-type Price Index"),
+            _info(
+                "CPIAUCNS", "Consumer Price Index: All Items", seasonal_adjustment="NSA"
+            ),
+        ],
+        "32424": [
+            _info("STICKCPIM157SFRBATL", "Sticky Price Consumer Price Index"),
+            _info("CPIAUCSL", "Consumer Price Index: All Items"),
+            _info("GDPDEF", "GDP Implicit Price Deflator", frequency="Quarterly"),
+        ],
+    },
+    children={"9": [], "32424": []},
+)
+
+
+def _ids(infos):
+    return [info.id for info in infos]
+
+
+def test_tokenize():
+    assert tokenize("Owners' Equivalent Rent, 1982-1984") == [
+        "owners",
+        "equivalent",
+        "rent",
+        "1982",
+        "1984",
+    ]
+
+
+def test_search_keywords_match_token_prefixes():
+    assert _ids(CATALOG.search("food home")) == ["CUSR0000SAF11", "CUSR0000SEFV"]
+    assert _ids(CATALOG.search("FOOD aw")) == ["CUSR0000SEFV"]
+    assert _ids(CATALOG.search("cpiaucs")) == ["CPIAUCSL"]
+    assert CATALOG.search("tuition") == []
+
+
+def test_search_prefix_category_and_filters():
+    assert _ids(CATALOG.search(prefix="sticky")) == ["STICKCPIM157SFRBATL"]
+    assert _ids(CATALOG.search(prefix="Consumer Price Index: All", category="9")) == [
+        "CPIAUCSL",
+        "CPIAUCNS",
+    ]
+    assert _ids(CATALOG.search(category="32424", frequency="q")) == ["GDPDEF"]
+    assert _ids(CATALOG.search("all items", seasonal_adjustment="NSA")) == ["CPIAUCNS"]
+    assert len(CATALOG.search(limit=2)) == 2
+    with pytest.raises(TypeError):
+        CATALOG.search(title="Food")
+
+
+def test_series_listed_twice_are_stored_once():
+    assert len(CATALOG) == 7
+    assert _ids(CATALOG.in_category("32424")) == [
+        "STICKCPIM157SFRBATL",
+        "CPIAUCSL",
+        "GDPDEF",
+    ]
+    assert CATALOG.labels(["PCEPI", "MISSING", "CPIAUCSL"]) == ["PCEPI", "CPIAUCSL"]
+
+
+def test_persistence_round_trip():
+    restored = SeriesCatalog.from_dict(json.loads(json.dumps(CATALOG.to_dict())))
+
+    assert restored.to_dict() == CATALOG.to_dict()
+    assert restored.get("GDPDEF") == CATALOG.get("GDPDEF")
+    assert _ids(restored.search("food home")) == _ids(CATALOG.search("food home"))
+
+
+def test_crawl_walks_subcategories(tmp_path):
+    synthesize_fixtures(tmp_path, n_months=2)
+    # Move the special indexes under a subcategory of the CPI category.
+    write_fixture(tmp_path, "category/children", "9", {"categories": [{"id": 32424}]})
+
+    with running_server(tmp_path) as server:
+        client = FredClient(api_key="stand-in", base_url=server.url, rate_limit=0)
+        catalog = SeriesCatalog.crawl(["9"], client=client)
+
+    assert catalog.children == {"9": ["32424"], "32424": []}
+    assert "STICKCPIM157SFRBATL" in catalog
+    assert _ids(catalog.search(prefix="Sticky", category="32424")) == [
+        "CORESTICKM159SFRBATL",
+        "STICKCPIM157SFRBATL",
+    ]
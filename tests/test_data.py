@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from inflation_dashboard import cpi_series_column_name, data
+from inflation_dashboard.fred_server import publish_observation, read_fixture
+from inflation_dashboard.refresh import RefreshResult, refresh_collection
+from inflation_dashboard.utils.matrix import SeriesMatrix
+
+
+def _long_df(n_months=30):
+    dates = pd.date_range("2020-01-01", periods=n_months, freq="MS")
+    rng = np.random.default_rng(0)
+    frames = []
+    for label in ["All items", "Energy"]:
+        frames.append(
+            pd.DataFrame(
+                {
+                    "date": dates,
+                    "value": 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n_months))),
+                    cpi_series_column_name: label,
+                }
+            )
+        )
+    long_df = pd.concat(frames, ignore_index=True)
+    # Energy misses a month, just before the months a refresh appends.
+    missing = (long_df[cpi_series_column_name] == "Energy") & (
+        long_df["date"] == dates[-3]
+    )
+    return long_df[~missing].reset_index(drop=True)
+
+
+def test_refreshed_cube_equals_rebuild():
+    long_df = _long_df()
+    since = long_df["date"].max() - pd.offsets.MonthBegin(1)
+    result = RefreshResult(
+        frames={"long": long_df},
+        new_df=long_df[long_df["date"] >= since],
+        updated_series=["CPIAUCSL", "CPIENGSL"],
+        vintage="refreshed",
+        base_vintage="base",
+    )
+    refreshed = data._derive_cpi(result)["cpi_pct_chg_cube"]
+
+    full = data.compact_frames("cpi", {"long": long_df})["long"]
+    rebuilt = SeriesMatrix.from_long_df(full, by=cpi_series_column_name).pct_chg_cube(
+        data.PCT_CHG_PERIODS
+    )
+    pd.testing.assert_frame_equal(refreshed, rebuilt)
+
+
+@pytest.fixture
+def empty_cache(monkeypatch):
+    monkeypatch.setattr(data, "_vintages", {})
+    data.data_cache.invalidate()
+    yield
+    data.data_cache.invalidate()
+
+
+def test_reload_swaps_in_a_newer_snapshot(fixtures, empty_cache):
+    long_df = data.get_inflation_long_df()
+    version = data.get_data_version()
+    assert data.reload(["cpi", "sticky"]) == []
+    assert data.get_data_version() == version
+
+    # Another process refreshes the collection from FRED and writes a snapshot.
+    end = read_fixture(fixtures, "series", "CPIAUCSL")["seriess"][0]["observation_end"]
+    date = pd.Timestamp(end) + pd.offsets.MonthBegin(1)
+    publish_observation(fixtures, "CPIAUCSL", str(date.date()), 400.0)
+    refresh_collection("cpi", **data._collection_params("cpi"))
+
+    assert data.reload(["cpi", "sticky"]) == ["cpi"]
+    assert data.get_data_version() > version
+    assert len(data.get_inflation_long_df()) == len(long_df) + 1
+    assert data.get_series_matrix().column("All items")[-1] == 400.0
+    assert date in data.get_pct_chg_cube().index.levels[1]
+    assert data.reload(["cpi"]) == []
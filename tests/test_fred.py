@@ -0,0 +1,111 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+from pyfredapi.exceptions import FredAPIRequestError
+
+from inflation_dashboard import fred
+from inflation_dashboard.fred import FredClient, RateLimiter
+from inflation_dashboard.fred_server import running_server, synthesize_fixtures
+
+
+@pytest.fixture
+def backoffs(monkeypatch):
+    """Seconds the client backed off for, without actually sleeping."""
+    sleeps = []
+    monkeypatch.setattr(
+        fred, "time", SimpleNamespace(sleep=sleeps.append, monotonic=time.monotonic)
+    )
+    return sleeps
+
+
+def test_retries_recover_from_injected_failures(tmp_path, backoffs):
+    synthesize_fixtures(tmp_path, n_months=2)
+
+    with running_server(tmp_path, failure_rate=0.5, seed=1) as server:
+        client = FredClient(
+            api_key="stand-in", base_url=server.url, rate_limit=0, max_retries=10
+        )
+        infos = [client.get_series_info("CPIAUCSL") for _ in range(20)]
+
+    assert {info.id for info in infos} == {"CPIAUCSL"}
+    # Every injected failure was retried once after a backoff.
+    n_failures = server.requests["series"] - len(infos)
+    assert n_failures > 0
+    assert len(backoffs) == n_failures
+    assert all(0.5 <= seconds for seconds in backoffs)
+
+
+def test_retries_back_off_exponentially_then_give_up(tmp_path, backoffs):
+    synthesize_fixtures(tmp_path, n_months=2)
+
+    with running_server(tmp_path, failure_rate=1.0) as server:
+        client = FredClient(
+            api_key="stand-in", base_url=server.url, rate_limit=0, max_retries=3
+        )
+        with pytest.raises(FredAPIRequestError) as excinfo:
+            client.get_series_info("CPIAUCSL")
+
+    assert excinfo.value.status_code == 503
+    assert server.requests["series"] == 4
+    for attempt, seconds in enumerate(backoffs):
+        assert 0.5 * 2**attempt <= seconds <= 0.5 * 2**attempt + 0.25
+    assert len(backoffs) == 3
+
+
+def test_client_errors_are_not_retried(tmp_path, backoffs):
+    synthesize_fixtures(tmp_path, n_months=2)
+
+    with running_server(tmp_path, failure_rate=1.0, failure_status=400) as server:
+        client = FredClient(
+            api_key="stand-in", base_url=server.url, rate_limit=0, max_retries=3
+        )
+        with pytest.raises(FredAPIRequestError) as excinfo:
+            client.get_series_info("CPIAUCSL")
+
+    assert excinfo.value.status_code == 400
+    assert server.requests["series"] == 1
+    assert backoffs == []
+
+
+def test_rate_limiter_caps_the_request_rate(tmp_path):
+    synthesize_fixtures(tmp_path, n_months=2)
+
+    with running_server(tmp_path) as server:
+        client = FredClient(
+            api_key="stand-in",
+            base_url=server.url,
+            max_workers=8,
+            rate_limit=20,
+            burst=5,
+        )
+        start = time.monotonic()
+        infos = client.map(client.get_series_info, ["CPIAUCSL"] * 25)
+        elapsed = time.monotonic() - start
+
+    assert len(infos) == 25
+    assert server.requests["series"] == 25
+    # The burst goes out at once, the remaining 20 requests at 20 per second.
+    assert elapsed >= 0.95
+
+
+def test_rate_limiter_refills_up_to_the_burst():
+    limiter = RateLimiter(rate=100, burst=3)
+
+    start = time.monotonic()
+    for _ in range(3):
+        limiter.acquire()
+    assert time.monotonic() - start < 0.02
+
+    time.sleep(0.1)
+    start = time.monotonic()
+    for _ in range(5):
+        limiter.acquire()
+    # Only the 3 tokens of a burst accumulate while idle; the other 2 wait.
+    assert time.monotonic() - start >= 0.019
+
+    disabled = RateLimiter(rate=0, burst=1)
+    start = time.monotonic()
+    for _ in range(1000):
+        disabled.acquire()
+    assert time.monotonic() - start < 0.1
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from inflation_dashboard.utils.matrix import SeriesMatrix
+from inflation_dashboard.utils.pandas import calc_groupby_pct_chg, compact_long_df
+
+DATES = pd.date_range("2020-01-01", periods=12, freq="MS")
+
+
+def _long_df(gap: bool = False) -> pd.DataFrame:
+    """Two monthly series, A = 100 + i and B = 200 + 2i; B misses June if ``gap``."""
+    long_df = pd.concat(
+        [
+            pd.DataFrame(
+                {"date": DATES, "value": 100.0 + np.arange(12), "series": "A"}
+            ),
+            pd.DataFrame(
+                {"date": DATES, "value": 200.0 + 2 * np.arange(12), "series": "B"}
+            ),
+        ],
+        ignore_index=True,
+    )
+    if gap:
+        long_df = long_df[
+            ~((long_df["series"] == "B") & (long_df["date"] == "2020-06-01"))
+        ]
+    return compact_long_df(long_df.reset_index(drop=True), by="series")
+
+
+def _groupby_pct_chg(long_df: pd.DataFrame, lag: int) -> pd.DataFrame:
+    pct_chg_df = calc_groupby_pct_chg(long_df, by="series", periods=lag)
+    return pct_chg_df.reset_index(drop=True)[
+        ["date", "series", "value", "pct_chg_value"]
+    ]
+
+
+@pytest.mark.parametrize("lag", [1, 3])
+def test_pct_change_matches_groupby_without_gaps(lag):
+    long_df = _long_df()
+    matrix = SeriesMatrix.from_long_df(long_df, by="series")
+
+    expected = _groupby_pct_chg(long_df, lag)
+    pct_chg_df = matrix.pct_chg_long_df(lag)[expected.columns]
+    pd.testing.assert_frame_equal(pct_chg_df, expected)
+
+    latest = expected.groupby("series", observed=True).tail(1).reset_index(drop=True)
+    pd.testing.assert_frame_equal(matrix.latest_pct_chg_df(lag)[latest.columns], latest)
+
+
+def test_pct_change_counts_calendar_months_across_a_gap():
+    long_df = _long_df(gap=True)
+    matrix = SeriesMatrix.from_long_df(long_df, by="series")
+    june, july, august, september = 5, 6, 7, 8
+
+    # The missing month is forward filled, but has no change of its own.
+    b = matrix.loc("B")[0]
+    assert np.isnan(matrix.column("B")[june])
+    assert matrix.filled()[june, b] == 208.0
+    pct_chg = matrix.pct_change(3)
+    assert np.isnan(pct_chg[june, b])
+
+    # Three months back from August is May, where `calc_groupby_pct_chg` takes
+    # the third observation back, April.
+    assert pct_chg[august, b] == pytest.approx(214 / 208 - 1)
+    assert pct_chg[september, b] == pytest.approx(216 / 208 - 1)
+    groupby = _groupby_pct_chg(long_df, 3).set_index(["series", "date"])
+    assert groupby.loc[("B", DATES[august]), "pct_chg_value"] == pytest.approx(
+        214 / 206 - 1
+    )
+
+    # Over one month the forward fill makes both agree: July is compared to May.
+    assert matrix.pct_change(1)[july, b] == pytest.approx(212 / 208 - 1)
+    expected = _groupby_pct_chg(long_df, 1)
+    pd.testing.assert_frame_equal(matrix.pct_chg_long_df(1)[expected.columns], expected)
+
+    # The series still end in December, so their latest changes agree.
+    expected = (
+        _groupby_pct_chg(long_df, 3)
+        .groupby("series", observed=True)
+        .tail(1)
+        .reset_index(drop=True)
+    )
+    pd.testing.assert_frame_equal(
+        matrix.latest_pct_chg_df(3)[expected.columns], expected
+    )
@@ -0,0 +1,80 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from inflation_dashboard import metrics
+from inflation_dashboard.metrics import Counter, Gauge, Histogram, Registry
+
+
+def _samples(requests=(), memory=None, latencies=()):
+    """Samples a worker writes to the metrics directory, as read back from json."""
+    registry = Registry()
+    counter = Counter("t_requests_total", "Requests.", ["page"], registry=registry)
+    gauge = Gauge("t_memory_bytes", "Memory.", registry=registry)
+    histogram = Histogram("t_seconds", "Latency.", buckets=(0.1, 1), registry=registry)
+    for page in requests:
+        counter.inc(page=page)
+    if memory is not None:
+        gauge.set(memory)
+    for latency in latencies:
+        histogram.observe(latency)
+    return json.loads(json.dumps(registry.collect()))
+
+
+def test_merge_sums_counters_and_histograms_and_labels_gauges():
+    collected = [
+        (1, True, _samples(["cpi", "cpi"], memory=100, latencies=[0.05, 0.5])),
+        (2, True, _samples(["cpi", "pce"], memory=200, latencies=[5])),
+        (3, False, _samples(["cpi"] * 4, memory=300, latencies=[0.05])),
+    ]
+    lines = metrics._format(metrics._merge(collected)).splitlines()
+
+    assert 't_requests_total{page="cpi"} 7.0' in lines
+    assert 't_requests_total{page="pce"} 1.0' in lines
+    # Gauges of live processes only, by pid.
+    assert [line for line in lines if line.startswith("t_memory_bytes")] == [
+        't_memory_bytes{pid="1"} 100.0',
+        't_memory_bytes{pid="2"} 200.0',
+    ]
+    assert "# TYPE t_seconds histogram" in lines
+    assert 't_seconds_bucket{le="0.1"} 2.0' in lines
+    assert 't_seconds_bucket{le="1.0"} 3.0' in lines
+    assert 't_seconds_bucket{le="+Inf"} 4.0' in lines
+    assert "t_seconds_count 4.0" in lines
+    (total,) = [line for line in lines if line.startswith("t_seconds_sum")]
+    assert float(total.split()[1]) == pytest.approx(5.6)
+
+
+def _exited_pid() -> int:
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+@pytest.mark.skipif(metrics.fcntl is None, reason="needs file locks")
+def test_render_folds_exited_workers_into_one_file(tmp_path, monkeypatch):
+    monkeypatch.setenv("INFLATION_DASHBOARD_METRICS_DIR", str(tmp_path))
+    live = os.getppid()
+    (tmp_path / f"{live}.json").write_text(json.dumps(_samples(["cpi"], memory=1)))
+    for _ in range(2):
+        exited = _exited_pid()
+        (tmp_path / f"{exited}.json").write_text(
+            json.dumps(_samples(["cpi"] * 3, memory=2))
+        )
+        metrics.render()
+        assert not (tmp_path / f"{exited}.json").exists()
+
+    for _ in range(2):
+        lines = metrics.render().splitlines()
+        assert 't_requests_total{page="cpi"} 7.0' in lines
+        assert [line for line in lines if line.startswith("t_memory_bytes")] == [
+            f't_memory_bytes{{pid="{live}"}} 1.0'
+        ]
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        f"{live}.json",
+        metrics.EXITED_FILE,
+        metrics.EXITED_LOCK_FILE,
+    ]
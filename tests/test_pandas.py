@@ -0,0 +1,259 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from inflation_dashboard.utils.matrix import SeriesMatrix
+from inflation_dashboard.utils.pandas import (
+    PERIOD_NA,
+    DateIndex,
+    SeriesRegistry,
+    calc_groupby_pct_chg,
+    calc_pct_chg_for_latest_obv,
+    compact_long_df,
+    from_period_ordinal,
+    pivot_pct_chg_tbl,
+    slice_pct_chg_cube,
+    subset_long_df,
+    to_period_ordinal,
+)
+
+LONG_DF = pd.DataFrame(
+    {
+        "date": pd.to_datetime(
+            ["2020-01-01", "2020-02-01", "2020-03-01"] * 2 + ["2020-01-01", None]
+        ),
+        "value": [100.0, 101.0, 103.0, 50.0, 51.0, 50.5, 10.0, 11.0],
+        "series": ["A", "A", "A", "B", "B", "B", "C", "C"],
+    }
+)
+
+
+def test_period_ordinals_round_trip():
+    periods = to_period_ordinal(LONG_DF["date"])
+
+    assert periods.dtype == np.int32
+    assert periods[:3].tolist() == [600, 601, 602]
+    assert periods[-1] == PERIOD_NA
+    np.testing.assert_array_equal(
+        from_period_ordinal(periods), LONG_DF["date"].to_numpy()
+    )
+
+
+def test_compact_long_df():
+    registry = SeriesRegistry(["C", "B"])
+    compact = compact_long_df(LONG_DF, by="series", registry=registry, float32=True)
+
+    assert list(compact.columns) == ["date", "value", "series", "period"]
+    assert compact["series"].cat.categories.tolist() == ["C", "B", "A"]
+    assert compact["series"].cat.codes.tolist() == [2, 2, 2, 1, 1, 1, 0, 0]
+    assert compact["series"].astype(str).tolist() == LONG_DF["series"].tolist()
+    assert compact["period"].tolist() == to_period_ordinal(LONG_DF["date"]).tolist()
+    assert compact["value"].dtype == np.float32
+    assert np.shares_memory(compact["date"].to_numpy(), LONG_DF["date"].to_numpy())
+
+    # Frames compacted later with the same registry share its codes.
+    later = compact_long_df(LONG_DF.iloc[3:], by="series", registry=registry)
+    assert later["series"].dtype == compact["series"].dtype
+    assert later["value"].dtype == np.float64
+
+    subset = subset_long_df(compact, by="series", series=["A", "missing"])
+    pd.testing.assert_frame_equal(subset, compact.iloc[:3])
+
+
+def test_date_index_asof():
+    index = DateIndex.from_long_df(LONG_DF, by="series")
+
+    assert len(index) == 7
+    assert index.asof("2020-02-15", series="A") == pd.Timestamp("2020-02-01")
+    assert index.asof("2020-02-01", series="A") == pd.Timestamp("2020-02-01")
+    assert index.asof("2020-02-01", series="A", strict=True) == pd.Timestamp(
+        "2020-01-01"
+    )
+    assert pd.isna(index.asof("2019-12-31", series="A"))
+    assert pd.isna(index.asof("2020-03-01", series="missing"))
+    np.testing.assert_array_equal(
+        index.asof_many(["2020-05-01", "2020-05-01"], series=["B", "C"]),
+        pd.to_datetime(["2020-03-01", "2020-01-01"]).to_numpy(),
+    )
+
+    dates = DateIndex.from_long_df(LONG_DF)
+    assert len(dates) == 3
+    assert dates.asof("2020-03-01", strict=True) == pd.Timestamp("2020-02-01")
+
+
+def test_calc_groupby_pct_chg():
+    # Groups interleave rather than being contiguous, and each starts with a NaN
+    # within the first two rows.
+    long_df = pd.DataFrame(
+        {
+            "date": np.repeat(pd.date_range("2020-01-01", periods=5, freq="MS"), 2),
+            "series": ["A", "B"] * 5,
+            "value": [100.0, np.nan, np.nan, 50.0, 102, 55, 104, 60, 108, 66],
+        }
+    )
+
+    pct_chg_df = calc_groupby_pct_chg(long_df, by="series", periods=[1, 2])
+    assert list(pct_chg_df.columns) == [
+        "date",
+        "series",
+        "value",
+        "pct_chg_value",
+        "lag",
+    ]
+    assert pct_chg_df["lag"].tolist() == [1] * 6 + [2] * 5
+
+    for lag in [1, 2]:
+        # Missing values are forward filled, as `pd.Series.pct_change` did.
+        expected = long_df.groupby("series")["value"].transform(
+            lambda values, lag=lag: values.ffill().pct_change(lag)
+        )
+        expected = expected[long_df["value"].notna()].dropna()
+        got = pct_chg_df[pct_chg_df["lag"] == lag]
+        pd.testing.assert_series_equal(
+            got["pct_chg_value"], expected, check_names=False
+        )
+        pd.testing.assert_frame_equal(
+            calc_groupby_pct_chg(long_df, by="series", periods=lag),
+            got.drop(columns="lag"),
+        )
+
+    # March of A is compared to the January value carried into February; March of B
+    # has no value two months back.
+    by_row = pct_chg_df.set_index(["lag", "series", "date"])["pct_chg_value"]
+    assert by_row[(1, "A", pd.Timestamp("2020-03-01"))] == pytest.approx(0.02)
+    assert (2, "B", pd.Timestamp("2020-03-01")) not in by_row.index
+
+    # float32 values give float32 changes.
+    float32 = calc_groupby_pct_chg(
+        long_df.astype({"value": np.float32}), by="series", periods=1
+    )
+    assert float32["pct_chg_value"].dtype == np.float32
+
+
+def _uneven_long_df() -> pd.DataFrame:
+    """Series of 30, 14 and 5 months ending in different months, rows shuffled."""
+    rng = np.random.default_rng(0)
+    frames = []
+    for label, n_months, end in [
+        ("A", 30, "2022-06"),
+        ("B", 14, "2022-04"),
+        ("C", 5, "2022-06"),
+    ]:
+        frames.append(
+            pd.DataFrame(
+                {
+                    "date": pd.date_range(end=end, periods=n_months, freq="MS"),
+                    "value": 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n_months))),
+                    "series": label,
+                }
+            )
+        )
+    return pd.concat(frames).sample(frac=1, random_state=0).reset_index(drop=True)
+
+
+def _latest_pct_change(long_df: pd.DataFrame, periods: int) -> pd.Series:
+    """Latest percent change of each series, the plain pandas way."""
+    long_df = long_df.sort_values(["series", "date"])
+    pct_chg = long_df.groupby("series")["value"].pct_change(periods)
+    latest = long_df.assign(pct_chg=pct_chg).groupby("series").tail(1)
+    return latest.set_index("series")["pct_chg"]
+
+
+def test_calc_pct_chg_for_latest_obv_matches_groupby():
+    long_df = _uneven_long_df()
+    periods = [1, 12]
+
+    pct_chg_df = calc_pct_chg_for_latest_obv(long_df, periods, series_col="series")
+    for lag in periods:
+        expected = _latest_pct_change(long_df, lag).round(4).dropna()
+        got = pct_chg_df[pct_chg_df["lag"] == lag].set_index("series")
+        pd.testing.assert_series_equal(
+            got["pct_chg_value"].sort_index(), expected.sort_index(), check_names=False
+        )
+        assert (
+            got["vs_date"] == pd.Timestamp("2022-06-01") - pd.DateOffset(months=lag)
+        ).all()
+    # C has fewer than 13 observations, so it has no 12 month change.
+    assert "C" not in set(pct_chg_df.loc[pct_chg_df["lag"] == 12, "series"])
+    latest = pct_chg_df.drop_duplicates("series").set_index("series")["date"]
+    assert (
+        latest.sort_index().tolist()
+        == pd.to_datetime(["2022-06-01", "2022-04-01", "2022-06-01"]).tolist()
+    )
+
+    wide = calc_pct_chg_for_latest_obv(long_df, periods, series_col="series", wide=True)
+    assert list(wide.columns) == [
+        "date",
+        "value",
+        "pct_chg_value_1",
+        "pct_chg_value_12",
+    ]
+    for lag in periods:
+        pd.testing.assert_series_equal(
+            wide[f"pct_chg_value_{lag}"].sort_index(),
+            _latest_pct_change(long_df, lag).round(4).sort_index(),
+            check_names=False,
+        )
+    assert np.isnan(wide.loc["C", "pct_chg_value_12"])
+
+
+def test_slice_pct_chg_cube():
+    long_df = compact_long_df(LONG_DF.dropna(), by="series")
+    cube = SeriesMatrix.from_long_df(long_df, by="series").pct_chg_cube([1, 2])
+
+    for lag in [1, 2]:
+        expected = calc_groupby_pct_chg(long_df, by="series", periods=lag)
+        pct_chg_df = slice_pct_chg_cube(cube, periods=lag)
+        assert list(pct_chg_df.columns) == [
+            "date",
+            "value",
+            "period",
+            "series",
+            "pct_chg_value",
+        ]
+        pd.testing.assert_frame_equal(
+            pct_chg_df, expected[pct_chg_df.columns].reset_index(drop=True)
+        )
+
+    b = slice_pct_chg_cube(cube, periods=2, series=["B", "missing"])
+    assert b["series"].astype(str).tolist() == ["B"]
+    assert b["pct_chg_value"].iloc[0] == 50.5 / 50 - 1
+    assert slice_pct_chg_cube(cube, periods=2, series="C").empty
+
+
+def test_pivot_pct_chg_tbl_orders_columns_by_month():
+    pct_chg_df = pd.DataFrame(
+        {
+            "date": pd.to_datetime(
+                ["2020-01-01", "2019-11-01", "2019-12-01", "2020-02-01"] * 2
+            ),
+            "cpi_series": ["Energy"] * 4 + ["All items"] * 4,
+            "pct_chg_value": [0.1, 0.2, 0.3, 0.4, 1.0, 2.0, 3.0, np.nan],
+        }
+    )
+
+    table = pivot_pct_chg_tbl(pct_chg_df, index_col="cpi_series", n="all")
+    assert table.columns.tolist() == ["Nov 2019", "Dec 2019", "Jan 2020", "Feb 2020"]
+    assert table.index.tolist() == ["Energy", "All items"]
+    assert table.loc["Energy"].tolist() == [0.2, 0.3, 0.1, 0.4]
+    assert np.isnan(table.loc["All items", "Feb 2020"])
+
+    # The month ordinals of a compact frame give the same table.
+    compact = compact_long_df(pct_chg_df, by="cpi_series")
+    pd.testing.assert_frame_equal(
+        pivot_pct_chg_tbl(compact, index_col="cpi_series", n="all"), table
+    )
+
+    last_two = pivot_pct_chg_tbl(pct_chg_df, index_col="cpi_series", n=2)
+    assert last_two.columns.tolist() == ["Jan 2020", "Feb 2020"]
+    pd.testing.assert_frame_equal(last_two, table[["Jan 2020", "Feb 2020"]])
+
+    stacked = pd.concat([pct_chg_df.assign(lag=12), pct_chg_df.assign(lag=1)])
+    table = pivot_pct_chg_tbl(stacked, index_col="cpi_series", n=2, other_cols=["lag"])
+    assert table.columns.tolist() == [
+        ("Jan 2020", 12),
+        ("Jan 2020", 1),
+        ("Feb 2020", 12),
+        ("Feb 2020", 1),
+    ]
+    assert table.columns.names == ["Date", "Lag"]
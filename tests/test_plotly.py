@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from inflation_dashboard.utils.plotly import (
+    LARGE_PLOT_POINTS,
+    _line_traces,
+    _mk_line_plot,
+    cached_figure,
+    downsample_minmax,
+    figure_cache,
+)
+
+
+def _pct_chg_df(n_days: int, series=("All items", "Energy")) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    dates = pd.date_range("1900-01-01", periods=n_days, freq="D")
+    long_df = pd.concat(
+        [
+            pd.DataFrame(
+                {
+                    "date": dates,
+                    "cpi_series": label,
+                    "pct_chg_value": rng.normal(0, 0.01, n_days),
+                }
+            )
+            for label in series
+        ],
+        ignore_index=True,
+    )
+    # Rows need not be in order.
+    return long_df.sample(frac=1, random_state=0)
+
+
+def test_downsample_minmax_keeps_ends_and_bucket_extremes():
+    long_df = _pct_chg_df(10_000)
+    sampled = downsample_minmax(long_df, n_points=100)
+
+    for label, series_df in long_df.groupby("cpi_series"):
+        kept = sampled[sampled["cpi_series"] == label]
+        assert len(kept) <= 102
+        assert kept["date"].is_monotonic_increasing
+        series_df = series_df.sort_values("date").reset_index(drop=True)
+        assert kept["date"].iloc[0] == series_df["date"].iloc[0]
+        assert kept["date"].iloc[-1] == series_df["date"].iloc[-1]
+        # 50 buckets of 200 consecutive days each.
+        buckets = series_df.groupby(series_df.index // 200)["pct_chg_value"]
+        values = set(kept["pct_chg_value"])
+        assert set(buckets.min()) <= values
+        assert set(buckets.max()) <= values
+
+    # Series short enough are kept whole.
+    assert len(downsample_minmax(long_df, n_points=10_000)) == len(long_df)
+
+
+def test_large_line_plots_are_downsampled_and_drawn_with_webgl():
+    small = _pct_chg_df(LARGE_PLOT_POINTS // 2)
+    large = _pct_chg_df(LARGE_PLOT_POINTS // 2 + 1)
+
+    # At most `LARGE_PLOT_POINTS` points are drawn as they are.
+    plot = _mk_line_plot(small, title="small")
+    assert sum(len(trace.x) for trace in plot.data) == len(small)
+    plot = _mk_line_plot(small.iloc[:500], title="smaller")
+    assert {trace.type for trace in plot.data} == {"scatter"}
+
+    plot = _mk_line_plot(large, title="large", plot_size={"width": 1000})
+    assert {trace.type for trace in plot.data} == {"scattergl"}
+    # Two points per pixel of width, shared by the two series.
+    assert all(len(trace.x) <= 1000 + 2 for trace in plot.data)
+
+    traces = _line_traces(large, plot_size={"width": 1000})
+    assert {trace["type"] for trace in traces} == {"scattergl"}
+    assert [len(trace["x"]) for trace in traces] == [len(t.x) for t in plot.data]
+
+
+def test_cached_figure_builds_once_and_returns_the_decoded_figure():
+    calls = []
+
+    def build():
+        calls.append(1)
+        return go.Figure(go.Scatter(x=[1, 2, 3], y=[3, 1, 2]))
+
+    args = ("test", ("All items",), 1, 0, build)
+    figure = cached_figure(*args, title="a")
+    try:
+        assert cached_figure(*args, title="a") is figure
+        assert calls == [1]
+        assert figure["data"][0]["y"] == [3, 1, 2]
+        assert isinstance(figure, dict)
+
+        cached_figure(*args, title="b")
+        assert calls == [1, 1]
+    finally:
+        figure_cache.invalidate()
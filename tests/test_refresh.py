@@ -0,0 +1,57 @@
+import pandas as pd
+
+from inflation_dashboard import _parse_cpi_series_title, cpi_series_column_name
+from inflation_dashboard.fred_server import (
+    publish_observation,
+    read_fixture,
+    write_fixture,
+)
+from inflation_dashboard.refresh import refresh_collection
+
+COLLECTION = dict(
+    name="cpi",
+    series_id=["CPIAUCSL", "CPIUFDSL"],
+    col_name=cpi_series_column_name,
+    rename=_parse_cpi_series_title,
+    base_series_id="CPIAUCSL",
+)
+
+
+def _next_month(fixtures, series_id):
+    end = read_fixture(fixtures, "series", series_id)["seriess"][0]["observation_end"]
+    return str((pd.Timestamp(end) + pd.offsets.MonthBegin(1)).date())
+
+
+def test_refresh_appends_new_observations(fixtures):
+    base = refresh_collection(**COLLECTION)
+    date = _next_month(fixtures, "CPIAUCSL")
+    publish_observation(fixtures, "CPIAUCSL", date, 400.0)
+
+    result = refresh_collection(**COLLECTION)
+
+    assert result.changed
+    assert result.updated_series == ["CPIAUCSL"]
+    assert result.base_vintage == base.vintage
+    assert result.vintage != base.vintage
+    assert len(result.new_df) == 1
+    assert result.new_df["date"].iloc[0] == pd.Timestamp(date)
+    assert len(result.frames["long"]) == len(base.frames["long"]) + 1
+    assert result.frames["wide"]["date"].iloc[-1] == pd.Timestamp(date)
+    assert result.frames["wide"]["All items"].iloc[-1] == 400.0
+
+
+def test_refresh_without_new_observations(fixtures):
+    base = refresh_collection(**COLLECTION)
+    info = read_fixture(fixtures, "series", "CPIUFDSL")
+    info["seriess"][0]["last_updated"] = "2099-01-01 07:38:01-05"
+    write_fixture(fixtures, "series", "CPIUFDSL", info)
+
+    result = refresh_collection(**COLLECTION)
+
+    assert not result.changed
+    assert result.new_df.empty
+    assert result.updated_series == ["CPIUFDSL"]
+    pd.testing.assert_frame_equal(result.frames["long"], base.frames["long"])
+
+    # The new timestamp was recorded, so the next refresh requests nothing new.
+    assert refresh_collection(**COLLECTION).updated_series == []
@@ -0,0 +1,91 @@
+import time
+
+import pandas as pd
+import pytest
+
+from inflation_dashboard import data
+from inflation_dashboard.scheduler import LeaderLock, Refresher, in_release_window
+from inflation_dashboard.utils.cache import TTLCache
+
+
+def _eastern(timestamp):
+    return pd.Timestamp(timestamp, tz="America/New_York")
+
+
+def test_in_release_window():
+    # Thursday 11 January 2024.
+    assert in_release_window(_eastern("2024-01-11 09:00"))
+    assert in_release_window(pd.Timestamp("2024-01-11 14:00", tz="UTC"))
+    assert not in_release_window(_eastern("2024-01-11 07:59"))
+    assert not in_release_window(_eastern("2024-01-11 12:00"))
+    # A Saturday, and a weekday after the 15th.
+    assert not in_release_window(_eastern("2024-01-13 09:00"))
+    assert not in_release_window(_eastern("2024-01-16 09:00"))
+
+    # Known release dates replace the guess.
+    assert in_release_window(_eastern("2024-01-16 09:00"), ["2024-01-16"])
+    assert not in_release_window(_eastern("2024-01-11 09:00"), ["2024-01-16"])
+
+
+def test_next_delay_shortens_in_release_window(tmp_path):
+    refresher = Refresher(
+        interval=3600,
+        release_interval=60,
+        release_dates=[],
+        lock=LeaderLock(tmp_path / "refresh.lock"),
+    )
+    for _ in range(20):
+        assert 54 <= refresher.next_delay(_eastern("2024-01-11 09:00")) <= 66
+        assert 3240 <= refresher.next_delay(_eastern("2024-01-20 09:00")) <= 3960
+
+
+def test_one_refresher_polls_fred(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        data, "refresh", lambda collections, loaded_only: calls.append("refresh") or {}
+    )
+    monkeypatch.setattr(
+        data, "reload", lambda collections: calls.append("reload") or []
+    )
+    leader = Refresher(lock=LeaderLock(tmp_path / "refresh.lock"))
+    follower = Refresher(lock=LeaderLock(tmp_path / "refresh.lock"))
+
+    leader.refresh_once()
+    follower.refresh_once()
+    leader.refresh_once()
+    assert calls == ["refresh", "reload", "refresh"]
+    assert leader.lock.held and not follower.lock.held
+
+    # Once the leader stops, the next tick of another refresher takes over.
+    leader.stop()
+    follower.refresh_once()
+    assert calls[-1] == "refresh"
+    assert follower.lock.held
+    follower.stop()
+
+
+def test_failing_refresh_keeps_serving_stale_data(tmp_path, monkeypatch):
+    cache = TTLCache(ttl=0.05)
+    monkeypatch.setattr(data, "data_cache", cache)
+    monkeypatch.setattr(data, "_vintages", {"cpi": "loaded"})
+    cache.set("cpi", "loaded frames")
+    cache.set("sticky", "not loaded")
+
+    def refresh(collections, loaded_only):
+        raise ConnectionError("FRED is down")
+
+    monkeypatch.setattr(data, "refresh", refresh)
+    refresher = Refresher(
+        collections=["cpi", "sticky"], lock=LeaderLock(tmp_path / "refresh.lock")
+    )
+
+    # Each failed refresh renews the loaded data, also once it has gone stale.
+    for _ in range(3):
+        time.sleep(0.06)
+        assert "cpi" not in cache
+        with pytest.raises(ConnectionError):
+            refresher.refresh_once()
+        assert "cpi" in cache
+    assert cache.get_or_set("cpi", lambda: "reloaded") == "loaded frames"
+    assert "sticky" not in cache
+    refresher.stop()
@@ -0,0 +1,31 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from inflation_dashboard.snapshot import latest_snapshot, write_snapshot
+
+SERIES = {"CPIAUCSL": "2024-01-11 07:38:01-06"}
+
+
+def _long_df():
+    return pd.DataFrame(
+        {
+            "date": pd.date_range("2020-01-01", periods=12, freq="MS"),
+            "value": range(12),
+        }
+    ).astype({"value": "float64"})
+
+
+def test_concurrent_writes_of_a_vintage(tmp_path):
+    def write(_):
+        return write_snapshot(
+            "cpi", series=SERIES, frames={"long": _long_df()}, root=tmp_path, keep=3
+        )
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        snapshots = list(pool.map(write, range(16)))
+
+    assert {snapshot.vintage for snapshot in snapshots} == {snapshots[0].vintage}
+    latest = latest_snapshot("cpi", root=tmp_path)
+    pd.testing.assert_frame_equal(latest.read_frame("long"), _long_df())
+    assert not [p for p in (tmp_path / "cpi").iterdir() if p.name.startswith(".")]